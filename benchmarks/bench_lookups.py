@@ -0,0 +1,91 @@
+"""Microbenchmarks for the directory lookup and the skew and smile filters
+
+Compares the previous `DataFrame.query` implementations with the dictionary
+lookup and boolean masks used in Ticker.get_ticker and the dashboard. The
+skew is timed through cboe_model.calc_iv_skew itself.
+
+Run from the repository root:
+
+python benchmarks/bench_lookups.py
+"""
+
+import os
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import cboe_model as cboe
+
+SPOT: float = 4000.0
+SYMBOLS: int = 5000
+REPEAT: int = 20
+
+def make_directory() -> pd.DataFrame:
+    """Builds a listings directory the size of the CBOE equity and index directory."""
+
+    symbols = [f"S{i:04d}" for i in range(SYMBOLS)]
+
+    return pd.DataFrame(
+        {"Company Name": [f"Company {s}" for s in symbols]},
+        index=pd.Index(symbols, name="Symbol"),
+    )
+
+def make_chain(option_type: str, seed: int) -> pd.DataFrame:
+    """Builds an SPX-sized chain of one type, indexed by Expiration, Strike and Type, with an IV column."""
+
+    expirations = pd.date_range("2030-01-01", periods=60, freq="W")
+    strikes = np.arange(SPOT * 0.5, SPOT * 1.5, 2.5)
+    index = pd.MultiIndex.from_product(
+        [expirations, strikes, [option_type]], names=["Expiration", "Strike", "Type"]
+    )
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({"IV": rng.uniform(0, 0.5, len(index))}, index=index)
+
+def skew_query(calls: pd.DataFrame, puts: pd.DataFrame, stock_price: float) -> pd.DataFrame:
+    """The IV skew as computed before calc_iv_skew, with query and a per-expiration idxmin apply."""
+
+    atm_calls = calls.reset_index()[["Expiration", "Strike", "IV"]]
+    atm_calls = atm_calls.query("@stock_price*0.995 <= Strike <= @stock_price*1.05")
+    atm_calls = atm_calls.groupby("Expiration")[["Strike", "IV"]]
+    atm_calls = atm_calls.apply(lambda x: x.loc[x["Strike"].idxmin()])
+    atm_calls = atm_calls.rename(columns={"Strike": "Call Strike", "IV": "Call IV"})
+    otm_puts = puts.reset_index()[["Expiration", "Strike", "IV"]]
+    otm_puts = otm_puts.query("@stock_price*0.94 <= Strike <= @stock_price")
+    otm_puts = otm_puts.groupby("Expiration")[["Strike", "IV"]]
+    otm_puts = otm_puts.apply(lambda x: x.loc[x["Strike"].idxmin()])
+    otm_puts = otm_puts.rename(columns={"Strike": "Put Strike", "IV": "Put IV"})
+    iv_skew = atm_calls.join(otm_puts)
+    iv_skew["IV Skew"] = iv_skew["Put IV"] - iv_skew["Call IV"]
+
+    return iv_skew
+
+def report(name: str, before, after) -> None:
+    old = min(timeit.repeat(before, number=1, repeat=REPEAT)) * 1000
+    new = min(timeit.repeat(after, number=1, repeat=REPEAT)) * 1000
+    print(f"{name:<20} query: {old:8.3f} ms   mask/index: {new:8.3f} ms   saved: {old - new:8.3f} ms")
+
+if __name__ == "__main__":
+    directory = make_directory()
+    directory_names = directory.loc[~directory.index.duplicated(), "Company Name"].to_dict()
+    symbol = "S4321"
+    calls = make_chain("Call", 0)
+    puts = make_chain("Put", 1)
+    smile = pd.DataFrame({"Call IV": calls["IV"].to_numpy(), "Put IV": puts["IV"].to_numpy()})
+
+    pd.testing.assert_frame_equal(skew_query(calls, puts, SPOT), cboe.calc_iv_skew(calls, puts, SPOT))
+
+    report(
+        "Directory lookup",
+        lambda: str(directory.query("`Symbol` ==  @symbol")["Company Name"].iloc[0]),
+        lambda: str(directory_names.get(symbol, symbol)),
+    )
+    report("IV skew", lambda: skew_query(calls, puts, SPOT), lambda: cboe.calc_iv_skew(calls, puts, SPOT))
+    report(
+        "Smile filter",
+        lambda: smile.query("0 < `Call IV` and 0 < `Put IV`"),
+        lambda: smile[(smile["Call IV"] > 0) & (smile["Put IV"] > 0)],
+    )
@@ -0,0 +1,250 @@
+"""Offline benchmark of the ticker pipeline against replayed CBOE payloads
+
+Times every stage of Ticker.get_ticker on the small, medium and SPX-sized
+fixtures, records the peak traced memory of each stage, and compares the
+results with a baseline saved on the same machine. Timings depend on the
+host, so the baseline is not committed: save one with --save-baseline
+before a change, then run again after it.
+
+Run from the repository root:
+
+python benchmarks/fixtures.py
+
+python benchmarks/bench_pipeline.py
+
+python benchmarks/bench_pipeline.py --save-baseline
+
+python benchmarks/bench_pipeline.py --sizes spx --threshold 0.2
+
+With pyarrow installed, every product built in the analytics worker pool is
+also checked against the same product built in-process.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Callable
+
+BENCH_DIR: str = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fixtures import FIXTURES_DIR, SIZES, write_fixtures
+from data import cboe_model as cboe
+from data.providers import ReplayProvider
+from data import strategy, spreads, density, cube, workers
+
+BASELINE_FILE: str = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_FILE: str = os.path.join(BENCH_DIR, "results", "latest.json")
+
+def measure(func: Callable, repeat: int) -> dict:
+    """Returns the best wall time over `repeat` runs and the peak traced memory of one run."""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": min(timings), "peak_mb": peak / 2**20}
+
+def with_backend(backend: str, func: Callable) -> object:
+    """Calls `func` with cboe.CHAINS_BACKEND set to `backend`."""
+
+    previous = cboe.CHAINS_BACKEND
+    cboe.CHAINS_BACKEND = backend
+    try:
+        return func()
+    finally:
+        cboe.CHAINS_BACKEND = previous
+
+def uncached(func: Callable) -> Callable:
+    """Wraps `func` to clear the parsed payload cache before each call."""
+
+    def call() -> object:
+        cboe.governor.clear()
+        return func()
+
+    return call
+
+def run_size(cboe, size: str, repeat: int) -> dict:
+    """Benchmarks each pipeline stage for one fixture size."""
+
+    symbol = SIZES[size][0]
+    details, _ = cboe.get_ticker_info(symbol)
+    stock_price = float(details.loc["Current Price"].iloc[0])
+    chains = cboe.get_ticker_chains(symbol)
+    calls, puts = cboe.separate_chains(chains)
+    condor = strategy.build_legs(chains, strategy.preset_legs(chains, "Iron Condor", stock_price))
+    options = cboe.get_ticker_options(symbol)
+    chains_cube = cube.AnalyticsCube(chains, stock_price)
+    front = chains.index.get_level_values("Expiration").unique().sort_values()[:1]
+
+    stages: dict = {
+        "get_ticker_info": lambda: cboe.get_ticker_info(symbol),
+        "get_ticker_iv": lambda: cboe.get_ticker_iv(symbol),
+        "get_ticker_chains": lambda: cboe.get_ticker_chains(symbol),
+        "separate_chains": lambda: cboe.separate_chains(chains),
+        "calc_chains_by_expiration": lambda: cboe.calc_chains_by_expiration(chains),
+        "calc_chains_by_strike": lambda: cboe.calc_chains_by_strike(chains),
+        "calc_iv_skew": lambda: cboe.calc_iv_skew(calls, puts, stock_price),
+        "calc_max_pain": lambda: cboe.calc_max_pain(chains),
+        "calc_gex_profile": lambda: cboe.calc_gex_profile(chains, stock_price),
+        "calc_strategy_pnl (condor)": lambda: strategy.calc_strategy_pnl(condor, stock_price),
+        "screen_spreads": lambda: spreads.screen_spreads(calls, puts, stock_price),
+        "calc_implied_distribution": lambda: density.calc_implied_distribution(calls, puts, stock_price),
+        "AnalyticsCube": lambda: cube.AnalyticsCube(chains, stock_price),
+        "AnalyticsCube.rollup (weekly x delta)": lambda: chains_cube.rollup("Expiration", "Delta", "OI", freq="W"),
+        "Ticker.get_ticker": lambda: cboe.Ticker().get_ticker(symbol),
+        "LazyChain index": lambda: cboe.LazyChain(options, stock_price),
+        "LazyChain front expiration": lambda: cboe.LazyChain(options, stock_price).select(front),
+        "Ticker.get_ticker (lazy)": lambda: with_backend("lazy", lambda: cboe.Ticker().get_ticker(symbol)),
+    }
+    if cboe.arrow_chains.pa is not None:
+        table = cboe.get_ticker_table(symbol)
+        stages.update(
+            {
+                "get_ticker_table": lambda: cboe.get_ticker_table(symbol),
+                "calc_chains_by_expiration (arrow)": lambda: cboe.calc_chains_by_expiration(table),
+                "calc_chains_by_strike (arrow)": lambda: cboe.calc_chains_by_strike(table),
+                "Ticker.get_ticker (arrow)": lambda: with_backend("arrow", lambda: cboe.Ticker().get_ticker(symbol)),
+            }
+        )
+
+    # Every stage parses from scratch; the unchanged-payload stage measures the content-hash skip.
+
+    stages = {stage: uncached(func) for stage, func in stages.items()}
+    results: dict = {"contracts": len(chains)}
+    for stage, func in stages.items():
+        results[stage] = measure(func, repeat)
+    cboe.Ticker().get_ticker(symbol)
+    results["Ticker.get_ticker (unchanged)"] = measure(lambda: cboe.Ticker().get_ticker(symbol), repeat)
+
+    return results
+
+def compare_products(local: dict, pooled: dict) -> list[str]:
+    """Lists the products of calc_ticker_products that differ between two runs."""
+
+    mismatches = []
+    for name, value in local.items():
+        other = pooled.get(name)
+        try:
+            if isinstance(value, pd.DataFrame):
+                pd.testing.assert_frame_equal(value, other)
+            elif isinstance(value, pd.Series):
+                pd.testing.assert_series_equal(value, other)
+            elif isinstance(value, cube.AnalyticsCube):
+                assert isinstance(other, cube.AnalyticsCube), f"{type(other).__name__} instead of AnalyticsCube"
+                np.testing.assert_array_equal(value.values, other.values)
+                for dimension, labels in value.dimensions.items():
+                    pd.testing.assert_index_equal(labels, other.dimensions[dimension])
+            elif value is None:
+                assert other is None, f"{type(other).__name__} instead of None"
+            else:
+                assert value.equals(other), "values differ"
+        except (AssertionError, AttributeError, KeyError, TypeError) as error:
+            mismatches.append(f"{name}: {str(error).strip().splitlines()[0]}")
+
+    return mismatches
+
+def check_workers(cboe, size: str) -> list[str]:
+    """Builds the products of one fixture in-process and in a one-process worker pool, and compares them."""
+
+    symbol = SIZES[size][0]
+    details, _ = cboe.get_ticker_info(symbol)
+    stock_price = float(details.loc["Current Price"].iloc[0])
+    options = cboe.get_ticker_options(symbol)
+
+    local = cboe.calc_ticker_products(options, stock_price, "arrow")
+    previous = workers.ANALYTICS_WORKERS
+    workers.set_workers(1)
+    try:
+        pooled = cboe.calc_ticker_products(options, stock_price, "arrow")
+    finally:
+        workers.set_workers(previous)
+
+    return [f"{size} {mismatch}" for mismatch in compare_products(local, pooled)]
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float = 0.005) -> list[str]:
+    """Lists the stages slower than the baseline by more than `threshold` and `min_delta` seconds."""
+
+    regressions = []
+    for size, stages in results.items():
+        for stage, result in stages.items():
+            if not isinstance(result, dict) or stage not in baseline.get(size, {}):
+                continue
+            before = baseline[size][stage]["seconds"]
+            slower = result["seconds"] - before
+            if before > 0 and slower > before * threshold and slower > min_delta:
+                regressions.append(
+                    f"{size} {stage}: {before * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms"
+                )
+
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=0.005)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)
+
+    for size in args.sizes:
+        if not os.path.isdir(os.path.join(FIXTURES_DIR, size)):
+            write_fixtures(size)
+
+    cboe.history = cboe.HistoryStore(tempfile.mkdtemp())
+    cboe.snapshots = cboe.SnapshotHistory(tempfile.mkdtemp())
+
+    results: dict = {}
+    mismatches: list[str] = []
+    for size in args.sizes:
+        cboe.set_provider(ReplayProvider(os.path.join(FIXTURES_DIR, size)))
+        results[size] = run_size(cboe, size, args.repeat)
+        if cboe.arrow_chains.pa is not None:
+            mismatches += check_workers(cboe, size)
+        print(f"\n{size} ({results[size]['contracts']} contracts)")
+        for stage, result in results[size].items():
+            if isinstance(result, dict):
+                print(f"  {stage:<36} {result['seconds'] * 1000:9.1f} ms {result['peak_mb']:9.1f} MB peak")
+
+    if cboe.arrow_chains.pa is not None:
+        if mismatches:
+            print("\nWorker pool products differing from the in-process ones:")
+            print("\n".join(f"  {line}" for line in mismatches))
+            sys.exit(1)
+        print("\nWorker pool products match the in-process ones.")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+    elif os.path.isfile(BASELINE_FILE):
+        with open(BASELINE_FILE) as file:
+            regressions = compare(results, json.load(file), args.threshold, args.min_delta)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            print("\n".join(f"  {line}" for line in regressions))
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+    else:
+        print("\nNo baseline to compare with. Save one with --save-baseline.")
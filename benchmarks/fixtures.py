@@ -0,0 +1,239 @@
+"""Synthetic CBOE payload fixtures for the offline benchmarks
+
+Writes symbol-info, historical_data and delayed_quotes/options payloads, plus the
+two listings directories, in the same JSON and CSV layouts the CBOE endpoints
+serve, under the directory layout read by data.providers.ReplayProvider.
+Payloads captured with RecordingProvider can be used in place of these:
+
+fixtures/<size>/symbol_info/<SYMBOL>.json
+fixtures/<size>/historical_data/<SYMBOL>.json
+fixtures/<size>/options/<SYMBOL>.json
+fixtures/<size>/directory/equity_index_options.csv
+fixtures/<size>/directory/all_indices.json
+
+Run from the repository root:
+
+python benchmarks/fixtures.py
+"""
+
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.iv_solver import bs_d1_d2, bs_price, norm_cdf, norm_pdf
+
+FIXTURES_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Symbol, spot, number of expirations, strikes per expiration, strike step, and whether it is an index.
+
+SIZES: dict = {
+    "small": ("AAPL", 150.0, 12, 40, 2.5, False),
+    "medium": ("QQQ", 400.0, 30, 150, 1.0, False),
+    "spx": ("SPX", 4000.0, 60, 420, 5.0, True),
+}
+
+# Index options list every expiration under a weekly root, and the monthly ones under the standard root as
+# well, e.g. SPX and SPXW, so the same (Expiration, Strike, Type) appears twice in the chain.
+
+WEEKLY_ROOTS: dict = {"SPX": "SPXW", "VIX": "VIXW", "RUT": "RUTW", "NDX": "NDXP"}
+MONTHLY_EVERY: int = 4
+
+def make_options(symbol: str, spot: float, expirations: int, strikes: int, step: float, seed: int = 0) -> dict:
+    """Builds a delayed_quotes/options payload priced from a volatility smile.
+
+    Symbols with a weekly root are quoted under it for every expiration, and
+    every MONTHLY_EVERY-th expiration is also quoted under the symbol itself.
+    """
+
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.today().normalize()
+    dates = today + pd.to_timedelta(np.unique(np.geomspace(1, 1000, expirations).astype(int)), unit="D")
+    center = round(spot / step) * step
+    grid = center + step * (np.arange(strikes) - strikes // 2)
+    grid = grid[grid > 0]
+
+    exp, strike, is_call = np.meshgrid(np.arange(dates.size), grid, [True, False], indexing="ij")
+    exp, strike, is_call = exp.ravel(), strike.ravel(), is_call.ravel()
+    t = ((dates[exp] - today).days.to_numpy() + 1) / 365
+    moneyness = np.log(strike / spot)
+    iv = np.clip(0.2 - 0.15 * moneyness + 0.4 * moneyness ** 2, 0.05, 3)
+    theo = bs_price(spot, strike, t, iv, is_call)
+    d1, _ = bs_d1_d2(spot, strike, t, iv)
+    delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1)
+    gamma = norm_pdf(d1) / (spot * iv * np.sqrt(t))
+    vega = spot * norm_pdf(d1) * np.sqrt(t) / 100
+    theta = -spot * norm_pdf(d1) * iv / (2 * np.sqrt(t)) / 365
+    spread = np.maximum(0.05, theo * 0.02)
+    oi = rng.integers(0, 20000, exp.size)
+    volume = rng.integers(0, 5000, exp.size)
+
+    # A few contracts carry no CBOE IV, like the live feed does.
+
+    iv_out = np.where(rng.random(exp.size) < 0.02, 0.0, iv)
+    weekly = WEEKLY_ROOTS.get(symbol)
+    if weekly is not None:
+        monthly = np.flatnonzero(exp % MONTHLY_EVERY == MONTHLY_EVERY - 1)
+        rows = np.r_[np.arange(exp.size), monthly]
+        exp, strike, is_call, theo, spread, iv_out, delta, gamma, theta, vega = (
+            values[rows] for values in (exp, strike, is_call, theo, spread, iv_out, delta, gamma, theta, vega)
+        )
+        roots = np.r_[np.full(rows.size - monthly.size, weekly), np.full(monthly.size, symbol)]
+        oi = rng.integers(0, 20000, exp.size)
+        volume = rng.integers(0, 5000, exp.size)
+    else:
+        roots = np.full(exp.size, symbol)
+    codes = [
+        f"{root}{dates[e].strftime('%y%m%d')}{'C' if c else 'P'}{int(round(k * 1000)):08d}"
+        for root, e, k, c in zip(roots, exp, strike, is_call)
+    ]
+
+    options = [
+        {
+            "option": code,
+            "bid": round(max(p - s, 0), 2),
+            "bid_size": int(b),
+            "ask": round(p + s, 2),
+            "ask_size": int(a),
+            "iv": round(float(v), 4),
+            "open_interest": float(o),
+            "volume": float(vol),
+            "delta": round(float(dl), 4),
+            "gamma": round(float(g), 4),
+            "theta": round(float(th), 4),
+            "rho": 0.0,
+            "vega": round(float(vg), 4),
+            "theo": round(float(p), 4),
+            "change": 0.0,
+            "open": round(float(p), 2),
+            "high": round(float(p * 1.05), 2),
+            "low": round(float(p * 0.95), 2),
+            "tick": ["up", "down", "no_change"][int(tk)],
+            "last_trade_price": round(float(p), 2),
+            "last_trade_time": today.strftime("%Y-%m-%dT%H:%M:%S"),
+            "percent_change": 0.0,
+            "prev_day_close": round(float(p), 4),
+        }
+        for code, p, s, b, a, v, o, vol, dl, g, th, vg, tk in zip(
+            codes, theo, spread, rng.integers(1, 500, exp.size), rng.integers(1, 500, exp.size),
+            iv_out, oi, volume, delta, gamma, theta, vega, rng.integers(0, 3, exp.size),
+        )
+    ]
+
+    return {
+        "timestamp": today.strftime("%Y-%m-%d %H:%M:%S"),
+        "data": {"symbol": symbol, "current_price": spot, "options": options},
+    }
+
+def make_symbol_info(symbol: str, spot: float, is_index: bool, expirations: list) -> dict:
+    """Builds a symbol-info payload."""
+
+    details = {
+        "symbol": symbol,
+        "security_type": "index" if is_index else "stock",
+        "current_price": spot,
+        "price_change": 1.25,
+        "price_change_percent": 0.31,
+        "tick": "up",
+        "open": spot * 0.99,
+        "high": spot * 1.01,
+        "low": spot * 0.98,
+        "close": spot,
+        "prev_day_close": spot - 1.25,
+        "iv30": 21.5,
+        "iv30_change": 0.4,
+        "iv30_change_percent": 1.9,
+        "iv30_percent_change": 1.9,
+        "last_trade_time": pd.Timestamp.today().strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if not is_index:
+        details.update(
+            {"bid": spot - 0.01, "ask": spot + 0.01, "bid_size": 100, "ask_size": 100,
+             "volume": 1000000, "exchange_id": 1}
+        )
+
+    return {"success": True, "details": details, "expirations": expirations}
+
+def make_historical(symbol: str, spot: float, days: int = 252, seed: int = 0) -> dict:
+    """Builds a historical_data payload with a year of daily bars and the annual ranges."""
+
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+    close = np.exp(np.cumsum(rng.normal(0, 0.012, days)))
+    close = close * spot / close[-1]
+    bars = [
+        {"date": d.strftime("%Y-%m-%d"), "open": round(c * 0.998, 2), "high": round(c * 1.01, 2),
+         "low": round(c * 0.99, 2), "close": round(c, 2), "volume": int(v)}
+        for d, c, v in zip(dates, close, rng.integers(10**5, 10**7, days))
+    ]
+    ranges = {
+        "annual_high": float(close.max()),
+        "annual_low": float(close.min()),
+    }
+    for window in ("hv30", "hv60", "hv90", "iv30", "iv60", "iv90"):
+        ranges[f"{window}_annual_high"] = round(float(rng.uniform(25, 40)), 2)
+        ranges[f"{window}_annual_low"] = round(float(rng.uniform(10, 18)), 2)
+
+    return {
+        "timestamp": pd.Timestamp.today().strftime("%Y-%m-%d %H:%M:%S"),
+        "data": {"symbol": symbol, **ranges, "data": bars},
+    }
+
+def make_directories(symbols: list, index_symbols: list) -> tuple:
+    """Builds the equity/index options listings CSV and the index definitions JSON."""
+
+    listings = pd.DataFrame(
+        {
+            "Company Name": [f"{s} Synthetic Co." for s in symbols],
+            " Stock Symbol": symbols,
+            " DPM Name": "Synthetic DPM",
+            " Post/Station": "1/1",
+        }
+    )
+    indices = [
+        {"calc_end_time": "16:15", "calc_start_time": "09:30", "currency": "USD",
+         "description": s, "display": True, "featured": False, "featured_order": 0,
+         "index_symbol": s, "mkt_data_delay": 15, "name": s, "tick_days": "Mon-Fri",
+         "frequency": "15s", "period": "", "time_zone": "America/Chicago"}
+        for s in index_symbols
+    ]
+
+    return listings.to_csv(index=False), json.dumps(indices)
+
+def write_fixtures(size: str, path: str = FIXTURES_DIR) -> str:
+    """Writes the fixture set for one size and returns its directory."""
+
+    symbol, spot, expirations, strikes, step, is_index = SIZES[size]
+    root = os.path.join(path, size)
+    for folder in ("symbol_info", "historical_data", "options", "directory"):
+        os.makedirs(os.path.join(root, folder), exist_ok=True)
+
+    options = make_options(symbol, spot, expirations, strikes, step)
+    expiration_dates = sorted(
+        {pd.Timestamp("20" + o["option"][-15:-9]).strftime("%Y-%m-%d")
+         for o in options["data"]["options"]}
+    )
+    listings, indices = make_directories(
+        ["AAPL", "QQQ", "SPY", "SPX", "VIX", "NDX", "RUT"] + [f"S{i:04d}" for i in range(4000)],
+        ["SPX", "VIX", "NDX", "RUT", "XSP", "DJX"],
+    )
+
+    with open(os.path.join(root, "options", f"{symbol}.json"), "w") as file:
+        json.dump(options, file)
+    with open(os.path.join(root, "symbol_info", f"{symbol}.json"), "w") as file:
+        json.dump(make_symbol_info(symbol, spot, is_index, expiration_dates), file)
+    with open(os.path.join(root, "historical_data", f"{symbol}.json"), "w") as file:
+        json.dump(make_historical(symbol, spot), file)
+    with open(os.path.join(root, "directory", "equity_index_options.csv"), "w") as file:
+        file.write(listings)
+    with open(os.path.join(root, "directory", "all_indices.json"), "w") as file:
+        file.write(indices)
+
+    return root
+
+if __name__ == "__main__":
+    for size in SIZES:
+        print(f"{size}: {write_fixtures(size)}")
@@ -0,0 +1,86 @@
+"""Many-user load test of Ticker.get_ticker against the replay provider
+
+Each simulated user is a thread that loads tickers in a loop, the way
+concurrent Streamlit sessions share one server process. Payloads come from
+a ReplayProvider at the configured latency, so CBOE is never contacted.
+
+Run from the repository root:
+
+python benchmarks/fixtures.py
+
+python benchmarks/load_test.py --fixtures benchmarks/fixtures/medium --users 16 --latency 0.2
+
+python benchmarks/load_test.py --fixtures benchmarks/fixtures/spx --users 8 --workers 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import warnings
+import numpy as np
+
+BENCH_DIR: str = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from data import cboe_model as cboe, workers
+from data.providers import ReplayProvider
+
+def user(symbols: list[str], stop_at: float, latencies: list[float], errors: list[int]) -> None:
+    """Loads the symbols in turn until `stop_at`, recording each load time."""
+
+    i = 0
+    while time.perf_counter() < stop_at:
+        symbol = symbols[i % len(symbols)]
+        start = time.perf_counter()
+        loaded = cboe.Ticker().get_ticker(symbol)
+        latencies.append(time.perf_counter() - start)
+        if not hasattr(loaded, "skew"):
+            errors.append(1)
+        i += 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=os.path.join(BENCH_DIR, "fixtures", "small"))
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=0, help="analytics worker processes")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)
+
+    cboe.set_provider(ReplayProvider(args.fixtures, latency=args.latency, jitter=args.jitter))
+    cboe.history = cboe.HistoryStore(tempfile.mkdtemp())
+    cboe.snapshots = cboe.SnapshotHistory(tempfile.mkdtemp())
+    symbols = sorted(
+        os.path.splitext(name)[0] for name in os.listdir(os.path.join(args.fixtures, "options"))
+    )
+    cboe.get_directory_names()
+    workers.set_workers(args.workers)
+    if args.workers:
+        # Starts the worker processes before the clock does.
+        cboe.Ticker().get_ticker(symbols[0])
+
+    latencies: list[float] = []
+    errors: list[int] = []
+    stop_at = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=user, args=(symbols, stop_at, latencies, errors))
+        for _ in range(args.users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    loads = np.array(latencies) * 1000
+    print(f"Users: {args.users}  Symbols: {', '.join(symbols)}  Provider latency: {args.latency}s  Workers: {args.workers}")
+    print(f"Loads: {loads.size}  Errors: {len(errors)}  Throughput: {loads.size / elapsed:.2f} loads/s")
+    if loads.size:
+        p50, p95, p99 = np.percentile(loads, [50, 95, 99])
+        print(f"Latency ms  p50: {p50:.0f}  p95: {p95:.0f}  p99: {p99:.0f}  max: {loads.max():.0f}")
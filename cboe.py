@@ -5,8 +5,13 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 from pandas import DataFrame
-from st_aggrid import AgGrid,ColumnsAutoSizeMode
+from st_aggrid import AgGrid,ColumnsAutoSizeMode,GridOptionsBuilder
 from data import cboe_model as cboe
+from data.presentation import presentations
+from data.scanner import scanner, screen
+from data import strategy, spreads
+from data.cube import CUBE_DIMENSIONS, CUBE_MEASURES
+from data import portfolio
 
 
 pd.set_option('display.max_rows', None)
@@ -14,8 +19,8 @@ pd.set_option('display.max_columns', None)
 pd.set_option('display.max_colwidth', 0)
 pd.set_option('display.colheader_justify', 'left')
 
-CBOE_DIRECTORY: DataFrame = cboe.get_cboe_directory()
-CBOE_INDEXES: DataFrame = cboe.get_cboe_index_directory()
+CBOE_DIRECTORY: DataFrame = cboe.get_directory()
+CBOE_INDEXES: DataFrame = cboe.get_index_directory()
 
     # Start of Dashboard Section
 st.set_page_config(
@@ -27,6 +32,130 @@ st.set_page_config(
     )
 st.title('CBOE Options Dashboard')
 
+with st.sidebar:
+    mode = st.radio(label = 'Mode', options = ['Ticker', 'Scanner', 'Portfolio'], key = 'mode')
+    profiler = st.checkbox(label = 'Profiler', value = False, key = 'profiler')
+
+# Timing is process-wide and costs little, so it stays on for every session. The checkbox only shows the panel.
+
+cboe.instrumentation.enabled = True
+
+def show_profiler() -> None:
+    with st.sidebar:
+        st.header('Profiler')
+        st.caption('Stages of every session on this server.')
+        st.dataframe(cboe.instrumentation.summary())
+        st.subheader('Last Load')
+        st.dataframe(cboe.instrumentation.last(30)[['Stage', 'Seconds', 'Bytes', 'Rows']])
+        st.subheader('Counters')
+        st.dataframe(pd.Series(dict(cboe.instrumentation.counters), name = 'Value', dtype = float))
+        st.subheader('Memory')
+        st.metric(
+            label = 'Cached Products (MB)',
+            value = round(cboe.governor.used / 2**20, 1),
+            delta = f"of {cboe.governor.budget / 2**20:.0f} MB budget",
+            delta_color = 'off',
+        )
+        st.dataframe(cboe.governor.usage(), hide_index = True)
+        st.download_button(
+            label = 'Export JSON',
+            data = cboe.instrumentation.to_json(),
+            file_name = 'cboe_profile.json',
+            mime = 'application/json',
+        )
+        st.download_button(
+            label = 'Export Prometheus',
+            data = cboe.instrumentation.to_prometheus(),
+            file_name = 'cboe_profile.prom',
+            mime = 'text/plain',
+        )
+        if st.button('Reset Profiler'):
+            cboe.instrumentation.reset()
+
+if mode == 'Scanner':
+    st.header('Options Scanner')
+    scan_col_1,scan_col_2,scan_col_3,scan_col_4 = st.columns(4)
+    with scan_col_1:
+        scanner.concurrency = int(st.number_input(label = 'Concurrent Symbols', min_value = 1, max_value = 64, value = scanner.concurrency))
+    with scan_col_2:
+        scanner.rate = float(st.number_input(label = 'Requests per Second', min_value = 1.0, max_value = 100.0, value = float(scanner.rate)))
+    with scan_col_3:
+        scanner.max_age = 3600 * float(st.number_input(label = 'Rescan After (Hours)', min_value = 0.0, value = scanner.max_age / 3600))
+    with scan_col_4:
+        st.write('\n')
+        if st.button('Start / Resume Scan'):
+            scanner.start()
+        if st.button('Stop Scan'):
+            scanner.stop()
+
+    progress: dict = scanner.progress
+    if progress['Total']:
+        st.progress(
+            progress['Done'] / progress['Total'],
+            text = f"{progress['Done']} of {progress['Total']} symbols scanned, {progress['Errors']} errors"
+            + (' (running)' if progress['Running'] else ''),
+        )
+    if progress['Running']:
+        st.button('Refresh')
+
+    scan_results: DataFrame = scanner.results()
+    filter_col_1,filter_col_2,filter_col_3 = st.columns(3)
+    with filter_col_1:
+        iv_rank = st.slider(label = 'IV Rank', min_value = 0.0, max_value = 100.0, value = (0.0, 100.0))
+    with filter_col_2:
+        put_call = st.slider(label = 'Put/Call OI Ratio', min_value = 0.0, max_value = 5.0, value = (0.0, 5.0))
+    with filter_col_3:
+        min_turnover = st.number_input(label = 'Minimum Turnover Ratio', min_value = 0.0, value = 0.0)
+    scan_results = screen(
+        scan_results.dropna(subset = ['IV30']),
+        {
+            'IV Rank': (iv_rank[0], iv_rank[1]),
+            'Put-Call Ratio': (put_call[0], None if put_call[1] >= 5.0 else put_call[1]),
+            'Turnover Ratio': (min_turnover, None),
+        },
+    )
+    st.write(f"{len(scan_results)} symbols match")
+    st.dataframe(scan_results, height = 600, use_container_width = True)
+    st.subheader('Unusual Activity')
+    st.dataframe(cboe.activity.top(), use_container_width = True, hide_index = True)
+
+    if profiler:
+        show_profiler()
+    st.stop()
+
+if mode == 'Portfolio':
+    st.header('Portfolio')
+    uploaded = st.file_uploader(label = 'Positions CSV (Symbol, Expiration, Strike, Type, Quantity)', type = ['csv'])
+    if uploaded is not None:
+        positions = portfolio.parse_positions(uploaded.getvalue())
+    else:
+        positions = portfolio.parse_positions(DataFrame(columns = portfolio.POSITION_COLUMNS))
+    positions = st.data_editor(
+        positions,
+        num_rows = 'dynamic',
+        use_container_width = True,
+        hide_index = True,
+        column_config = {
+            'Expiration': st.column_config.DateColumn(),
+            'Type': st.column_config.SelectboxColumn(options = ['Call', 'Put']),
+        },
+        key = f"positions_{uploaded.file_id if uploaded is not None else ''}",
+    )
+    if st.button('Refresh Portfolio'):
+        with cboe.instrumentation.stage('portfolio.refresh'):
+            st.session_state['portfolio'] = portfolio.load_portfolio(portfolio.parse_positions(positions))
+
+    if 'portfolio' in st.session_state:
+        legs, exposures = st.session_state['portfolio']
+        st.subheader('Exposures by Underlying')
+        st.dataframe(exposures, use_container_width = True)
+        st.subheader('Positions')
+        st.dataframe(legs, use_container_width = True, hide_index = True)
+
+    if profiler:
+        show_profiler()
+    st.stop()
+
 col_1,col_2,col_3,col_4,col_5,col_6,col_7,col_8,col_9,col_10 = st.columns([0.20,0.33,0.20,0.20,0.20,0.20,0.20,0.20,0.20,1])
 with col_1:
     symbol = st.text_input(label = 'Ticker', value = '', key = 'symbol')
@@ -42,11 +171,10 @@ else:
     
     if ticker:
         try:
-            ticker.by_expiration.index = ticker.by_expiration.index.astype(str)
-            ticker.skew.index = ticker.skew.index.astype(str)
-            ticker.chains = ticker.chains.reset_index()
-            ticker.chains.Expiration = ticker.chains.Expiration.astype(str)
-            ticker.chains = ticker.chains.set_index('Expiration')
+            with cboe.instrumentation.stage('render.presentation'):
+                presentation = presentations.get(ticker)
+                metrics: dict = presentation.metrics
+                charts: dict = presentation.charts
         
             with col_2:
                 st.write('\n')
@@ -72,62 +200,117 @@ else:
                 st.write('IV 30 - 1 Year Low')
             
             with col_7:
-                net_pcr: int = ((int(ticker.by_expiration['Put OI'].sum())) - (int(ticker.by_expiration['Call OI'].sum()))) 
-                st.metric(label = 'Put/Call OI Ratio', value = round(ticker.details['Put-Call Ratio'], ndigits = 4), delta = net_pcr)
+                st.metric(label = 'Put/Call OI Ratio', value = round(ticker.details['Put-Call Ratio'], ndigits = 4), delta = metrics['Net Put - Call OI'])
                 st.write('Net Put - Call OI')
             
             with col_8:
-                net_volume: int = ((int(ticker.by_expiration['Put Vol'].sum())) - (int(ticker.by_expiration['Call Vol'].sum())))
-                vol_ratio: float = ((ticker.by_expiration['Put Vol'].sum()) / (ticker.by_expiration['Call Vol'].sum()))
-                st.metric(label = 'Put/Call Vol Ratio', value = round(vol_ratio, ndigits = 4), delta = net_volume)
+                st.metric(label = 'Put/Call Vol Ratio', value = metrics['Put/Call Vol Ratio'], delta = metrics['Net Put - Call Vol'])
                 st.write('Net Put - Call Vol')
                 
             with col_9:
-                turnover_ratio: float = round(
-                    ((ticker.by_expiration['Put Vol'].sum()) + (ticker.by_expiration['Call Vol'].sum()))
-                    /((ticker.by_expiration['Put OI'].sum()) + (ticker.by_expiration['Call OI'].sum()))
-                ,ndigits = 4)
-                
-                turnover = (
-                    ((ticker.by_expiration['Put Vol'].sum()) + (ticker.by_expiration['Call Vol'].sum()))
-                    - ((ticker.by_expiration['Put OI'].sum()) + (ticker.by_expiration['Call OI'].sum()))
-                )
-                
-                st.metric(label = 'Turnover Ratio', value = turnover_ratio, delta = int(turnover))
+                st.metric(label = 'Turnover Ratio', value = metrics['Turnover Ratio'], delta = metrics['Net Volume - OI'])
                 st.write('Net Volume - OI')
             
             with col_10:
-                put_gex: float = ((ticker.by_expiration['Put GEX'].sum()) * (-1))
-                call_gex: float = (ticker.by_expiration['Call GEX'].sum())
-                net_gex = put_gex + call_gex
-                st.metric(label = 'Net Gamma Exposure', value = int(net_gex), delta = int(call_gex - put_gex))
+                st.metric(label = 'Net Gamma Exposure', value = metrics['Net GEX'], delta = metrics['Net Call - Put GEX'])
                 st.write('Net Call - Put GEX')
 
-            tab1,tab2,tab3 = st.tabs(["Summary", "Chains", "Charts"])
+            tab1,tab2,tab3,tab15,tab13 = st.tabs(["Summary", "Chains", "Charts", "Strategy", "History"])
 
             with tab1:
-                tab5,tab6 = st.tabs(['By Expiration', 'By Strike'])
+                tab5,tab6,tab16,tab18 = st.tabs(['By Expiration', 'By Strike', 'Unusual Activity', 'Explorer'])
                 with tab5:
-                    AgGrid(
-                        ticker.by_expiration.reset_index(),
-                        update_mode="value_changed",
-                        fit_columns_on_grid_load = True,
-                    )
+                    with cboe.instrumentation.stage('render.by_expiration'):
+                        AgGrid(
+                            presentation.grid('by_expiration'),
+                            gridOptions = presentation.grid_options.get('by_expiration'),
+                            update_mode="value_changed",
+                            fit_columns_on_grid_load = True,
+                        )
                 with tab6:
-                    AgGrid(
-                        ticker.by_strike.reset_index(), 
-                        update_mode="Value_changed",
-                        fit_columns_on_grid_load = True,
-                    )
+                    with cboe.instrumentation.stage('render.by_strike'):
+                        AgGrid(
+                            presentation.grid('by_strike'),
+                            gridOptions = presentation.grid_options.get('by_strike'),
+                            update_mode="Value_changed",
+                            fit_columns_on_grid_load = True,
+                        )
+                with tab16:
+                    st.subheader('Unusual Activity in 'f"{ticker.symbol}")
+                    st.dataframe(ticker.unusual_activity, use_container_width = True, hide_index = True)
+                    st.subheader('Unusual Activity Across Loaded and Scanned Tickers')
+                    st.dataframe(cboe.activity.top(), use_container_width = True, hide_index = True)
+                with tab18:
+                    st.subheader('Explore 'f"{ticker.symbol}"' by Expiration, Moneyness, Delta and Type')
+                    col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+                    with col_c1:
+                        cube_rows = st.selectbox(label = 'Rows', options = CUBE_DIMENSIONS, index = 0)
+                    with col_c2:
+                        cube_columns = st.selectbox(
+                            label = 'Columns',
+                            options = ['None'] + [dimension for dimension in CUBE_DIMENSIONS if dimension != cube_rows],
+                            index = 2,
+                        )
+                    with col_c3:
+                        cube_measure = st.selectbox(label = 'Measure', options = CUBE_MEASURES)
+                    with col_c4:
+                        cube_freq = st.selectbox(label = 'Expirations', options = ['Each', 'Weekly', 'Monthly'])
+                    cube_types = st.multiselect(label = 'Type', options = ['Call', 'Put'], default = ['Call', 'Put'])
+                    with cboe.instrumentation.stage('render.cube'):
+                        rollup = ticker.cube.rollup(
+                            cube_rows,
+                            None if cube_columns == 'None' else cube_columns,
+                            cube_measure,
+                            where = {'Type': cube_types},
+                            freq = {'Each': None, 'Weekly': 'W', 'Monthly': 'M'}[cube_freq],
+                        )
+                        if cube_rows == 'Expiration':
+                            rollup.index = rollup.index.strftime('%Y-%m-%d')
+                        if cube_columns == 'Expiration':
+                            rollup.columns = rollup.columns.strftime('%Y-%m-%d')
+                        if cube_columns == 'None':
+                            st.bar_chart(rollup, height = 400, use_container_width = True)
+                        else:
+                            # A heatmap of the roll-up, from its cells in long form.
+                            cells = rollup.rename_axis(index = cube_rows, columns = cube_columns).stack().rename(cube_measure).reset_index()
+                            st.vega_lite_chart(
+                                cells,
+                                {
+                                    'mark': 'rect',
+                                    'encoding': {
+                                        'x': {'field': cube_columns, 'type': 'ordinal', 'sort': list(rollup.columns)},
+                                        'y': {'field': cube_rows, 'type': 'ordinal', 'sort': list(rollup.index)},
+                                        'color': {'field': cube_measure, 'type': 'quantitative'},
+                                        'tooltip': [{'field': cube_rows}, {'field': cube_columns}, {'field': cube_measure}],
+                                    },
+                                },
+                                use_container_width = True,
+                            )
+                        st.dataframe(rollup, use_container_width = True)
 
             with tab2:
                     st.write('\n')
-                    AgGrid(
-                        ticker.chains.reset_index(),
-                        height = 600,
-                        update_mode="value_changed",
-                        columns_auto_size_mode = ColumnsAutoSizeMode.FIT_CONTENTS,
-                    )
+                    with cboe.instrumentation.stage('render.chains'):
+                        if ticker.table is not None:
+                            # Streamlit serializes Arrow Tables directly, without a pandas round trip.
+                            st.dataframe(ticker.table, height = 600, use_container_width = True, hide_index = True)
+                        else:
+                            # A lazy chain opens on its first expiration, so only that one is built.
+                            chains_expirations = ['All'] + list(ticker.by_expiration.index.astype(str))
+                            chains_expiration = st.selectbox(
+                                label = 'Expiration',
+                                options = chains_expirations,
+                                index = 1 if ticker.lazy is not None and len(chains_expirations) > 1 else 0,
+                                key = 'chains_expiration',
+                            )
+                            chains_grid = presentation.chains_grid(None if chains_expiration == 'All' else chains_expiration)
+                            AgGrid(
+                                chains_grid,
+                                gridOptions = presentation.grid_options.get('chains'),
+                                height = 600,
+                                update_mode="value_changed",
+                                columns_auto_size_mode = ColumnsAutoSizeMode.FIT_CONTENTS,
+                            )
 
             with tab3:
                 st.write('\n')  
@@ -137,11 +320,8 @@ else:
                     tab7,tab8,tab11 = st.tabs(["By Strike", "By Expiration", "Ratios"])
                     with tab7:
                         st.header(f"{ticker.symbol}"' Open Interest by Strike')
-                        chart1_data = pd.DataFrame(columns = ['Puts', 'Calls'])
-                        chart1_data.Puts = ticker.by_strike['Put OI']*(-1)
-                        chart1_data.Calls = ticker.by_strike['Call OI']
                         st.bar_chart(
-                            chart1_data,
+                            charts['oi_by_strike'],
                             y=['Puts', 'Calls'],
                             width=0,
                             height=600,
@@ -150,12 +330,8 @@ else:
                     with tab8:
                         st.write('\n')
                         st.header(f"{ticker.symbol}"' Open Interest by Expiration')
-                        chart2_data = pd.DataFrame(columns = ['Puts', 'Calls'])
-                        chart2_data.Puts = ticker.by_expiration['Put OI']*(-1)
-                        chart2_data.Calls = ticker.by_expiration['Call OI']
-                        chart2_data.fillna(axis = 1, value = 0, inplace = True)
                         st.bar_chart(
-                            chart2_data,
+                            charts['oi_by_expiration'],
                             y=['Puts', 'Calls'],
                             width=0,
                             height=600,
@@ -164,16 +340,9 @@ else:
                     with tab11:
                         st.write('\n')
                         st.header('Open Interest and Volume Ratios by Expiration for 'f"{ticker.symbol}")
-                        
-                        chart7_data = pd.DataFrame(columns = ['OI Ratio', 'Vol Ratio', 'Vol-OI Ratio'])
-                        chart7_data['OI Ratio'] = ticker.by_expiration['OI Ratio']
-                        chart7_data['Vol Ratio'] = ticker.by_expiration['Vol Ratio']
-                        chart7_data['Vol-OI Ratio'] = ticker.by_expiration['Vol-OI Ratio']
-                        chart7_data.replace([np.inf, -np.inf], np.nan, inplace=True)
-                        chart7_data.fillna(value = 0.0000, inplace = True)
-                        
+
                         st.line_chart(
-                            data = chart7_data,
+                            data = charts['ratios'],
                             use_container_width = True,
                             height = 450,
                             y = ['OI Ratio', 'Vol Ratio', 'Vol-OI Ratio'],
@@ -181,15 +350,11 @@ else:
                         
                 with tab5:
                     st.write('\n')
-                    tab7,tab8 = st.tabs(["By Strike", "By Expiration"])
+                    tab7,tab8,tab12 = st.tabs(["By Strike", "By Expiration", "Profile"])
                     with tab7:
                         st.header('Nominal Gamma Exposure Per 1% Change in 'f"{ticker.symbol}")
-                        chart3_data = pd.DataFrame(columns = ['Puts', 'Calls'])
-                        chart3_data.Puts = ticker.by_strike['Put GEX']
-                        chart3_data.Calls = ticker.by_strike['Call GEX']
-                        chart3_data.fillna(axis = 1, value = 0, inplace = True)
                         st.bar_chart(
-                            chart3_data,
+                            charts['gex_by_strike'],
                             y= ['Puts','Calls'],
                             use_container_width = True,
                             width=0,
@@ -197,54 +362,58 @@ else:
                         )
                     with tab8:
                         st.header('Nominal Gamma Exposure per 1% Change in 'f"{ticker.symbol}")
-                        chart4_data = pd.DataFrame(columns = ['Calls', 'Puts'])
-                        chart4_data.Puts = ticker.by_expiration['Put GEX']
-                        chart4_data.Calls = ticker.by_expiration['Call GEX']
-                        chart4_data.fillna(axis = 1, value = 0, inplace = True)
                         st.bar_chart(
-                            chart4_data,
+                            charts['gex_by_expiration'],
                             y=['Puts', 'Calls'],
                             use_container_width = True,
                             width=0,
                             height=600
                         )
+                    with tab12:
+                        st.header('Gamma Exposure Profile Across Spot Prices for 'f"{ticker.symbol}")
+                        gex_col_1,gex_col_2,gex_col_3 = st.columns(3)
+                        with gex_col_1:
+                            zero_gamma: float = ticker.gex_levels['Zero Gamma']
+                            st.metric(
+                                label = 'Zero Gamma Level',
+                                value = 'N/A' if np.isnan(zero_gamma) else zero_gamma,
+                                delta = None if np.isnan(zero_gamma) else round(zero_gamma - float(ticker.stock_price), ndigits = 2),
+                            )
+                            st.write('Flip Level - Current Price')
+                        with gex_col_2:
+                            st.metric(label = 'Call Wall', value = ticker.gex_levels['Call Wall'])
+                        with gex_col_3:
+                            st.metric(label = 'Put Wall', value = ticker.gex_levels['Put Wall'])
+                        st.line_chart(
+                            ticker.gex_profile,
+                            y = ['Call GEX', 'Put GEX', 'Net GEX'],
+                            use_container_width = True,
+                            height = 600,
+                        )
                 with tab6:
                     st.write('\n')
-                    tab9,tab10,tab11 = st.tabs(["Skew", "Smile", "Surface"])
+                    tab9,tab10,tab17,tab14,tab11 = st.tabs(["Skew", "Smile", "Implied Distribution", "Realized", "Surface"])
                     with tab9:
                         st.subheader('Implied Volatility Skew of 'f"{ticker.symbol}")
-                        chart5_data = ticker.skew
-                        chart5_data = (
-                            chart5_data.rename(columns = {
-                                'Call IV': 'ATM Call IV',
-                                'Put IV': '5% OTM Put IV'
-                            })
-                        )
-                        chart5_data.index = chart5_data.index.astype(str)
                         st._arrow_area_chart(
-                            chart5_data,
+                            charts['skew'],
                             y = ['IV Skew'],
                             use_container_width = True,
                             width = 0,
                             height = 450,
                         )
-                        AgGrid(
-                            ticker.skew.reset_index(),
-                            update_mode="value_changed",
-                            columns_auto_size_mode = ColumnsAutoSizeMode.FIT_CONTENTS,
-                        )
+                        with cboe.instrumentation.stage('render.skew'):
+                            AgGrid(
+                                presentation.grid('skew'),
+                                gridOptions = presentation.grid_options.get('skew'),
+                                update_mode="value_changed",
+                                columns_auto_size_mode = ColumnsAutoSizeMode.FIT_CONTENTS,
+                            )
 
                     with tab10:
-                        def get_chart6_data(choice) -> pd.DataFrame:
-                            chart6_data = pd.DataFrame(columns = ['Call IV', 'Put IV'])
-                            chart6_data['Call IV'] = ticker.calls.loc[choice]['IV'].reset_index(['Type'])['IV']
-                            chart6_data['Put IV'] = ticker.puts.loc[choice]['IV'].reset_index(['Type'])['IV']
-                            chart6_data = chart6_data.query("0 < `Call IV` and 0 < `Put IV`")
-                            return chart6_data
-
                         choice = st.selectbox(label = "Expiration Date", options = ticker.expirations)
 
-                        chart6_data = get_chart6_data(choice)
+                        chart6_data = presentation.smile(choice)
 
                         st.subheader("Volatility Smile of "f"{ticker.symbol}")                
                         st.line_chart(
@@ -254,10 +423,203 @@ else:
                             width = 0,
                             use_container_width = True,
                         )
+                        with st.expander('IV Solver Report'):
+                            st.write('Contracts where the CBOE IV was missing or zero, solved from Bid/Ask, Last Price or Theoretical.')
+                            st.dataframe(ticker.iv_report)
+                    with tab17:
+                        st.subheader('Risk-Neutral Distribution of 'f"{ticker.symbol}")
+                        density_expiration = st.selectbox(
+                            label = "Expiration Date",
+                            options = list(ticker.expected_range.index.strftime('%Y-%m-%d')),
+                            key = 'density_expiration',
+                        )
+                        if density_expiration is not None:
+                            expected_range = ticker.expected_range.loc[density_expiration]
+                            col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+                            col_r1.metric('Implied Low', expected_range['Implied Low'])
+                            col_r2.metric('Median', expected_range['Median'])
+                            col_r3.metric('Implied High', expected_range['Implied High'])
+                            col_r4.metric('Expected Move', expected_range['Expected Move'], f"{expected_range['Expected Move %']:.2f}%", delta_color = 'off')
+                            implied_density, touch = presentation.distribution(density_expiration)
+                            st.line_chart(implied_density, y = ['Density'], height = 450, use_container_width = True)
+                            with st.expander('Probability of Finishing In the Money and of Touch by Strike'):
+                                st.dataframe(touch, use_container_width = True)
+                            with st.expander('Expected Range by Expiration'):
+                                st.dataframe(ticker.expected_range, use_container_width = True)
+                    with tab14:
+                        st.subheader('Realized Volatility of 'f"{ticker.symbol}")
+                        col1,col2,col3,col4 = st.columns(4)
+                        col1.metric('IV30', ticker.iv_stats['IV30'])
+                        col2.metric('IV Rank', ticker.iv_stats['IV Rank'])
+                        col3.metric('IV Percentile', ticker.iv_stats['IV Percentile'])
+                        col4.metric('IV30 - HV30', ticker.iv_stats['IV30 - HV30'])
+                        st.line_chart(
+                            ticker.realized_vol,
+                            y = ['HV10', 'HV20', 'HV30', 'HV60', 'HV90'],
+                            height = 450,
+                            use_container_width = True,
+                        )
+                        st.dataframe(ticker.iv_stats)
                     with tab11:
                         st.write("Coming soon!")
 
+            with tab15:
+                st.write('\n')
+                payoff_tab, spreads_tab = st.tabs(['Payoff', 'Spread Screener'])
+                with payoff_tab:
+                    st.header('Strategy Payoff for 'f"{ticker.symbol}")
+                    col_s1, col_s2, col_s3 = st.columns(3)
+                    with col_s1:
+                        preset = st.selectbox(label = 'Strategy', options = list(strategy.STRATEGY_PRESETS))
+                    with col_s2:
+                        strategy_expiration = st.selectbox(label = 'Expiration', options = ticker.expirations, key = 'strategy_expiration')
+                    with col_s3:
+                        strike_step = st.number_input(label = 'Strikes Between Legs', min_value = 1, value = 1, step = 1)
+                    chain_expirations = ticker.by_expiration.index
+                    first_expiration = int(chain_expirations.searchsorted(pd.Timestamp(strategy_expiration)))
+                    preset_chains = ticker.expiration_chains(
+                        chain_expirations[min(first_expiration, len(chain_expirations) - 1):first_expiration + 2]
+                    )
+                    legs = st.data_editor(
+                        strategy.preset_legs(preset_chains, preset, float(ticker.stock_price), strategy_expiration, int(strike_step)),
+                        num_rows = 'dynamic',
+                        use_container_width = True,
+                        hide_index = True,
+                        key = f"legs_{preset}_{strategy_expiration}_{strike_step}",
+                    )
+                    try:
+                        with cboe.instrumentation.stage('strategy.payoff'):
+                            position = strategy.build_legs(ticker.expiration_chains(legs['Expiration'].dropna()), legs)
+                            payoff = strategy.calc_strategy_payoff(position, float(ticker.stock_price))
+                            scenarios = strategy.calc_strategy_pnl(position, float(ticker.stock_price))
+                    except KeyError as error:
+                        st.write(f"{error}")
+                    else:
+                        greeks = strategy.calc_strategy_greeks(position, float(ticker.stock_price))
+                        col_g1, col_g2, col_g3, col_g4 = st.columns(4)
+                        col_g1.metric('Cost', round(greeks['Cost'], ndigits = 2))
+                        col_g2.metric('Max Profit', round(payoff.attrs['Max Profit'], ndigits = 2))
+                        col_g3.metric('Max Loss', round(payoff.attrs['Max Loss'], ndigits = 2))
+                        col_g4.metric('Breakevens', ', '.join(str(price) for price in payoff.attrs['Breakevens']) or 'None')
+                        st.dataframe(greeks.drop('Cost').to_frame('Net').T, use_container_width = True)
+                        st.subheader('P&L at Today and at the First Expiration')
+                        st.line_chart(payoff, height = 400, use_container_width = True)
+                        spot_grid = strategy.calc_spot_grid(float(ticker.stock_price))
+                        days_grid = strategy.calc_days_grid(position)
+                        col_d1, col_d2 = st.columns(2)
+                        with col_d1:
+                            days_index = st.select_slider(
+                                label = 'Days Forward',
+                                options = list(range(len(days_grid))),
+                                value = 0,
+                                format_func = lambda index: f"{days_grid[index]:.1f}",
+                            )
+                        with col_d2:
+                            iv_index = st.select_slider(
+                                label = 'IV Shift',
+                                options = list(range(len(strategy.IV_SHIFTS))),
+                                value = int(np.flatnonzero(strategy.IV_SHIFTS == 0)[0]),
+                                format_func = lambda index: f"{strategy.IV_SHIFTS[index] * 100:+.1f} vol",
+                            )
+                        st.subheader(f"P&L {days_grid[days_index]:.1f} Days Forward")
+                        st.line_chart(
+                            DataFrame({'P&L': scenarios[:, days_index, iv_index]}, index = pd.Index(spot_grid, name = 'Spot')),
+                            height = 400,
+                            use_container_width = True,
+                        )
+
+                with spreads_tab:
+                    st.header('Vertical and Calendar Spreads for 'f"{ticker.symbol}")
+                    col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+                    with col_r1:
+                        spread_types = st.multiselect(label = 'Spreads', options = spreads.SPREAD_TYPES, default = list(spreads.VERTICAL_SPREADS))
+                    with col_r2:
+                        rank_by = st.selectbox(label = 'Rank By', options = spreads.RANK_COLUMNS)
+                    with col_r3:
+                        max_width = st.number_input(
+                            label = 'Max Width',
+                            min_value = 0.0,
+                            value = round(float(ticker.stock_price) * spreads.MAX_WIDTH_PCT, ndigits = 2),
+                        )
+                    with col_r4:
+                        min_oi = st.number_input(label = 'Min OI', min_value = 0, value = 100, step = 100)
+                    with cboe.instrumentation.stage('strategy.spreads'):
+                        spread_results = spreads.screen_spreads(
+                            ticker.calls,
+                            ticker.puts,
+                            float(ticker.stock_price),
+                            spread_types,
+                            rank_by = rank_by,
+                            ascending = rank_by == 'Max Loss',
+                            max_width = max_width,
+                            min_oi = int(min_oi),
+                        )
+                    spread_results['Expiration'] = spread_results['Expiration'].astype(str)
+                    spread_results['Long Expiration'] = spread_results['Long Expiration'].astype(str)
+                    AgGrid(
+                        spread_results,
+                        gridOptions = GridOptionsBuilder.from_dataframe(spread_results).build(),
+                        height = 600,
+                        update_mode="value_changed",
+                        fit_columns_on_grid_load = True,
+                    )
+
+            with tab13:
+                st.write('\n')
+                history_tab, replay_tab = st.tabs(['Summary Metrics', 'Intraday Replay'])
+                with history_tab:
+                    st.header('Summary Metrics History for 'f"{ticker.symbol}")
+                    st.caption('Times are in UTC. A row is recorded when a reload brings new data.')
+                    history_rule = st.selectbox(label = 'Resolution', options = ['Every Fetch', '1h', '1D', '1W'])
+                    if history_rule == 'Every Fetch':
+                        history_data = cboe.history.read(ticker.symbol)
+                    else:
+                        history_data = cboe.history.resample(ticker.symbol, rule = history_rule)
+                    if history_data.empty:
+                        st.write('No history has been recorded yet.')
+                    for metric in ([] if history_data.empty else cboe.history.columns):
+                        st.subheader(metric)
+                        st.line_chart(
+                            history_data,
+                            y = [metric],
+                            height = 300,
+                            use_container_width = True,
+                        )
+                with replay_tab:
+                    st.header('Intraday Replay of 'f"{ticker.symbol}")
+                    replay_days = cboe.snapshots.days(ticker.symbol)
+                    if not replay_days:
+                        st.write('No snapshots have been recorded yet.')
+                    else:
+                        replay_day = st.selectbox(label = 'Session', options = replay_days[::-1])
+                        replay_times = cboe.snapshots.times(ticker.symbol, replay_day)
+                        replay_time = st.select_slider(
+                            label = 'Time',
+                            options = list(replay_times),
+                            value = replay_times[-1],
+                            format_func = lambda timestamp: timestamp.strftime('%H:%M:%S UTC'),
+                        )
+                        replay_metric = st.selectbox(label = 'Metric', options = ['OI', 'Vol', 'GEX', 'Delta $'])
+                        replay_chains = cboe.snapshots.at(ticker.symbol, replay_time, day = replay_day)
+                        replay_by_strike = replay_chains[replay_metric].unstack('Type').groupby('Strike').sum()
+                        st.subheader(f"{replay_metric}"' by Strike at 'f"{replay_time.strftime('%H:%M:%S')}"' UTC')
+                        st.bar_chart(
+                            replay_by_strike.reindex(columns = ['Put', 'Call']).fillna(value = 0),
+                            height = 450,
+                            use_container_width = True,
+                        )
+                        st.subheader('Session Totals')
+                        st.line_chart(
+                            cboe.snapshots.totals(ticker.symbol, replay_day),
+                            y = [replay_metric],
+                            height = 300,
+                            use_container_width = True,
+                        )
+
         except Exception:
             st.write('Sorry, no data found')
     else:
         pass
+
+if profiler:
+    show_profiler()
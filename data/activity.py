@@ -0,0 +1,245 @@
+"""Unusual Options Activity Across Loaded and Scanned Tickers
+
+Every contract of a refreshed chain is scored in one vectorized pass from
+its volume against open interest, the premium traded, and its volume against
+a baseline of its final volume in the previous recorded sessions of the
+SnapshotHistory. Only the best `top` contracts of each symbol are kept, and
+a global heap of the best `top` across symbols is updated from them, so a
+refresh never re-scores or re-sorts the other symbols.
+"""
+
+import heapq
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional
+from pandas import DataFrame
+from .history import utc_now
+from .snapshots import SnapshotHistory, combine_roots
+
+__docformat__: Literal["numpy"] = "numpy"
+
+TOP_CONTRACTS: int = 50
+MIN_VOLUME: int = 100
+MIN_PREMIUM: float = 25_000.0
+BASELINE_DAYS: int = 5
+CONTRACT_SIZE: int = 100
+
+SCORED_COLUMNS: list[str] = ["DTE", "Vol", "OI", "Last Price", "Bid", "Ask", "Delta $", "% Change"]
+
+ACTIVITY_COLUMNS: list[str] = [
+    "Symbol",
+    "Expiration",
+    "Strike",
+    "Type",
+    "DTE",
+    "Vol",
+    "OI",
+    "Vol/OI",
+    "Baseline Vol",
+    "Vol Change",
+    "Premium",
+    "Delta $",
+    "% Change",
+    "Score",
+]
+
+#%%
+def calc_activity_scores(
+    chains_df: DataFrame,
+    baseline: Optional[pd.Series] = None,
+    min_volume: int = MIN_VOLUME,
+    min_premium: float = MIN_PREMIUM,
+) -> DataFrame:
+    """Scores every contract of a chain for unusual activity.
+
+    The Score is Vol/OI x sqrt(Vol Change) x log10(Premium), where Vol Change
+    is the volume over the baseline volume, or 1 without a baseline. Contracts
+    under `min_volume` or `min_premium` get a NaN Score.
+
+    Parameters
+    ----------
+    chains_df: pd.DataFrame
+        DataFrame of options chains, indexed by Expiration, Strike and Type.
+    baseline: pd.Series
+        Baseline daily volume by Expiration, Strike and Type.
+    min_volume: int
+        Least contracts traded.
+    min_premium: float
+        Least premium traded, in dollars.
+
+    Returns
+    -------
+    pd.DataFrame: ACTIVITY_COLUMNS without Symbol, indexed like `chains_df`.
+
+    Example
+    -------
+    scores = calc_activity_scores(ticker.chains)
+    """
+
+    volume = chains_df["Vol"].to_numpy(dtype=float)
+    oi = chains_df["OI"].to_numpy(dtype=float)
+    last = chains_df["Last Price"].to_numpy(dtype=float)
+    mid = (chains_df["Bid"].to_numpy(dtype=float) + chains_df["Ask"].to_numpy(dtype=float)) / 2
+    premium = volume * np.where(last > 0, last, mid) * CONTRACT_SIZE
+    baseline_volume = (
+        baseline.reindex(chains_df.index).to_numpy(dtype=float) if baseline is not None else np.full(len(volume), np.nan)
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_oi = volume / np.maximum(oi, 1)
+        vol_change = np.where(baseline_volume > 0, volume / baseline_volume, np.nan)
+        score = vol_oi * np.sqrt(np.where(np.isnan(vol_change), 1.0, vol_change)) * np.log10(premium)
+    score[(volume < min_volume) | ~(premium >= min_premium)] = np.nan
+
+    return DataFrame(
+        {
+            "DTE": chains_df["DTE"].to_numpy(),
+            "Vol": volume,
+            "OI": oi,
+            "Vol/OI": np.round(vol_oi, 4),
+            "Baseline Vol": baseline_volume,
+            "Vol Change": np.round(vol_change, 4),
+            "Premium": np.round(premium, 2),
+            "Delta $": chains_df["Delta $"].to_numpy(dtype=float),
+            "% Change": chains_df["% Change"].to_numpy(dtype=float),
+            "Score": np.round(score, 4),
+        },
+        index=chains_df.index,
+    )
+
+# %%
+class ActivityMonitor(object):
+    """Bounded top contracts by unusual activity, per symbol and across symbols.
+
+    Example
+    -------
+    activity = ActivityMonitor()
+
+    activity.update('SPX', ticker.chains, snapshots)
+
+    unusual = activity.top()
+    """
+
+    def __init__(
+        self,
+        top: int = TOP_CONTRACTS,
+        min_volume: int = MIN_VOLUME,
+        min_premium: float = MIN_PREMIUM,
+        baseline_days: int = BASELINE_DAYS,
+    ) -> None:
+        self.top_contracts = top
+        self.min_volume = min_volume
+        self.min_premium = min_premium
+        self.baseline_days = baseline_days
+        self._tops: dict = {}
+        self._global: list = []
+        self._baselines: dict = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def baseline(self, symbol: str, store: SnapshotHistory) -> Optional[pd.Series]:
+        """Mean final volume of each contract over the previous `baseline_days` recorded sessions.
+
+        Returns
+        -------
+        pd.Series: Baseline volume indexed by Expiration, Strike and Type, or None without earlier sessions.
+        """
+
+        # Sessions are named by their UTC day, as the snapshot stamps are UTC.
+
+        today = utc_now().strftime("%Y-%m-%d")
+        days = tuple(day for day in store.days(symbol) if day < today)[-self.baseline_days :]
+        if not days:
+            return None
+
+        key = (symbol.upper(), store.path)
+        with self._lock:
+            cached = self._baselines.get(key)
+        if cached is not None and cached[0] == days:
+            return cached[1]
+
+        sessions = [store.at(symbol, day=day)["Vol"] for day in days]
+        baseline = pd.concat(sessions, axis=1).mean(axis=1) if sessions else None
+        with self._lock:
+            self._baselines[key] = (days, baseline)
+
+        return baseline
+
+    def update(self, symbol: str, chains_df: DataFrame, store: Optional[SnapshotHistory] = None) -> DataFrame:
+        """Scores a refreshed chain and replaces the symbol's contracts in the per-symbol and global tops.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker the chain belongs to.
+        chains_df: pd.DataFrame
+            DataFrame of options chains, indexed by Expiration, Strike and Type.
+        store: SnapshotHistory
+            Recorded sessions for the baseline volume. Without one, Vol Change is NaN.
+
+        Returns
+        -------
+        pd.DataFrame: The symbol's top contracts, highest Score first.
+        """
+
+        symbol = symbol.upper()
+        baseline = self.baseline(symbol, store) if store is not None else None
+
+        # The baseline is recorded with the roots of a key combined (SPX and SPXW), so the chain is scored so too.
+
+        chains_df = combine_roots(chains_df, SCORED_COLUMNS)
+        scores = calc_activity_scores(chains_df, baseline, self.min_volume, self.min_premium)
+
+        # Only the best contracts are ranked, after an O(n) partition of the scored ones.
+
+        score = scores["Score"].to_numpy()
+        ranked = np.flatnonzero(~np.isnan(score))
+        if len(ranked) > self.top_contracts:
+            ranked = ranked[np.argpartition(score[ranked], -self.top_contracts)[-self.top_contracts :]]
+        top = scores.iloc[ranked].reset_index()
+        top.insert(0, "Symbol", symbol)
+        top = top[ACTIVITY_COLUMNS].sort_values("Score", ascending=False, ignore_index=True)
+        rows = list(top.itertuples(index=False, name=None))
+
+        with self._lock:
+            self._tops[symbol] = top
+
+            # Entries of the symbol's previous refresh must leave the global top, so it is rebuilt from the
+            # per-symbol tops. Otherwise the new rows are merged into it.
+
+            if any(item[2] == symbol for item in self._global):
+                candidates = (
+                    (row[-1], next(self._counter), row[0], row)
+                    for frame in self._tops.values()
+                    for row in frame.itertuples(index=False, name=None)
+                )
+                self._global = heapq.nlargest(self.top_contracts, candidates)
+                heapq.heapify(self._global)
+            else:
+                for row in rows:
+                    item = (row[-1], next(self._counter), symbol, row)
+                    if len(self._global) < self.top_contracts:
+                        heapq.heappush(self._global, item)
+                    elif item[0] > self._global[0][0]:
+                        heapq.heappushpop(self._global, item)
+
+        return top
+
+    def top(self, symbol: Optional[str] = None) -> DataFrame:
+        """The top contracts of one symbol, or across every updated symbol, highest Score first."""
+
+        with self._lock:
+            if symbol is not None:
+                frame = self._tops.get(symbol.upper())
+                return frame.copy() if frame is not None else DataFrame(columns=ACTIVITY_COLUMNS)
+            items = sorted(self._global, reverse=True)
+
+        return DataFrame([item[3] for item in items], columns=ACTIVITY_COLUMNS)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tops.clear()
+            self._global.clear()
+            self._baselines.clear()
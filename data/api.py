@@ -0,0 +1,298 @@
+"""Local HTTP/JSON API over the Ticker Analytics
+
+Serves the chains, by_expiration, by_strike, skew and iv frames of loaded
+tickers to other tools, from one warm cache shared by every client. Encoded
+bodies are cached per ticker version and carry an ETag derived from it, so
+clients revalidate with If-None-Match and get a 304 until the options
+payload, the price or the annual ranges change. Large bodies are sent with chunked transfer
+encoding, and chains can be streamed as NDJSON or an Arrow IPC stream.
+
+Run from the repository root:
+
+python -m data.api --port 8502 --max-age 60
+
+GET /tickers/SPX/by_expiration
+
+GET /tickers/SPX/chains?format=ndjson
+
+GET /tickers/SPX/chains?format=arrow
+"""
+
+import io
+import json
+import time
+import argparse
+import threading
+import collections
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Literal, Optional
+from urllib.parse import parse_qs, urlsplit
+from pandas import DataFrame
+from . import cboe_model as cboe
+from .arrow_chains import pa
+
+__docformat__: Literal["numpy"] = "numpy"
+
+API_PORT: int = 8502
+MAX_AGE: float = 60.0
+MAX_BODIES: int = 256
+MAX_TICKERS: int = 32
+CHUNK_ROWS: int = 5000
+CHUNK_BYTES: int = 64 * 1024
+
+# Frame served by each dataset, with a flat index for every format.
+
+DATASETS: dict = {
+    "chains": lambda ticker: ticker.chains.reset_index(),
+    "by_expiration": lambda ticker: ticker.by_expiration.reset_index(),
+    "by_strike": lambda ticker: ticker.by_strike.reset_index(),
+    "skew": lambda ticker: ticker.skew.reset_index(),
+    "expected_range": lambda ticker: ticker.expected_range.reset_index(),
+    "iv": lambda ticker: pd.to_numeric(ticker.iv, errors="coerce").rename_axis("Metric").rename("Value").reset_index(),
+}
+
+CONTENT_TYPES: dict = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+#%%
+def encode_json(frame: DataFrame) -> Iterator[bytes]:
+    """Encodes a frame as one JSON array of records."""
+
+    yield frame.to_json(orient="records", date_format="iso").encode()
+
+def encode_ndjson(frame: DataFrame) -> Iterator[bytes]:
+    """Encodes a frame as one JSON record per line, CHUNK_ROWS rows at a time."""
+
+    for start in range(0, len(frame), CHUNK_ROWS):
+        chunk = frame.iloc[start : start + CHUNK_ROWS]
+        yield (chunk.to_json(orient="records", lines=True, date_format="iso").rstrip("\n") + "\n").encode()
+
+def encode_arrow(frame: DataFrame) -> Iterator[bytes]:
+    """Encodes a frame as an Arrow IPC stream, one record batch of CHUNK_ROWS rows at a time."""
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+ENCODERS: dict = {"json": encode_json, "ndjson": encode_ndjson, "arrow": encode_arrow}
+
+# %%
+class TickerCache(object):
+    """Loaded tickers shared by every API client, reloaded once older than `max_age`.
+
+    Concurrent requests for the same symbol wait for one load. Stale tickers
+    are dropped, and at most `max_tickers` are kept, least recently used
+    first out. Encoded bodies are kept per (symbol, version, dataset,
+    format), so a reload that returns unchanged payloads reuses them.
+
+    Parameters
+    ----------
+    max_age: float
+        Seconds before a loaded ticker is fetched again.
+    max_bodies: int
+        Encoded bodies kept, least recently used first out.
+    max_tickers: int
+        Loaded tickers kept, least recently used first out.
+
+    Example
+    -------
+    cache = TickerCache(max_age = 60)
+
+    spx = cache.ticker('SPX')
+    """
+
+    def __init__(self, max_age: float = MAX_AGE, max_bodies: int = MAX_BODIES, max_tickers: int = MAX_TICKERS) -> None:
+        self.max_age = max_age
+        self.max_bodies = max_bodies
+        self.max_tickers = max_tickers
+        self._tickers: collections.OrderedDict = collections.OrderedDict()
+        self._loading: dict = {}
+        self._bodies: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def ticker(self, symbol: str) -> Optional[cboe.Ticker]:
+        """Returns the loaded ticker, loading it if it is missing or stale. None if there is no data."""
+
+        symbol = symbol.upper()
+        with self._lock:
+            loaded = self._tickers.get(symbol)
+            if loaded is not None and time.monotonic() - loaded[1] < self.max_age:
+                self._tickers.move_to_end(symbol)
+                return loaded[0]
+            lock = self._loading.setdefault(symbol, threading.Lock())
+
+        with lock:
+            with self._lock:
+                loaded = self._tickers.get(symbol)
+            if loaded is not None and time.monotonic() - loaded[1] < self.max_age:
+                return loaded[0]
+
+            ticker = cboe.Ticker().get_ticker(symbol)
+            if not hasattr(ticker, "summary"):
+                return None
+            with self._lock:
+                now = time.monotonic()
+                self._tickers[symbol] = (ticker, now)
+                self._tickers.move_to_end(symbol)
+
+                # A stale ticker would be loaded again on its next request anyway, so it is not worth keeping.
+
+                for stale in [key for key, (_, loaded_at) in self._tickers.items() if now - loaded_at >= self.max_age]:
+                    del self._tickers[stale]
+                while len(self._tickers) > self.max_tickers:
+                    self._tickers.popitem(last=False)
+
+        return ticker
+
+    def body(self, key: tuple) -> Optional[bytes]:
+        """Returns a cached encoded body, or None."""
+
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+
+        return body
+
+    def store(self, key: tuple, body: bytes) -> None:
+        """Caches an encoded body."""
+
+        with self._lock:
+            self._bodies[key] = body
+            while len(self._bodies) > self.max_bodies:
+                self._bodies.popitem(last=False)
+
+# %%
+class ApiHandler(BaseHTTPRequestHandler):
+    """Serves GET /tickers/<SYMBOL>/<dataset>?format=json|ndjson|arrow and GET /health."""
+
+    protocol_version = "HTTP/1.1"
+    cache: TickerCache = TickerCache()
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["health"]:
+            return self.send_body(200, b'{"status": "ok"}', "application/json")
+        if len(parts) != 3 or parts[0] != "tickers" or parts[2] not in DATASETS:
+            return self.send_error_json(404, "Use /tickers/<SYMBOL>/<" + "|".join(DATASETS) + ">")
+
+        symbol, dataset = parts[1].upper(), parts[2]
+        query = parse_qs(url.query)
+        fmt = query.get("format", [self.accepted_format()])[0]
+        if fmt not in ENCODERS or (fmt == "arrow" and pa is None):
+            return self.send_error_json(400, f"Unsupported format: {fmt}")
+
+        ticker = self.cache.ticker(symbol)
+        if ticker is None:
+            return self.send_error_json(404, f"No data found for the symbol: {symbol}")
+
+        # The version changes whenever the options payload, the price or the annual ranges do.
+
+        version = getattr(ticker, "version", "") or str(id(ticker))
+        etag = f'"{version}-{dataset}-{fmt}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        key = (symbol, version, dataset, fmt)
+        body = self.cache.body(key)
+        if body is not None:
+            return self.send_body(200, body, CONTENT_TYPES[fmt], etag)
+
+        chunks = ENCODERS[fmt](DATASETS[dataset](ticker))
+        self.cache.store(key, self.send_chunked(chunks, CONTENT_TYPES[fmt], etag))
+
+    def accepted_format(self) -> str:
+        """Picks the format from the Accept header when no format is given in the query."""
+
+        accept = self.headers.get("Accept", "")
+        for fmt, content_type in CONTENT_TYPES.items():
+            if content_type in accept:
+                return fmt
+
+        return "json"
+
+    def send_headers(self, status: int, content_type: str, etag: Optional[str]) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={int(self.cache.max_age)}")
+
+    def send_body(self, status: int, body: bytes, content_type: str, etag: Optional[str] = None) -> None:
+        """Sends a complete body, chunked when it is larger than CHUNK_BYTES."""
+
+        if len(body) > CHUNK_BYTES:
+            chunks = (body[start : start + CHUNK_BYTES] for start in range(0, len(body), CHUNK_BYTES))
+            self.send_chunked(chunks, content_type, etag, status)
+            return None
+
+        self.send_headers(status, content_type, etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunked(
+        self, chunks: Iterator[bytes], content_type: str, etag: Optional[str], status: int = 200
+    ) -> bytes:
+        """Sends the chunks as they are encoded, with chunked transfer encoding, and returns the whole body."""
+
+        self.send_headers(status, content_type, etag)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = []
+        for chunk in chunks:
+            if chunk:
+                self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                sent.append(chunk)
+        self.wfile.write(b"0\r\n\r\n")
+
+        return b"".join(sent)
+
+    def send_error_json(self, status: int, message: str) -> None:
+        self.send_body(status, json.dumps({"error": message}).encode(), "application/json")
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+def serve(host: str = "127.0.0.1", port: int = API_PORT, max_age: float = MAX_AGE) -> None:
+    """Runs the API until interrupted.
+
+    Example
+    -------
+    serve(port = 8502, max_age = 60)
+    """
+
+    ApiHandler.cache = TickerCache(max_age=max_age)
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    print(f"Serving the CBOE API on http://{host}:{port}/tickers/<SYMBOL>/<dataset>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--max-age", type=float, default=MAX_AGE)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.max_age)
@@ -0,0 +1,265 @@
+"""Arrow-Backed Options Chains
+
+Decodes the delayed_quotes/options payload straight into a pyarrow Table and
+runs the OCC parsing, enrichment and expiration/strike aggregations with Arrow
+compute kernels, so large chains are not materialised as Python dicts and
+object-dtype frames along the way. pyarrow is optional; `pa` is None when it
+is not installed.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Literal, Tuple
+from pandas import DataFrame
+from .iv_solver import get_solver_prices, solve_iv
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.json as pa_json
+except ImportError:
+    pa = None
+
+__docformat__: Literal["numpy"] = "numpy"
+
+CHAINS_INDEX: list[str] = ["Expiration", "Strike", "Type"]
+
+# Payload field, renamed column and Arrow type of every option quote.
+
+OPTION_FIELDS: list[tuple] = [
+    ("option", "Option Symbol", "string"),
+    ("bid", "Bid", "float64"),
+    ("bid_size", "Bid Size", "float64"),
+    ("ask", "Ask", "float64"),
+    ("ask_size", "Ask Size", "float64"),
+    ("iv", "IV", "float64"),
+    ("open_interest", "OI", "float64"),
+    ("volume", "Vol", "float64"),
+    ("delta", "Delta", "float64"),
+    ("gamma", "Gamma", "float64"),
+    ("theta", "Theta", "float64"),
+    ("rho", "Rho", "float64"),
+    ("vega", "Vega", "float64"),
+    ("theo", "Theoretical", "float64"),
+    ("change", "Change", "float64"),
+    ("open", "Open", "float64"),
+    ("high", "High", "float64"),
+    ("low", "Low", "float64"),
+    ("tick", "Tick", "string"),
+    ("last_trade_price", "Last Price", "float64"),
+    ("last_trade_time", "Timestamp", "string"),
+    ("percent_change", "% Change", "float64"),
+    ("prev_day_close", "Prev Close", "float64"),
+]
+
+#%%
+def is_table(chains: object) -> bool:
+    """Returns True if `chains` is a non-empty pyarrow Table."""
+
+    return pa is not None and isinstance(chains, pa.Table) and chains.num_rows > 0
+
+def read_options(payload: bytes) -> "pa.Table":
+    """Parses the options list of a delayed_quotes/options payload into a Table.
+
+    The JSON is parsed by Arrow's native reader against a fixed schema, so no
+    Python objects are created per contract.
+    """
+
+    option_type = pa.struct([(field, getattr(pa, kind)()) for field, _, kind in OPTION_FIELDS])
+    schema = pa.schema([("data", pa.struct([("options", pa.list_(option_type))]))])
+    payload_table = pa_json.read_json(
+        pa.BufferReader(payload),
+        read_options=pa_json.ReadOptions(block_size=len(payload) + 1),
+        parse_options=pa_json.ParseOptions(
+            explicit_schema=schema, unexpected_field_behavior="ignore", newlines_in_values=True
+        ),
+    )
+    options = payload_table.column("data").combine_chunks().field("options").flatten()
+    options_table = pa.Table.from_struct_array(options)
+
+    return options_table.rename_columns([column for _, column, _ in OPTION_FIELDS])
+
+def decode_chains(payload: bytes, last_price: float) -> "pa.Table":
+    """Decodes, parses and enriches an options payload as a pyarrow Table.
+
+    Produces the same columns as get_ticker_chains, with Expiration, Strike and
+    Type as leading columns instead of an index, sorted in index order.
+
+    Parameters
+    ----------
+    payload: bytes
+        The raw delayed_quotes/options JSON.
+    last_price: float
+        Price of the underlying.
+
+    Returns
+    -------
+    pa.Table: chains_table
+
+    Example
+    -------
+    chains_table = decode_chains(provider.options('SPX', index = True), 4000)
+    """
+
+    options = read_options(payload)
+
+    # OCC symbols end with a yymmdd expiration, a C/P flag and the strike x 1000.
+
+    option_symbol = options.column("Option Symbol")
+    expiration = pc.strptime(
+        pc.utf8_slice_codeunits(option_symbol, -15, -9), format="%y%m%d", unit="s"
+    ).cast(pa.timestamp("ns"))
+    is_call = pc.equal(pc.utf8_slice_codeunits(option_symbol, -9, -8), "C")
+    strike = pc.divide(pc.utf8_slice_codeunits(option_symbol, -8).cast(pa.float64()), 1000.0)
+    option_type = pc.if_else(is_call, "Call", "Put")
+    side = pc.if_else(is_call, 1.0, -1.0)
+
+    ask = options.column("Ask")
+    oi = options.column("OI")
+    breakeven = pc.add(strike, pc.multiply(side, ask))
+    to_spot = pc.round(pc.subtract(breakeven, last_price), 2)
+    delta_dollars = pc.multiply(
+        pc.multiply(pc.multiply(options.column("Delta"), 100), oi), last_price * 1.0
+    )
+    gex = pc.multiply(
+        pc.multiply(pc.multiply(pc.multiply(options.column("Gamma"), 100), oi), last_price * last_price),
+        0.01,
+    )
+
+    # Whole days from now to the expiration, counting the expiration day.
+
+    dte = pc.days_between(pa.scalar(date.today()), expiration.cast(pa.date32()))
+    tick = pc.replace_substring(pc.utf8_capitalize(options.column("Tick")), "No_change", "No Change")
+
+    columns = {
+        "Expiration": expiration,
+        "Strike": strike,
+        "Type": option_type,
+        "DTE": dte,
+        "Tick": tick,
+        "Last Price": options.column("Last Price"),
+        "% Change": pc.round(options.column("% Change"), 4),
+        "Theoretical": pc.round(options.column("Theoretical"), 2),
+        "$ to Spot": to_spot,
+        "% to Spot": pc.round(pc.multiply(pc.divide(to_spot, last_price * 1.0), 100), 4),
+        "Breakeven": breakeven,
+        "Vol": options.column("Vol").cast(pa.int64(), safe=False),
+        "OI": oi.cast(pa.int64(), safe=False),
+        "Delta $": pc.multiply(delta_dollars, side).cast(pa.int64(), safe=False),
+        "GEX": gex.cast(pa.int64(), safe=False),
+    }
+    for column in ["IV", "Theta", "Delta", "Gamma", "Vega", "Rho", "Open", "High", "Low"]:
+        columns[column] = options.column(column)
+    columns["Prev Close"] = pc.round(options.column("Prev Close"), 2)
+    columns["Bid Size"] = options.column("Bid Size").cast(pa.int64(), safe=False)
+    columns["Bid"] = options.column("Bid")
+    columns["Ask"] = ask
+    columns["Ask Size"] = options.column("Ask Size").cast(pa.int64(), safe=False)
+    columns["Timestamp"] = options.column("Timestamp")
+
+    chains_table = pa.table(columns)
+
+    return chains_table.sort_by([(column, "ascending") for column in CHAINS_INDEX])
+
+def fill_missing_iv(chains_table: "pa.Table", last_price: float, rate: float = 0.0) -> Tuple["pa.Table", pd.Series]:
+    """Fills in IV for contracts where the CBOE value is missing or zero.
+
+    Only the unpriced rows are taken out of the Table for the solver.
+
+    Returns
+    -------
+    Tuple[pa.Table, pd.Series]: chains_table,report
+        The chains with IV filled in, and the solver's convergence report.
+    """
+
+    iv = chains_table.column("IV").to_numpy()
+    missing = ~(iv > 0)
+    rows = chains_table.filter(pa.array(missing)).select(
+        ["Strike", "Type", "DTE", "Bid", "Ask", "Last Price", "Theoretical"]
+    ).to_pandas()
+    t = np.maximum(rows["DTE"].to_numpy(dtype=float), 1) / 365
+    solved, report = solve_iv(
+        get_solver_prices(rows), last_price, rows["Strike"].to_numpy(dtype=float), t,
+        rows["Type"].to_numpy() == "Call", rate,
+    )
+
+    iv = iv.copy()
+    iv[missing] = np.round(np.nan_to_num(solved, nan=0.0), 4)
+    chains_table = chains_table.set_column(
+        chains_table.schema.get_field_index("IV"), "IV", pa.array(iv)
+    )
+
+    return chains_table, report
+
+def with_report(chains_table: "pa.Table", report: pd.Series, snapshot: str = "") -> "pa.Table":
+    """Stores the IV solver report and the payload's snapshot id in the Table's schema metadata."""
+
+    return chains_table.replace_schema_metadata(
+        {"IV Solver": json.dumps(report.to_dict(), default=float), "Snapshot": snapshot}
+    )
+
+def to_pandas(chains_table: "pa.Table") -> DataFrame:
+    """Converts a chains Table to the pandas layout used by the rest of the model.
+
+    Numeric columns are converted block by block, so columns without nulls are
+    not copied, and the index is attached without a set_index copy.
+
+    Returns
+    -------
+    pd.DataFrame: Indexed by Expiration, Strike and Type, with the IV solver report and snapshot id in attrs.
+    """
+
+    if chains_table.num_rows == 0:
+        return DataFrame()
+
+    index = pd.MultiIndex.from_arrays(
+        [chains_table.column(column).to_pandas() for column in CHAINS_INDEX], names=CHAINS_INDEX
+    )
+    chains_df = chains_table.drop_columns(CHAINS_INDEX).to_pandas(split_blocks=True)
+    chains_df.index = index
+    metadata = chains_table.schema.metadata or {}
+    if b"IV Solver" in metadata:
+        chains_df.attrs["IV Solver"] = json.loads(metadata[b"IV Solver"])
+    if b"Snapshot" in metadata:
+        chains_df.attrs["Snapshot"] = metadata[b"Snapshot"].decode()
+
+    return chains_df
+
+def sum_by_type(chains_table: "pa.Table", key: str) -> Tuple[DataFrame, DataFrame]:
+    """Sums OI, Vol, Delta $ and GEX by `key` for calls and puts with one Arrow group-by.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, pd.DataFrame]: calls_by_key,puts_by_key
+        Indexed by `key` in ascending order.
+    """
+
+    columns = ["OI", "Vol", "Delta $", "GEX"]
+    sums = chains_table.group_by([key, "Type"]).aggregate([(column, "sum") for column in columns])
+    sums = sums.rename_columns(
+        [name[:-4] if name.endswith("_sum") else name for name in sums.column_names]
+    )
+
+    by_type = []
+    for option_type in ["Call", "Put"]:
+        side = sums.filter(pc.equal(sums.column("Type"), option_type)).sort_by(key)
+        side_df = side.select(columns).to_pandas()
+        side_df.index = pd.Index(side.column(key).to_pandas(), name=key)
+        by_type.append(side_df)
+
+    return by_type[0], by_type[1]
+
+def calc_expected_move(chains_table: "pa.Table") -> "pa.Table":
+    """Adds the Expected Move column, Last Price x IV x sqrt(DTE / 252)."""
+
+    expected_move = pc.round(
+        pc.multiply(
+            pc.multiply(chains_table.column("Last Price"), chains_table.column("IV")),
+            pc.sqrt(pc.divide(chains_table.column("DTE").cast(pa.float64()), 252.0)),
+        ),
+        2,
+    )
+
+    return chains_table.append_column("Expected Move", expected_move)
@@ -0,0 +1,439 @@
+"""Async Counterparts of the CBOE Model Fetchers
+
+The requests run on one shared httpx.AsyncClient when httpx is installed and
+the live CBOE provider is in use. Otherwise, i.e. for the replay and recording
+providers, the synchronous provider runs in a thread pool sized for many
+requests in flight. Decoding and analytics reuse the parsers of cboe_model
+and run in threads, so one event loop can drive hundreds of symbol loads.
+
+Example
+-------
+import asyncio
+from data import async_model
+
+spx = asyncio.run(async_model.get_ticker('SPX', timeout = 30))
+
+tickers = asyncio.run(async_model.get_tickers(['AAPL', 'MSFT', 'SPX'], concurrency = 100))
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Literal, Optional, Tuple
+import pandas as pd
+from pandas import DataFrame
+from . import cboe_model as cboe
+from .instrumentation import instrumentation
+from .providers import (
+    CboeProvider,
+    DataProvider,
+    EQUITY_DIRECTORY_URL,
+    HISTORICAL_DATA_URL,
+    INDEX_DIRECTORY_URL,
+    OPTIONS_URL,
+    SYMBOL_INFO_URL,
+    ValidatorCache,
+)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+__docformat__: Literal["numpy"] = "numpy"
+
+ASYNC_CONCURRENCY: int = 100
+
+#%%
+class AsyncProvider(object):
+    """Async interface for the sources of raw CBOE payloads, mirroring DataProvider."""
+
+    async def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def equity_directory(self) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def index_directory(self) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Releases the connections or threads held by the provider."""
+
+class AsyncCboeProvider(AsyncProvider):
+    """Live provider for www.cboe.com and cdn.cboe.com over one pooled httpx.AsyncClient.
+
+    The client is created on first use in the running event loop, and again if
+    a later call runs in a different loop, i.e. a new asyncio.run.
+
+    Parameters
+    ----------
+    timeout: float
+        Seconds allowed for each request, or None for no limit.
+    max_connections: int
+        Connections kept open to the CBOE hosts.
+    validators: ValidatorCache
+        ETag and Last-Modified validators for conditional requests. A new cache by default.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_connections: int = ASYNC_CONCURRENCY,
+        validators: Optional[ValidatorCache] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.validators = validators if validators is not None else ValidatorCache()
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections),
+            )
+            self._loop = loop
+
+        return self._client
+
+    async def get(self, url: str) -> Optional[bytes]:
+        """Gets a URL and returns the body, or None if the status is not 200 or 304."""
+
+        r = await self.client.get(url, headers=self.validators.headers(url))
+        if r.status_code == 304:
+            return self.validators.not_modified(url)
+        if r.status_code != 200:
+            return None
+        self.validators.store(url, r.headers, r.content)
+
+        return r.content
+
+    async def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return await self.get(SYMBOL_INFO_URL + ("^" if index else "") + symbol)
+
+    async def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return await self.get(HISTORICAL_DATA_URL + ("_" if index else "") + f"{symbol}.json")
+
+    async def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return await self.get(OPTIONS_URL + ("_" if index else "") + f"{symbol}.json")
+
+    async def equity_directory(self) -> Optional[bytes]:
+        return await self.get(EQUITY_DIRECTORY_URL)
+
+    async def index_directory(self) -> Optional[bytes]:
+        return await self.get(INDEX_DIRECTORY_URL)
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+class ThreadedProvider(AsyncProvider):
+    """Runs a synchronous DataProvider in a thread pool of its own.
+
+    The pool is separate from asyncio's default executor, which is kept for
+    parsing, so blocked requests never hold up the decoding of finished ones.
+
+    Parameters
+    ----------
+    provider: DataProvider
+        i.e. ReplayProvider, RecordingProvider or RateLimitedProvider.
+    max_workers: int
+        Requests in flight at once.
+    """
+
+    def __init__(self, provider: DataProvider, max_workers: int = ASYNC_CONCURRENCY) -> None:
+        self.provider = provider
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cboe-fetch")
+
+    async def _run(self, method: Callable, *args: object) -> Optional[bytes]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    async def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return await self._run(self.provider.symbol_info, symbol, index)
+
+    async def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return await self._run(self.provider.historical_data, symbol, index)
+
+    async def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return await self._run(self.provider.options, symbol, index)
+
+    async def equity_directory(self) -> Optional[bytes]:
+        return await self._run(self.provider.equity_directory)
+
+    async def index_directory(self) -> Optional[bytes]:
+        return await self._run(self.provider.index_directory)
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+# %%
+
+    # One async provider is shared by every call, and follows cboe_model.set_provider.
+
+_provider: Optional[AsyncProvider] = None
+_source: Optional[DataProvider] = None
+_shared_loads: dict = {}
+
+def get_provider() -> AsyncProvider:
+    """Returns the async provider for the current cboe_model.provider, creating it on first use."""
+
+    global _provider, _source
+
+    if _provider is None or _source is not cboe.provider:
+        if httpx is not None and type(cboe.provider) is CboeProvider:
+            _provider = AsyncCboeProvider(timeout=cboe.provider.timeout, validators=cboe.provider.validators)
+        else:
+            _provider = ThreadedProvider(cboe.provider)
+        _source = cboe.provider
+
+    return _provider
+
+def set_provider(new_provider: AsyncProvider) -> None:
+    """Overrides the async provider, until cboe_model.set_provider is next called.
+
+    Example
+    -------
+    set_provider(AsyncCboeProvider(timeout = 10, max_connections = 200))
+    """
+
+    global _provider, _source
+
+    _provider = new_provider
+    _source = cboe.provider
+
+async def aclose() -> None:
+    """Closes the shared client. The next call opens a new one."""
+
+    global _provider
+
+    if _provider is not None:
+        await _provider.aclose()
+    _provider = None
+
+async def _shared(key: str, load: Callable[[], Awaitable]) -> object:
+    """Runs one load for every concurrent caller asking for the same key.
+
+    A caller that is cancelled or times out stops waiting without cancelling
+    the load for the others.
+    """
+
+    loop = asyncio.get_running_loop()
+    task = _shared_loads.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(load())
+        _shared_loads[key] = task
+        task.add_done_callback(
+            lambda done: _shared_loads.pop(key, None) if _shared_loads.get(key) is done else None
+        )
+
+    return await asyncio.shield(task)
+
+# %%
+async def get_cboe_directory() -> DataFrame:
+    """Gets the US Listings Directory for the CBOE. See cboe_model.get_cboe_directory."""
+
+    payload = await get_provider().equity_directory()
+
+    return await asyncio.to_thread(cboe.parse_cboe_directory, payload)
+
+async def get_cboe_index_directory() -> DataFrame:
+    """Gets the CBOE index directory. See cboe_model.get_cboe_index_directory."""
+
+    payload = await get_provider().index_directory()
+
+    return await asyncio.to_thread(cboe.parse_cboe_index_directory, payload)
+
+async def get_directory() -> DataFrame:
+    """Returns the cached CBOE listings directory, loading it on first use.
+
+    The cache is the one used by cboe_model.get_directory.
+    """
+
+    if cboe._directory is None:
+        directory = await _shared("directory", get_cboe_directory)
+        if cboe._directory is None:
+            cboe._directory = directory
+
+    return cboe._directory
+
+async def get_index_directory() -> DataFrame:
+    """Returns the cached CBOE index directory, loading it on first use.
+
+    The cache is the one used by cboe_model.get_index_directory.
+    """
+
+    if cboe._index_directory is None:
+        index_directory = await _shared("index_directory", get_cboe_index_directory)
+        if cboe._index_directory is None:
+            cboe._index_directory = index_directory
+
+    return cboe._index_directory
+
+async def get_directory_names() -> dict:
+    """Returns the Symbol -> Company Name lookup for the listings directory."""
+
+    await get_directory()
+
+    return cboe.get_directory_names()
+
+async def is_index(ticker: str) -> bool:
+    """Checks if the ticker is an index or an exception, which CBOE serves under a prefixed name."""
+
+    if ticker not in cboe.TICKER_EXCEPTIONS:
+        await get_index_directory()
+
+    return cboe.is_index(ticker)
+
+# %%
+async def get_ticker_info(symbol: str) -> Tuple[pd.DataFrame, list[str]]:
+    """Gets basic info for the symbol and expiration dates. See cboe_model.get_ticker_info.
+
+    Example
+    -------
+    ticker_details,ticker_expirations = await get_ticker_info('AAPL')
+    """
+
+    timer = instrumentation.start("info.fetch")
+    symbol_info = await get_provider().symbol_info(symbol, index=await is_index(symbol))
+    timer.stop(bytes=len(symbol_info or b""))
+
+    return await asyncio.to_thread(cboe.parse_ticker_info, symbol_info, symbol)
+
+async def get_ticker_iv(symbol: str) -> pd.DataFrame:
+    """Gets annualized high/low historical and implied volatility. See cboe_model.get_ticker_iv.
+
+    Example
+    -------
+    ticker_iv = await get_ticker_iv('AAPL')
+    """
+
+    timer = instrumentation.start("iv.fetch")
+    h_iv = await get_provider().historical_data(symbol, index=await is_index(symbol))
+    timer.stop(bytes=len(h_iv or b""))
+
+    return await asyncio.to_thread(cboe.parse_ticker_iv, h_iv, symbol)
+
+async def get_ticker_options(symbol: str) -> Optional[bytes]:
+    """Gets the raw delayed_quotes/options payload for a ticker, or None if there is no data."""
+
+    timer = instrumentation.start("chains.fetch")
+    payload = await get_provider().options(symbol, index=await is_index(symbol))
+    timer.stop(bytes=len(payload or b""))
+
+    return payload
+
+async def get_ticker_chains(symbol: str) -> pd.DataFrame:
+    """Gets the complete options chains for a ticker. See cboe_model.get_ticker_chains.
+
+    The info and options payloads are requested at the same time. Parsing goes
+    through cboe_model.cached_parse, with the keys of the sync path, so an
+    unchanged payload reuses the last parse of either.
+
+    Example
+    -------
+    ticker_chains = await get_ticker_chains('SPX')
+    """
+
+    (ticker_info, _), payload = await asyncio.gather(
+        get_ticker_info(symbol), get_ticker_options(symbol)
+    )
+    if ticker_info.empty:
+        return pd.DataFrame()
+    if payload is None:
+        print("No data found for the symbol: " f"{symbol}" "")
+        return pd.DataFrame()
+    last_price = float(ticker_info.loc["Current Price"].iloc[0])
+
+    if cboe.use_arrow():
+        chains_table = await asyncio.to_thread(
+            cboe.cached_parse, "table", symbol, payload, cboe.build_chains_table, last_price
+        )
+        return cboe.arrow_chains.to_pandas(chains_table)
+
+    return await asyncio.to_thread(
+        cboe.cached_parse, "chains", symbol, payload, cboe.parse_ticker_chains, last_price
+    )
+
+# %%
+async def get_ticker(symbol: str, timeout: Optional[float] = None) -> cboe.Ticker:
+    """Loads a Ticker, requesting its info, IV and options payloads at the same time.
+
+    Unlike Ticker.get_ticker, errors are raised rather than printed, so that
+    callers driving many loads can tell which ones failed.
+
+    Parameters
+    ----------
+    symbol: str
+        The ticker symbol to get data for.
+    timeout: float
+        Seconds allowed for the whole load. Raises asyncio.TimeoutError when exceeded.
+
+    Returns
+    -------
+    Ticker: The loaded ticker, as from Ticker.get_ticker.
+
+    Example
+    -------
+    spx = await get_ticker('SPX', timeout = 30)
+    """
+
+    async def load() -> cboe.Ticker:
+        total = instrumentation.start("ticker.total")
+        ticker = symbol.upper()
+        (details, expirations), iv, options, _ = await asyncio.gather(
+            get_ticker_info(ticker), get_ticker_iv(ticker), get_ticker_options(ticker), get_directory()
+        )
+        loaded = await asyncio.to_thread(cboe.Ticker().load, ticker, details, expirations, iv, options)
+        total.stop(rows=len(loaded.calls) + len(loaded.puts))
+
+        return loaded
+
+    return await asyncio.wait_for(load(), timeout)
+
+async def get_tickers(
+    symbols: list[str],
+    concurrency: int = ASYNC_CONCURRENCY,
+    timeout: Optional[float] = None,
+) -> dict:
+    """Loads many tickers on one event loop, with at most `concurrency` loads in flight.
+
+    Parameters
+    ----------
+    symbols: list[str]
+        The ticker symbols to load.
+    concurrency: int
+        Loads in flight at once.
+    timeout: float
+        Seconds allowed for each load.
+
+    Returns
+    -------
+    dict: Symbol -> loaded Ticker, or the exception that stopped its load.
+
+    Example
+    -------
+    tickers = await get_tickers(cboe.get_directory().index.unique().tolist()[:500])
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load(symbol: str) -> cboe.Ticker:
+        async with semaphore:
+            return await get_ticker(symbol, timeout)
+
+    await asyncio.gather(get_index_directory(), get_directory())
+    loaded = await asyncio.gather(*[load(symbol) for symbol in symbols], return_exceptions=True)
+
+    return dict(zip(symbols, loaded))
@@ -1,19 +1,112 @@
 """CBOE Model"""
 
+import io
+import os
+import json
+import time
+import hashlib
+import threading
 import pandas as pd
 import numpy as np
-import requests
-from typing import Literal, Tuple
+from typing import Callable, Literal, Optional, Tuple
 from pandas import DataFrame
 from datetime import datetime
 from requests.exceptions import HTTPError
+from .iv_solver import fill_missing_iv
+from .gex_profile import calc_gex_profile
+from .density import calc_implied_distribution, calc_expected_range
+from .cube import AnalyticsCube
+from .history import HistoryStore, utc_now
+from .snapshots import SnapshotHistory
+from .activity import ActivityMonitor
+from .memory import MemoryGovernor
+from .volatility import volatility
+from .instrumentation import instrumentation
+from .providers import DataProvider, provider_from_env
+from . import arrow_chains, workers
 
 __docformat__: Literal["numpy"] = "numpy"
 
 symbol: str = ""
 TICKER_EXCEPTIONS: list[str] = ["NDX", "RUT"]
 
+provider: DataProvider = provider_from_env()
+
+# "arrow" decodes and aggregates the chains as a pyarrow Table, when pyarrow is installed. "lazy" indexes
+# the payload by expiration and only builds the complete chains of an expiration when it is accessed.
+
+CHAINS_BACKEND: str = os.environ.get("CBOE_CHAINS_BACKEND", "pandas")
+
+# Parsed payloads kept for the content-hash skip. The memory governor evicts them by size and refresh cost.
+
+MAX_PARSED: int = 32
+
+CHAINS_COLUMNS: list[str] = [
+    "DTE",
+    "Tick",
+    "Last Price",
+    "Expected Move",
+    "% Change",
+    "Theoretical",
+    "$ to Spot",
+    "% to Spot",
+    "Breakeven",
+    "Vol",
+    "OI",
+    "Delta $",
+    "GEX",
+    "IV",
+    "Theta",
+    "Delta",
+    "Gamma",
+    "Vega",
+    "Rho",
+    "Open",
+    "High",
+    "Low",
+    "Prev Close",
+    "Bid Size",
+    "Bid",
+    "Ask",
+    "Ask Size",
+    "Timestamp",
+]
+
 #%%
+def set_provider(new_provider: DataProvider) -> None:
+    """Sets the source of CBOE payloads for every fetcher, and clears the cached directories.
+
+    Parameters
+    ----------
+    new_provider: DataProvider
+        i.e. CboeProvider(), ReplayProvider(path, latency) or RecordingProvider(CboeProvider(), path)
+
+    Example
+    -------
+    set_provider(ReplayProvider('benchmarks/fixtures/spx', latency = 0.25))
+    """
+
+    global provider, _directory, _index_directory, _indexes, _directory_names
+
+    provider = new_provider
+    _directory = None
+    _index_directory = None
+    _indexes = None
+    _directory_names = None
+
+def use_arrow() -> bool:
+    """Checks if the chains should be built with the Arrow backend."""
+
+    return CHAINS_BACKEND == "arrow" and arrow_chains.pa is not None
+
+def chains_backend() -> str:
+    """The backend Ticker.load builds the chains with: arrow, lazy or pandas."""
+
+    if use_arrow():
+        return "arrow"
+
+    return "lazy" if CHAINS_BACKEND == "lazy" else "pandas"
+
 def get_cboe_directory() -> DataFrame:
     """Gets the US Listings Directory for the CBOE
 
@@ -27,9 +120,16 @@ def get_cboe_directory() -> DataFrame:
     CBOE_DIRECTORY = get_cboe_directory()
     """
 
-    CBOE_DIRECTORY: DataFrame = pd.read_csv(
-        "https://www.cboe.com/us/options/symboldir/equity_index_options/?download=csv"
-    )
+    return parse_cboe_directory(provider.equity_directory())
+
+def parse_cboe_directory(payload: Optional[bytes]) -> DataFrame:
+    """Parses the listings directory CSV, as fetched by get_cboe_directory."""
+
+    if payload is None:
+        print("There was an error with the request'\n")
+        return pd.DataFrame(columns=["Company Name", "DPM Name", "Post/Station"]).rename_axis("Symbol")
+
+    CBOE_DIRECTORY: DataFrame = pd.read_csv(io.BytesIO(payload))
     CBOE_DIRECTORY = CBOE_DIRECTORY.rename(
         columns = {
             ' Stock Symbol':'Symbol', 
@@ -52,9 +152,17 @@ def get_cboe_index_directory() -> DataFrame:
     CBOE_INDEXES = get_cboe_index_directory(
     """
 
-    CBOE_INDEXES: DataFrame = pd.read_json(
-        "https://cdn.cboe.com/api/global/us_indices/definitions/all_indices.json"
-    )
+    return parse_cboe_index_directory(provider.index_directory())
+
+def parse_cboe_index_directory(payload: Optional[bytes]) -> DataFrame:
+    """Parses the index definitions JSON, as fetched by get_cboe_index_directory."""
+
+    if payload is None:
+        print("There was an error with the request'\n")
+        return pd.DataFrame(columns=["Name", "Description", "Currency", "Tick Days", "Frequency",
+                                     "Period", "Time Zone"]).rename_axis("Ticker")
+
+    CBOE_INDEXES: DataFrame = pd.read_json(io.BytesIO(payload))
 
     CBOE_INDEXES = DataFrame(CBOE_INDEXES).rename(
         columns={
@@ -94,8 +202,73 @@ def get_cboe_index_directory() -> DataFrame:
 
 # %%
 
-indexes = get_cboe_index_directory().index.tolist()
-directory = get_cboe_directory()
+    # The directories are downloaded once, on first use, and kept for the life of the process.
+
+_directory: Optional[DataFrame] = None
+_index_directory: Optional[DataFrame] = None
+_indexes: Optional[set] = None
+_directory_names: Optional[dict] = None
+
+def get_directory() -> DataFrame:
+    """Returns the cached CBOE listings directory, loading it on first use."""
+
+    global _directory
+
+    if _directory is None:
+        _directory = get_cboe_directory()
+
+    return _directory
+
+def get_index_directory() -> DataFrame:
+    """Returns the cached CBOE index directory, loading it on first use."""
+
+    global _index_directory
+
+    if _index_directory is None:
+        _index_directory = get_cboe_index_directory()
+
+    return _index_directory
+
+def get_indexes() -> set:
+    """Returns the set of index tickers."""
+
+    global _indexes
+
+    if _indexes is None:
+        _indexes = set(get_index_directory().index.tolist())
+
+    return _indexes
+
+def get_directory_names() -> dict:
+    """Returns the Symbol -> Company Name lookup for the listings directory."""
+
+    global _directory_names
+
+    if _directory_names is None:
+        directory = get_directory()
+        _directory_names = (
+            directory.loc[~directory.index.duplicated(), "Company Name"].to_dict()
+        )
+
+    return _directory_names
+
+def is_index(ticker: str) -> bool:
+    """Checks if the ticker is an index or an exception, which CBOE serves under a prefixed name."""
+
+    return ticker in TICKER_EXCEPTIONS or ticker in get_indexes()
+
+def __getattr__(name: str) -> object:
+    # Keeps the former module-level `indexes`, `directory` and `directory_names` available, lazily.
+
+    loaders = {
+        "indexes": get_indexes,
+        "directory": get_directory,
+        "directory_names": get_directory_names,
+    }
+    if name in loaders:
+        return loaders[name]()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # %%
     # Get Ticker Info and Expirations
@@ -119,158 +292,172 @@ def get_ticker_info(symbol: str) -> Tuple[pd.DataFrame, list[str]]:
     ticker_details,ticker_expirations = get_ticker_info('VIX')
     """
 
+    ticker: str = symbol
+    ticker_details: DataFrame = pd.DataFrame()
+    ticker_expirations: list = []
+
+    try:
+        # Checks ticker to determine if ticker is an index or an exception that requires modifying the request's URLs
+
+        timer = instrumentation.start("info.fetch")
+        symbol_info = provider.symbol_info(ticker, index=is_index(ticker))
+        timer.stop(bytes=len(symbol_info or b""))
+        ticker_details, ticker_expirations = parse_ticker_info(symbol_info, ticker)
+
+    except HTTPError:
+        print("There was an error with the request'\n")
+        ticker_details = pd.DataFrame()
+        ticker_expirations = list()
+
+    return ticker_details,ticker_expirations
+
+def parse_ticker_info(symbol_info: Optional[bytes], symbol: str) -> Tuple[pd.DataFrame, list[str]]:
+    """Parses the symbol-info payload, as fetched by get_ticker_info.
+
+    Parameters
+    ----------
+    symbol_info: bytes
+        The raw symbol-info JSON, or None if the request returned no data.
+    symbol: str
+        The ticker the payload belongs to.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, pd.Series]: ticker_details,ticker_expirations
+    """
+
     # Variables for exception handling
 
     stock = "stock"
     index = "index"
     ticker: str = symbol
-    new_ticker: str = ""
     ticker_details: DataFrame = pd.DataFrame()
     ticker_expirations: list = []
-    
-    try:
-        # Checks ticker to determine if ticker is an index or an exception that requires modifying the request's URLs
 
-        if ticker in TICKER_EXCEPTIONS:
-            new_ticker = ("^" + ticker)
-        else:
-            if ticker not in indexes:
-                new_ticker = ticker
+    if symbol_info is None:
+        print("No data found for the symbol: " f"{ticker}" "")
+        return ticker_details,ticker_expirations
 
-            elif ticker in indexes:
-                new_ticker = ("^" + ticker)
+    timer = instrumentation.start("info.decode")
+    symbol_info_json = pd.Series(json.loads(symbol_info))
+    timer.stop()
 
-                # Gets the data to return, and if none returns empty Tuple #
+    if symbol_info_json.success is False:
+        ticker_details = pd.DataFrame()
+        ticker_expirations = []
+        print("No data found for the symbol: " f"{ticker}" "")
+    else:
+        symbol_details = pd.Series(symbol_info_json["details"])
+        symbol_details = pd.DataFrame(symbol_details).transpose()
+        symbol_details = symbol_details.reset_index()
+        ticker_expirations = symbol_info_json["expirations"]
 
-        symbol_info_url = (
-            "https://www.cboe.com/education/tools/trade-optimizer/symbol-info/?symbol="
-            f"{new_ticker}"
-        )
+            # Cleans columns depending on if the security type is a stock or an index
 
-        symbol_info = requests.get(symbol_info_url)
-        symbol_info_json = pd.Series(symbol_info.json())
+        type = symbol_details.security_type
 
-        if symbol_info_json.success is False:
-            ticker_details = pd.DataFrame()
-            ticker_expirations = []
-            print("No data found for the symbol: " f"{ticker}" "")
-        else:
-            symbol_details = pd.Series(symbol_info_json["details"])
-            symbol_details = pd.DataFrame(symbol_details).transpose()
-            symbol_details = symbol_details.reset_index()
-            ticker_expirations = symbol_info_json["expirations"]
-
-                # Cleans columns depending on if the security type is a stock or an index
-
-            type = symbol_details.security_type
-
-            if stock[0] in type[0]:
-                stock_details = symbol_details
-                ticker_details = pd.DataFrame(stock_details).rename(
-                    columns={
-                        "symbol": "Symbol",
-                        "current_price": "Current Price",
-                        "bid": "Bid",
-                        "ask": "Ask",
-                        "bid_size": "Bid Size",
-                        "ask_size": "Ask Size",
-                        "open": "Open",
-                        "high": "High",
-                        "low": "Low",
-                        "close": "Close",
-                        "volume": "Volume",
-                        "iv30": "IV30",
-                        "prev_day_close": "Previous Close",
-                        "price_change": "Change",
-                        "price_change_percent": "Change %",
-                        "iv30_change": "IV30 Change",
-                        "iv30_percent_change": "IV30 Change %",
-                        "last_trade_time": "Last Trade Time",
-                        "exchange_id": "Exchange ID",
-                        "tick": "Tick",
-                        "security_type": "Type",
-                    }
-                )
-                details_columns = [
-                    "Symbol",
-                    "Type",
-                    "Tick",
-                    "Bid",
-                    "Bid Size",
-                    "Ask Size",
-                    "Ask",
-                    "Current Price",
-                    "Open",
-                    "High",
-                    "Low",
-                    "Close",
-                    "Volume",
-                    "Previous Close",
-                    "Change",
-                    "Change %",
-                    "IV30",
-                    "IV30 Change",
-                    "IV30 Change %",
-                    "Last Trade Time",
-                ]
-                ticker_details = (
-                    pd.DataFrame(ticker_details, columns=details_columns)
-                    .set_index(keys="Symbol")
-                    .dropna(axis=1)
-                    .transpose()
-                )
-
-            if index[0] in type[0]:
-                index_details = symbol_details
-                ticker_details = pd.DataFrame(index_details).rename(
-                    columns={
-                        "symbol": "Symbol",
-                        "security_type": "Type",
-                        "current_price": "Current Price",
-                        "price_change": "Change",
-                        "price_change_percent": "Change %",
-                        "tick": "Tick",
-                        "open": "Open",
-                        "high": "High",
-                        "low": "Low",
-                        "close": "Close",
-                        "prev_day_close": "Previous Close",
-                        "iv30": "IV30",
-                        "iv30_change": "IV30 Change",
-                        "iv30_change_percent": "IV30 Change %",
-                        "last_trade_time": "Last Trade Time",
-                    }
-                )
-
-                index_columns = [
-                    "Symbol",
-                    "Type",
-                    "Tick",
-                    "Current Price",
-                    "Open",
-                    "High",
-                    "Low",
-                    "Close",
-                    "Previous Close",
-                    "Change",
-                    "Change %",
-                    "IV30",
-                    "IV30 Change",
-                    "IV30 Change %",
-                    "Last Trade Time",
-                ]
-
-                ticker_details = (
-                    pd.DataFrame(ticker_details, columns=index_columns)
-                    .set_index(keys="Symbol")
-                    .dropna(axis=1)
-                    .transpose()
-                )
+        if stock[0] in type[0]:
+            stock_details = symbol_details
+            ticker_details = pd.DataFrame(stock_details).rename(
+                columns={
+                    "symbol": "Symbol",
+                    "current_price": "Current Price",
+                    "bid": "Bid",
+                    "ask": "Ask",
+                    "bid_size": "Bid Size",
+                    "ask_size": "Ask Size",
+                    "open": "Open",
+                    "high": "High",
+                    "low": "Low",
+                    "close": "Close",
+                    "volume": "Volume",
+                    "iv30": "IV30",
+                    "prev_day_close": "Previous Close",
+                    "price_change": "Change",
+                    "price_change_percent": "Change %",
+                    "iv30_change": "IV30 Change",
+                    "iv30_percent_change": "IV30 Change %",
+                    "last_trade_time": "Last Trade Time",
+                    "exchange_id": "Exchange ID",
+                    "tick": "Tick",
+                    "security_type": "Type",
+                }
+            )
+            details_columns = [
+                "Symbol",
+                "Type",
+                "Tick",
+                "Bid",
+                "Bid Size",
+                "Ask Size",
+                "Ask",
+                "Current Price",
+                "Open",
+                "High",
+                "Low",
+                "Close",
+                "Volume",
+                "Previous Close",
+                "Change",
+                "Change %",
+                "IV30",
+                "IV30 Change",
+                "IV30 Change %",
+                "Last Trade Time",
+            ]
+            ticker_details = (
+                pd.DataFrame(ticker_details, columns=details_columns)
+                .set_index(keys="Symbol")
+                .dropna(axis=1)
+                .transpose()
+            )
 
-    except HTTPError:
-        print("There was an error with the request'\n")
-        ticker_details = pd.DataFrame()
-        ticker_expirations = list()
+        if index[0] in type[0]:
+            index_details = symbol_details
+            ticker_details = pd.DataFrame(index_details).rename(
+                columns={
+                    "symbol": "Symbol",
+                    "security_type": "Type",
+                    "current_price": "Current Price",
+                    "price_change": "Change",
+                    "price_change_percent": "Change %",
+                    "tick": "Tick",
+                    "open": "Open",
+                    "high": "High",
+                    "low": "Low",
+                    "close": "Close",
+                    "prev_day_close": "Previous Close",
+                    "iv30": "IV30",
+                    "iv30_change": "IV30 Change",
+                    "iv30_change_percent": "IV30 Change %",
+                    "last_trade_time": "Last Trade Time",
+                }
+            )
+
+            index_columns = [
+                "Symbol",
+                "Type",
+                "Tick",
+                "Current Price",
+                "Open",
+                "High",
+                "Low",
+                "Close",
+                "Previous Close",
+                "Change",
+                "Change %",
+                "IV30",
+                "IV30 Change",
+                "IV30 Change %",
+                "Last Trade Time",
+            ]
+
+            ticker_details = (
+                pd.DataFrame(ticker_details, columns=index_columns)
+                .set_index(keys="Symbol")
+                .dropna(axis=1)
+                .transpose()
+            )
 
     return ticker_details,ticker_expirations
 
@@ -297,417 +484,751 @@ def get_ticker_iv(symbol: str) -> pd.DataFrame:
     """
 
     ticker = symbol
+    ticker_iv: DataFrame = pd.DataFrame()
 
     # Checks ticker to determine if ticker is an index or an exception that requires modifying the request's URLs
     try:
-        if ticker in TICKER_EXCEPTIONS:
-            quotes_iv_url = (
-                "https://cdn.cboe.com/api/global/delayed_quotes/historical_data/_"
-                f"{ticker}"
-                ".json"
-            )
-        else:
-            if ticker not in indexes:
-                quotes_iv_url = (
-                    "https://cdn.cboe.com/api/global/delayed_quotes/historical_data/"
-                    f"{ticker}"
-                    ".json"
-                )
+        # Gets annualized high/low historical and implied volatility over 30/60/90 day windows.
 
-            elif ticker in indexes:
-                quotes_iv_url = (
-                    "https://cdn.cboe.com/api/global/delayed_quotes/historical_data/_"
-                    f"{ticker}"
-                    ".json"
-                )
+        timer = instrumentation.start("iv.fetch")
+        h_iv = provider.historical_data(ticker, index=is_index(ticker))
+        timer.stop(bytes=len(h_iv or b""))
 
-                # Gets annualized high/low historical and implied volatility over 30/60/90 day windows.
+        ticker_iv = cached_parse("iv", ticker, h_iv, parse_ticker_iv, ticker) if h_iv is not None else parse_ticker_iv(h_iv, ticker)
 
-        h_iv = requests.get(quotes_iv_url)
+    except HTTPError:
+        print("There was an error with the request'\n")
 
-        if h_iv.status_code != 200:
-            print("No data found for the symbol: " f"{ticker}" "")
-            return pd.DataFrame()
+    return ticker_iv
 
-        else:
-            h_iv_json = pd.DataFrame(h_iv.json())
-            h_columns = [
-                "annual_high",
-                "annual_low",
-                "hv30_annual_high",
-                "hv30_annual_low",
-                "hv60_annual_high",
-                "hv60_annual_low",
-                "hv90_annual_high",
-                "hv90_annual_low",
-                "iv30_annual_high",
-                "iv30_annual_low",
-                "iv60_annual_high",
-                "iv60_annual_low",
-                "iv90_annual_high",
-                "iv90_annual_low",
-                "symbol",
-            ]
-            h_data = h_iv_json[1:]
-            h_data = pd.DataFrame(h_iv_json).transpose()
-            h_data = h_data[1:2]
-            quotes_iv_df = pd.DataFrame(data=h_data, columns=h_columns).reset_index()
+def parse_ticker_iv(h_iv: Optional[bytes], symbol: str) -> pd.DataFrame:
+    """Parses the historical_data payload, as fetched by get_ticker_iv, into the annual high/low table.
 
-            quotes_iv_df = pd.DataFrame(quotes_iv_df).rename(
-                columns={
-                    "annual_high": "1Y High",
-                    "annual_low": "1Y Low",
-                    "hv30_annual_high": "HV30 1Y High",
-                    "hv30_annual_low": "HV30 1Y Low",
-                    "hv60_annual_high": "HV60 1Y High",
-                    "hv60_annual_low": "HV60 1Y Low",
-                    "hv90_annual_high": "HV90 1Y High",
-                    "hv90_annual_low": "HV90 1Y Low",
-                    "iv30_annual_high": "IV30 1Y High",
-                    "iv30_annual_low": "IV30 1Y Low",
-                    "iv60_annual_high": "IV60 1Y High",
-                    "iv60_annual_low": "IV60 1Y Low",
-                    "iv90_annual_high": "IV90 1Y High",
-                    "iv90_annual_low": "IV90 1Y Low",
-                    "symbol": "Symbol",
-                },
-            )
+    Parameters
+    ----------
+    h_iv: bytes
+        The raw historical_data JSON, or None if the request returned no data.
+    symbol: str
+        The ticker the payload belongs to.
 
-            quotes_iv_df = quotes_iv_df.set_index(keys="Symbol")
-
-            iv_order = [
-                "IV30 1Y High",
-                "HV30 1Y High",
-                "IV30 1Y Low",
-                "HV30 1Y Low",
-                "IV60 1Y High",
-                "HV60 1Y High",
-                "IV60 1Y Low",
-                "HV60 1Y low",
-                "IV90 1Y High",
-                "HV90 1Y High",
-                "IV90 1Y Low",
-                "HV 90 1Y Low",
-            ]
+    Returns
+    -------
+    pd.DataFrame: ticker_iv
+        The daily bars are also added to the volatility engine, see volatility.series.
+    """
 
-            ticker_iv = (
-                pd.DataFrame(quotes_iv_df, columns=iv_order)
-                .fillna(value="N/A")
-                .transpose()
-            )
-    except HTTPError:
-        print("There was an error with the request'\n")
+    ticker = symbol
+
+    if h_iv is None:
+        print("No data found for the symbol: " f"{ticker}" "")
+        return pd.DataFrame()
+
+    else:
+        timer = instrumentation.start("iv.decode")
+        h_iv_dict = json.loads(h_iv)
+        h_iv_json = pd.DataFrame(h_iv_dict)
+        timer.stop()
+
+        # Keeps the daily bars for the realized volatility; only days after the cached ones are added.
+
+        timer = instrumentation.start("iv.daily_series")
+        volatility.update(ticker, h_iv_dict.get("data", {}).get("data", []))
+        timer.stop()
+        h_columns = [
+            "annual_high",
+            "annual_low",
+            "hv30_annual_high",
+            "hv30_annual_low",
+            "hv60_annual_high",
+            "hv60_annual_low",
+            "hv90_annual_high",
+            "hv90_annual_low",
+            "iv30_annual_high",
+            "iv30_annual_low",
+            "iv60_annual_high",
+            "iv60_annual_low",
+            "iv90_annual_high",
+            "iv90_annual_low",
+            "symbol",
+        ]
+        h_data = h_iv_json[1:]
+        h_data = pd.DataFrame(h_iv_json).transpose()
+        h_data = h_data[1:2]
+        quotes_iv_df = pd.DataFrame(data=h_data, columns=h_columns).reset_index()
+
+        quotes_iv_df = pd.DataFrame(quotes_iv_df).rename(
+            columns={
+                "annual_high": "1Y High",
+                "annual_low": "1Y Low",
+                "hv30_annual_high": "HV30 1Y High",
+                "hv30_annual_low": "HV30 1Y Low",
+                "hv60_annual_high": "HV60 1Y High",
+                "hv60_annual_low": "HV60 1Y Low",
+                "hv90_annual_high": "HV90 1Y High",
+                "hv90_annual_low": "HV90 1Y Low",
+                "iv30_annual_high": "IV30 1Y High",
+                "iv30_annual_low": "IV30 1Y Low",
+                "iv60_annual_high": "IV60 1Y High",
+                "iv60_annual_low": "IV60 1Y Low",
+                "iv90_annual_high": "IV90 1Y High",
+                "iv90_annual_low": "IV90 1Y Low",
+                "symbol": "Symbol",
+            },
+        )
+
+        quotes_iv_df = quotes_iv_df.set_index(keys="Symbol")
+
+        iv_order = [
+            "IV30 1Y High",
+            "HV30 1Y High",
+            "IV30 1Y Low",
+            "HV30 1Y Low",
+            "IV60 1Y High",
+            "HV60 1Y High",
+            "IV60 1Y Low",
+            "HV60 1Y low",
+            "IV90 1Y High",
+            "HV90 1Y High",
+            "IV90 1Y Low",
+            "HV 90 1Y Low",
+        ]
+
+        ticker_iv = (
+            pd.DataFrame(quotes_iv_df, columns=iv_order)
+            .fillna(value="N/A")
+            .transpose()
+        )
 
     return ticker_iv
 
     # Gets quotes and greeks data and returns a dataframe: options_quotes
 
 
+# %%
+def get_ticker_table(symbol: str) -> "arrow_chains.pa.Table":
+    """Gets the complete options chains for a ticker as a pyarrow Table
+
+    Decoding, OCC parsing, enrichment and the IV solver all run on Arrow columns.
+    Expiration, Strike and Type are leading columns instead of an index.
+
+    Parameters
+    ----------
+    symbol: str
+        The ticker get options data for
+
+    Returns
+    -------
+    pa.Table: chains_table
+        Table of all options chains for the ticker, empty if there is no data.
+
+    Example
+    -------
+    chains_table = get_ticker_table('SPX')
+
+    chains_df = arrow_chains.to_pandas(get_ticker_table('SPX'))
+    """
+
+    ticker: str = symbol
+    chains_table = arrow_chains.pa.table({})
+
+    try:
+
+        ticker_info, _ = get_ticker_info(ticker)
+        if ticker_info.empty:
+            return chains_table
+        last_price = float(ticker_info.loc["Current Price"].iloc[0])
+
+        r = get_ticker_options(ticker)
+        if r is None:
+            print("No data found for the symbol: " f"{ticker}" "")
+            return chains_table
+
+        chains_table = cached_parse("table", ticker, r, build_chains_table, last_price)
+
+    except HTTPError:
+        print("There was an error with the request'\n")
+
+    return chains_table
+
+def snapshot_id(payload: bytes) -> str:
+    """Returns a short content hash identifying one snapshot of a payload."""
+
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def cached_parse(kind: str, symbol: str, payload: bytes, parse: Callable, *args: object) -> object:
+    """Parses a payload, or reuses the last result for the symbol when the payload and arguments are unchanged.
+
+    Results are keyed by the content hash of the payload, so an unchanged
+    payload is skipped whether it came from a 304 or a full download. The
+    <kind>.parse_skipped and <kind>.bytes_skipped counters record the skips.
+    Results are held by the memory governor, with the parse time as their
+    refresh cost.
+
+    Parameters
+    ----------
+    kind: str
+        Which parse, i.e. 'chains' or 'iv'.
+    symbol: str
+        The ticker the payload belongs to.
+    payload: bytes
+        The raw payload.
+    parse: Callable
+        Called as parse(payload, *args) when there is no reusable result.
+
+    Returns
+    -------
+    object: The parsed result. DataFrames are copies, so callers may modify them.
+
+    Example
+    -------
+    ticker_chains = cached_parse('chains', 'SPX', get_ticker_options('SPX'), parse_ticker_chains, 4000)
+    """
+
+    # DTE counts from today, so a result is only reused on the day it was parsed.
+
+    key = (kind, symbol.upper())
+    digest = (snapshot_id(payload), datetime.now().date()) + args
+    hit, result = governor.get(key, digest)
+    if hit:
+        instrumentation.count(f"{kind}.parse_skipped")
+        instrumentation.count(f"{kind}.bytes_skipped", len(payload))
+    else:
+        start = time.perf_counter()
+        result = parse(payload, *args)
+        governor.put(key, digest, result, cost=time.perf_counter() - start)
+
+    return result.copy() if isinstance(result, DataFrame) else result
+
+def get_ticker_options(symbol: str) -> Optional[bytes]:
+    """Gets the raw delayed_quotes/options payload for a ticker, or None if there is no data."""
+
+    timer = instrumentation.start("chains.fetch")
+    payload = provider.options(symbol, index=is_index(symbol))
+    timer.stop(bytes=len(payload or b""))
+
+    return payload
+
+def build_chains_table(payload: bytes, last_price: float) -> "arrow_chains.pa.Table":
+    """Builds the chains Table from a raw delayed_quotes/options payload.
+
+    This is the CPU-bound part of get_ticker_table, without any requests.
+
+    Example
+    -------
+    chains_table = build_chains_table(provider.options('SPX', index = True), 4000)
+    """
+
+    timer = instrumentation.start("chains.decode_arrow")
+    chains_table = arrow_chains.decode_chains(payload, last_price)
+    timer.stop(rows=chains_table.num_rows)
+
+    timer = instrumentation.start("chains.iv_solver")
+    chains_table, iv_report = arrow_chains.fill_missing_iv(chains_table, last_price)
+    timer.stop(rows=iv_report["Contracts"])
+
+    chains_table = arrow_chains.calc_expected_move(chains_table)
+    chains_table = chains_table.select(arrow_chains.CHAINS_INDEX + CHAINS_COLUMNS)
+
+    return arrow_chains.with_report(chains_table, iv_report, snapshot_id(payload))
+
 # %%
 def get_ticker_chains(symbol: str) -> pd.DataFrame:
     """Gets the complete options chains for a ticker
 
-    Parameters
-    ----------
-    symbol: str
-        The ticker get options data for
+    Parameters
+    ----------
+    symbol: str
+        The ticker get options data for
+
+    Returns
+    -------
+    ticker_options: pd.DataFrame
+        DataFrame of all options chains for the ticker
+
+    Examples
+    --------
+    ticker_options = get_ticker_chains('SPX')
+
+    ticker_options = get_ticker_chains('SPX').filter(like = '2027-12-17', axis = 0)
+
+    ticker_calls = get_ticker_chains('AAPL').filter(like = 'Call', axis = 0)
+
+    vix_20C = (
+        get_ticker_chains('VIX')
+        .filter(like = 'Call', axis = 0)
+        .reset_index(['Expiration', 'Type'])
+        .query('20.0')
+    )
+    """
+
+    ticker: str = symbol
+    ticker_chains: DataFrame = pd.DataFrame()
+
+    if use_arrow():
+        return arrow_chains.to_pandas(get_ticker_table(ticker))
+
+    # Checks ticker to determine if ticker is an index or an exception that requires modifying the request's URLs
+
+    try:
+
+        ticker_info, _ = get_ticker_info(ticker)
+        if not ticker_info.empty:
+            last_price = float(ticker_info.loc["Current Price"].iloc[0])
+        else:
+            return pd.DataFrame()
+
+        timer = instrumentation.start("chains.fetch")
+        r = provider.options(ticker, index=is_index(ticker))
+        timer.stop(bytes=len(r or b""))
+        if r is None:
+            print("No data found for the symbol: " f"{ticker}" "")
+            return pd.DataFrame()
+
+        ticker_chains = cached_parse("chains", ticker, r, parse_ticker_chains, last_price)
+
+    except HTTPError:
+        print("There was an error with the request'\n")
+
+    return ticker_chains
+
+def parse_ticker_chains(r: bytes, last_price: float) -> pd.DataFrame:
+    """Parses and enriches the delayed_quotes/options payload, as fetched by get_ticker_chains.
+
+    This is the CPU-bound part of get_ticker_chains, without any requests.
+
+    Parameters
+    ----------
+    r: bytes
+        The raw delayed_quotes/options JSON.
+    last_price: float
+        Price of the underlying.
+
+    Returns
+    -------
+    pd.DataFrame: ticker_chains
+
+    Example
+    -------
+    ticker_chains = parse_ticker_chains(provider.options('SPX', index = True), 4000)
+    """
+
+    timer = instrumentation.start("chains.decode")
+    r_json = json.loads(r)
+    data = pd.DataFrame(r_json["data"])
+    options = pd.Series(data.options, index=data.index)
+    options_df = decode_options(list(options[:]))
+    timer.stop(rows=len(options_df))
+
+    ticker_chains, iv_report = enrich_chains(options_df, last_price)
+    ticker_chains.attrs["IV Solver"] = iv_report.to_dict()
+    ticker_chains.attrs["Snapshot"] = snapshot_id(r)
+
+    return ticker_chains
+
+def decode_options(options_data: list) -> pd.DataFrame:
+    """Builds the options frame, indexed by Option Symbol, from the option records of a delayed_quotes/options payload."""
+
+    options_columns = list(options_data[0])
+    options_df = pd.DataFrame(options_data, columns=options_columns)
+    options_df = pd.DataFrame(options_df).rename(
+        columns={
+            "option": "Option Symbol",
+            "bid": "Bid",
+            "bid_size": "Bid Size",
+            "ask": "Ask",
+            "ask_size": "Ask Size",
+            "iv": "IV",
+            "open_interest": "OI",
+            "volume": "Vol",
+            "delta": "Delta",
+            "gamma": "Gamma",
+            "theta": "Theta",
+            "rho": "Rho",
+            "vega": "Vega",
+            "theo": "Theoretical",
+            "change": "Change",
+            "open": "Open",
+            "high": "High",
+            "low": "Low",
+            "tick": "Tick",
+            "last_trade_price": "Last Price",
+            "last_trade_time": "Timestamp",
+            "percent_change": "% Change",
+            "prev_day_close": "Prev Close",
+        }
+    )
+
+    options_df_order: list[str] = [
+        "Option Symbol",
+        "Tick",
+        "Theoretical",
+        "Last Price",
+        "Prev Close",
+        "% Change",
+        "Open",
+        "High",
+        "Low",
+        "Bid Size",
+        "Bid",
+        "Ask",
+        "Ask Size",
+        "Vol",
+        "OI",
+        "IV",
+        "Theta",
+        "Delta",
+        "Gamma",
+        "Vega",
+        "Rho",
+        "Timestamp",
+    ]
+
+    options_df: DataFrame = DataFrame(
+        options_df, columns=options_df_order
+    ).set_index(keys=["Option Symbol"])
+
+    return options_df
+
+def enrich_chains(options_df: pd.DataFrame, last_price: float) -> Tuple[pd.DataFrame, pd.Series]:
+    """Parses the OCC symbols and adds the spot, exposure, DTE, IV and expected move columns.
+
+    Parameters
+    ----------
+    options_df: pd.DataFrame
+        Options frame from decode_options.
+    last_price: float
+        Price of the underlying.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, pd.Series]: ticker_chains,iv_report
+        The chains indexed by Expiration, Strike and Type with CHAINS_COLUMNS, and the IV solver's report.
+    """
+
+    timer = instrumentation.start("chains.occ_parse")
+
+    option_df_index = pd.Series(options_df.index).str.extractall(
+        r"^(?P<Ticker>\D*)(?P<Expiration>\d*)(?P<Type>\D*)(?P<Strike>\d*)"
+    )
+
+    option_df_index: DataFrame = option_df_index.reset_index().drop(
+        columns=["match", "level_0"]
+    )
+
+    option_df_index.Expiration = pd.DatetimeIndex(
+        option_df_index.Expiration, yearfirst=True
+    )
+
+    option_df_index.Type = option_df_index.Type.str.replace(
+        "C", "Call"
+    ).str.replace("P", "Put")
+
+    option_df_index.Strike = [ele.lstrip("0") for ele in option_df_index.Strike]
+    option_df_index.Strike = option_df_index.Strike.astype(float)
+    option_df_index.Strike = option_df_index.Strike * (1 / 1000)
+    option_df_index = option_df_index.drop(columns=["Ticker"])
+    ticker_chains = option_df_index.join(options_df.reset_index())
+
+    ticker_chains = ticker_chains.drop(columns=["Option Symbol"]).set_index(
+        keys=["Expiration", "Strike", "Type"]
+    )
+    timer.stop(rows=len(ticker_chains))
+    timer = instrumentation.start("chains.enrich")
+
+    ticker_chains["Theoretical"] = round(
+        ticker_chains["Theoretical"], ndigits=2
+    )
+    ticker_chains["Prev Close"] = round(ticker_chains["Prev Close"], ndigits=2)
+    ticker_chains["% Change"] = round(ticker_chains["% Change"], ndigits=4)
+
+    ticker_chains.Tick = (
+        ticker_chains["Tick"]
+        .str.capitalize()
+        .str.replace(pat="No_change", repl="No Change")
+    )
+
+    ticker_chains.OI = ticker_chains["OI"].astype(int)
+    ticker_chains.Vol = ticker_chains["Vol"].astype(int)
+    ticker_chains["Bid Size"] = ticker_chains["Bid Size"].astype(int)
+    ticker_chains["Ask Size"] = ticker_chains["Ask Size"].astype(int)
+    ticker_chains: DataFrame = ticker_chains.sort_index()
+    ticker_calls: DataFrame = ticker_chains.filter(like="Call", axis=0).copy()
+    ticker_puts: DataFrame = ticker_chains.filter(like="Put", axis=0).copy()
+    ticker_calls = ticker_calls.reset_index()
+
+    ticker_calls.loc[:, ("$ to Spot")] = round(
+        (ticker_calls.loc[:, ("Strike")])
+        + (ticker_calls.loc[:, ("Ask")])
+        - (last_price),
+        ndigits=2,
+    )
+
+    ticker_calls.loc[:, ("% to Spot")] = round(
+        (ticker_calls.loc[:, ("$ to Spot")] / last_price) * 100, ndigits=4
+    )
+
+    ticker_calls.loc[:, ("Breakeven")] = (
+        ticker_calls.loc[:, ("Strike")] + ticker_calls.loc[:, ("Ask")]
+    )
+
+    ticker_calls.loc[:, ("Delta $")] = (
+        (ticker_calls.loc[:, ("Delta")] * 100)
+        * (ticker_calls.loc[:, ("OI")])
+        * last_price
+    )
+
+    ticker_calls.loc[:, ("GEX")] = (
+        ticker_calls.loc[:, ("Gamma")]
+        * 100
+        * ticker_calls.loc[:, ("OI")]
+        * (last_price * last_price)
+        * 0.01
+    )
+
+    ticker_calls.GEX = ticker_calls.GEX.astype(int)
+    ticker_calls["Delta $"] = ticker_calls["Delta $"].astype(int)
+    ticker_calls = ticker_calls.set_index(keys=["Expiration", "Strike", "Type"])
 
-    Returns
-    -------
-    ticker_options: pd.DataFrame
-        DataFrame of all options chains for the ticker
+    ticker_puts = ticker_puts.reset_index()
 
-    Examples
-    --------
-    ticker_options = get_ticker_chains('SPX')
+    ticker_puts.loc[:, ("$ to Spot")] = round(
+        (ticker_puts.loc[:, ("Strike")])
+        - (ticker_puts.loc[:, ("Ask")])
+        - (last_price),
+        ndigits=2,
+    )
 
-    ticker_options = get_ticker_chains('SPX').filter(like = '2027-12-17', axis = 0)
+    ticker_puts.loc[:, ("% to Spot")] = round(
+        (ticker_puts.loc[:, ("$ to Spot")] / last_price) * 100, ndigits=4
+    )
 
-    ticker_calls = get_ticker_chains('AAPL').filter(like = 'Call', axis = 0)
+    ticker_puts.loc[:, ("Breakeven")] = (
+        ticker_puts.loc[:, ("Strike")] - ticker_puts.loc[:, ("Ask")]
+    )
 
-    vix_20C = (
-        get_ticker_chains('VIX')
-        .filter(like = 'Call', axis = 0)
-        .reset_index(['Expiration', 'Type'])
-        .query('20.0')
+    ticker_puts.loc[:, ("Delta $")] = (
+        (ticker_puts.loc[:, ("Delta")] * 100)
+        * (ticker_puts.loc[:, ("OI")])
+        * last_price
+        * (-1)
     )
-    """
 
-    ticker: str = symbol
+    ticker_puts.loc[:, ("GEX")] = (
+        ticker_puts.loc[:, ("Gamma")]
+        * 100
+        * ticker_puts.loc[:, ("OI")]
+        * (last_price * last_price)
+        * 0.01
+    )
 
-    # Checks ticker to determine if ticker is an index or an exception that requires modifying the request's URLs
+    ticker_puts.GEX = ticker_puts.GEX.astype(int)
+    ticker_puts["Delta $"] = ticker_puts["Delta $"].astype(int)
+    ticker_puts.set_index(keys=["Expiration", "Strike", "Type"], inplace=True)
+
+    ticker_chains = pd.concat([ticker_puts, ticker_calls]).sort_index()
+    timer.stop(rows=len(ticker_chains))
+    timer = instrumentation.start("chains.dte")
+
+    temp = ticker_chains.reset_index().get(["Expiration"])
+    temp.Expiration = pd.DatetimeIndex(data=temp.Expiration)
+    temp_ = temp.Expiration - datetime.now()
+    temp_ = temp_.astype(str)
+    temp_ = temp_.str.extractall(r"^(?P<DTE>\d*)")
+    temp_ = temp_.droplevel("match")
+    temp_.DTE = temp_.DTE.fillna("-1")
+    temp_.DTE = temp_.DTE.astype(int)
+    temp_.DTE = temp_.DTE + 1
+    ticker_chains = temp_.join(ticker_chains.reset_index()).set_index(
+        ["Expiration", "Strike", "Type"]
+    )
 
-    try:
+    timer.stop(rows=len(ticker_chains))
 
-        ticker_info, _ = get_ticker_info(ticker)
-        if not ticker_info.empty:
-            last_price = float(ticker_info.loc["Current Price"])
-        else:
-            return pd.DataFrame()
+    # Solves IV for contracts where the CBOE value is missing or zero.
 
-        if ticker in TICKER_EXCEPTIONS:
-            quotes_url = (
-                "https://cdn.cboe.com/api/global/delayed_quotes/options/_"
-                f"{ticker}"
-                ".json"
-            )
-        else:
-            if ticker not in indexes:
-                quotes_url = (
-                    "https://cdn.cboe.com/api/global/delayed_quotes/options/"
-                    f"{ticker}"
-                    ".json"
-                )
-            if ticker in indexes:
-                quotes_url = (
-                    "https://cdn.cboe.com/api/global/delayed_quotes/options/_"
-                    f"{ticker}"
-                    ".json"
-                )
-
-        r = requests.get(quotes_url)
-        if r.status_code != 200:
-            print("No data found for the symbol: " f"{ticker}" "")
-            return pd.DataFrame()
-        else:
-            r_json = r.json()
-            data = pd.DataFrame(r_json["data"])
-            options = pd.Series(data.options, index=data.index)
-            options_columns = list(options[0])
-            options_data = list(options[:])
-            options_df = pd.DataFrame(options_data, columns=options_columns)
-            options_df = pd.DataFrame(options_df).rename(
-                columns={
-                    "option": "Option Symbol",
-                    "bid": "Bid",
-                    "bid_size": "Bid Size",
-                    "ask": "Ask",
-                    "ask_size": "Ask Size",
-                    "iv": "IV",
-                    "open_interest": "OI",
-                    "volume": "Vol",
-                    "delta": "Delta",
-                    "gamma": "Gamma",
-                    "theta": "Theta",
-                    "rho": "Rho",
-                    "vega": "Vega",
-                    "theo": "Theoretical",
-                    "change": "Change",
-                    "open": "Open",
-                    "high": "High",
-                    "low": "Low",
-                    "tick": "Tick",
-                    "last_trade_price": "Last Price",
-                    "last_trade_time": "Timestamp",
-                    "percent_change": "% Change",
-                    "prev_day_close": "Prev Close",
-                }
-            )
+    timer = instrumentation.start("chains.iv_solver")
+    ticker_chains, iv_report = fill_missing_iv(ticker_chains, last_price)
+    timer.stop(rows=iv_report["Contracts"])
 
-            options_df_order: list[str] = [
-                "Option Symbol",
-                "Tick",
-                "Theoretical",
-                "Last Price",
-                "Prev Close",
-                "% Change",
-                "Open",
-                "High",
-                "Low",
-                "Bid Size",
-                "Bid",
-                "Ask",
-                "Ask Size",
-                "Vol",
-                "OI",
-                "IV",
-                "Theta",
-                "Delta",
-                "Gamma",
-                "Vega",
-                "Rho",
-                "Timestamp",
-            ]
+    ticker_chains["Expected Move"] = round(
+        (ticker_chains["Last Price"] * ticker_chains["IV"])
+        * (np.sqrt(ticker_chains["DTE"] / 252)),
+        ndigits=2,
+    )
 
-            options_df: DataFrame = DataFrame(
-                options_df, columns=options_df_order
-            ).set_index(keys=["Option Symbol"])
+    ticker_chains = DataFrame(data=ticker_chains, columns=CHAINS_COLUMNS)
 
-            option_df_index = pd.Series(options_df.index).str.extractall(
-                r"^(?P<Ticker>\D*)(?P<Expiration>\d*)(?P<Type>\D*)(?P<Strike>\d*)"
-            )
+    return ticker_chains, iv_report
 
-            option_df_index: DataFrame = option_df_index.reset_index().drop(
-                columns=["match", "level_0"]
-            )
 
-            option_df_index.Expiration = pd.DatetimeIndex(
-                option_df_index.Expiration, yearfirst=True
-            )
+# %%
+class LazyChain(object):
+    """Options chains indexed by expiration once, and materialized one expiration at a time.
 
-            option_df_index.Type = option_df_index.Type.str.replace(
-                "C", "Call"
-            ).str.replace("P", "Put")
+    The option records of the payload are decoded and grouped by expiration
+    up front, together with `light`: the columns the aggregate views need, for
+    every contract. The complete, enriched columns of an expiration are only
+    built the first time that expiration is accessed.
+
+    Parameters
+    ----------
+    payload: bytes
+        The raw delayed_quotes/options JSON.
+    last_price: float
+        Price of the underlying.
 
-            option_df_index.Strike = [ele.lstrip("0") for ele in option_df_index.Strike]
-            option_df_index.Strike = option_df_index.Strike.astype(float)
-            option_df_index.Strike = option_df_index.Strike * (1 / 1000)
-            option_df_index = option_df_index.drop(columns=["Ticker"])
-            ticker_chains = option_df_index.join(options_df.reset_index())
+    Example
+    -------
+    spx = LazyChain(get_ticker_options('SPX'), 4000)
 
-            ticker_chains = ticker_chains.drop(columns=["Option Symbol"]).set_index(
-                keys=["Expiration", "Strike", "Type"]
-            )
+    front_month = spx.expiration(spx.expirations[0])
 
-            ticker_chains["Theoretical"] = round(
-                ticker_chains["Theoretical"], ndigits=2
-            )
-            ticker_chains["Prev Close"] = round(ticker_chains["Prev Close"], ndigits=2)
-            ticker_chains["% Change"] = round(ticker_chains["% Change"], ndigits=4)
+    by_strike = calc_chains_by_strike(spx.light)
+    """
 
-            ticker_chains.Tick = (
-                ticker_chains["Tick"]
-                .str.capitalize()
-                .str.replace(pat="No_change", repl="No Change")
-            )
+    def __init__(self, payload: bytes, last_price: float) -> None:
+        timer = instrumentation.start("chains.lazy_index")
+        self.last_price = float(last_price)
+        self._records: list = json.loads(payload)["data"]["options"]
+        self._frames: dict = {}
+        self._full: Optional[DataFrame] = None
+        self._lock = threading.Lock()
+
+        # OCC symbols end in the expiration as YYMMDD, C or P, and the strike times 1000 in eight digits.
+
+        symbols = pd.Series([record["option"] for record in self._records], dtype=object)
+        expiration = pd.to_datetime(symbols.str[-15:-9], format="%y%m%d").to_numpy()
+        strike = symbols.str[-8:].astype(int).to_numpy() / 1000
+        option_type = np.where(symbols.str[-9] == "C", "Call", "Put")
+        order = np.lexsort((option_type, strike, expiration))
+        self._order = order
+
+        expirations, starts = np.unique(expiration[order], return_index=True)
+        self.expirations: pd.DatetimeIndex = pd.DatetimeIndex(expirations, name="Expiration")
+        self._positions: dict = {
+            expiration_: order[start:stop]
+            for expiration_, start, stop in zip(self.expirations, starts, list(starts[1:]) + [len(order)])
+        }
+        self.light: DataFrame = self._build_light(expiration[order], strike[order], option_type[order], order)
+        self.light.attrs["Snapshot"] = snapshot_id(payload)
+        timer.stop(rows=len(self.light))
+
+    def _build_light(
+        self, expiration: np.ndarray, strike: np.ndarray, option_type: np.ndarray, order: np.ndarray
+    ) -> DataFrame:
+        """The columns of every contract needed by the aggregate views, computed as in enrich_chains."""
+
+        fields = {
+            "last_trade_price": "Last Price",
+            "percent_change": "% Change",
+            "theo": "Theoretical",
+            "volume": "Vol",
+            "open_interest": "OI",
+            "iv": "IV",
+            "delta": "Delta",
+            "gamma": "Gamma",
+            "bid": "Bid",
+            "ask": "Ask",
+        }
+        columns = {
+            column: np.array([record[field] for record in self._records], dtype=float)[order]
+            for field, column in fields.items()
+        }
+        index = pd.MultiIndex.from_arrays(
+            [pd.DatetimeIndex(expiration), strike, option_type], names=["Expiration", "Strike", "Type"]
+        )
+        light = DataFrame(columns, index=index)
 
-            ticker_chains.OI = ticker_chains["OI"].astype(int)
-            ticker_chains.Vol = ticker_chains["Vol"].astype(int)
-            ticker_chains["Bid Size"] = ticker_chains["Bid Size"].astype(int)
-            ticker_chains["Ask Size"] = ticker_chains["Ask Size"].astype(int)
-            ticker_chains: DataFrame = ticker_chains.sort_index()
-            ticker_calls: DataFrame = ticker_chains.filter(like="Call", axis=0).copy()
-            ticker_puts: DataFrame = ticker_chains.filter(like="Put", axis=0).copy()
-            ticker_calls = ticker_calls.reset_index()
-
-            ticker_calls.loc[:, ("$ to Spot")] = round(
-                (ticker_calls.loc[:, ("Strike")])
-                + (ticker_calls.loc[:, ("Ask")])
-                - (last_price),
-                ndigits=2,
-            )
+        days = (pd.DatetimeIndex(expiration) - pd.Timestamp(datetime.now())) // pd.Timedelta(days=1)
+        light["DTE"] = np.asarray(days, dtype=int) + 1
+        light["Theoretical"] = round(light["Theoretical"], ndigits=2)
+        light["% Change"] = round(light["% Change"], ndigits=4)
+        light["OI"] = light["OI"].astype(int)
+        light["Vol"] = light["Vol"].astype(int)
 
-            ticker_calls.loc[:, ("% to Spot")] = round(
-                (ticker_calls.loc[:, ("$ to Spot")] / last_price) * 100, ndigits=4
-            )
+        is_call = option_type == "Call"
+        delta_dollars = (light["Delta"] * 100) * light["OI"] * self.last_price
+        light["Delta $"] = np.where(is_call, delta_dollars, delta_dollars * (-1)).astype(int)
+        gex = light["Gamma"] * 100 * light["OI"] * (self.last_price * self.last_price) * 0.01
+        light["GEX"] = gex.astype(int)
 
-            ticker_calls.loc[:, ("Breakeven")] = (
-                ticker_calls.loc[:, ("Strike")] + ticker_calls.loc[:, ("Ask")]
-            )
+        light, iv_report = fill_missing_iv(light, self.last_price)
+        light = DataFrame(light, columns=[column for column in CHAINS_COLUMNS if column in light.columns])
+        light.attrs["IV Solver"] = iv_report.to_dict()
 
-            ticker_calls.loc[:, ("Delta $")] = (
-                (ticker_calls.loc[:, ("Delta")] * 100)
-                * (ticker_calls.loc[:, ("OI")])
-                * last_price
-            )
+        return light
 
-            ticker_calls.loc[:, ("GEX")] = (
-                ticker_calls.loc[:, ("Gamma")]
-                * 100
-                * ticker_calls.loc[:, ("OI")]
-                * (last_price * last_price)
-                * 0.01
-            )
+    def __len__(self) -> int:
+        return len(self.light)
 
-            ticker_calls.GEX = ticker_calls.GEX.astype(int)
-            ticker_calls["Delta $"] = ticker_calls["Delta $"].astype(int)
-            ticker_calls = ticker_calls.set_index(keys=["Expiration", "Strike", "Type"])
+    def __getstate__(self) -> dict:
+        state = dict(vars(self))
+        del state["_lock"]
+        return state
 
-            ticker_puts = ticker_puts.reset_index()
+    def __setstate__(self, state: dict) -> None:
+        vars(self).update(state)
+        self._lock = threading.Lock()
 
-            ticker_puts.loc[:, ("$ to Spot")] = round(
-                (ticker_puts.loc[:, ("Strike")])
-                - (ticker_puts.loc[:, ("Ask")])
-                - (last_price),
-                ndigits=2,
-            )
+    def expiration(self, expiration: object) -> DataFrame:
+        """The complete chains of one expiration, built on first access.
 
-            ticker_puts.loc[:, ("% to Spot")] = round(
-                (ticker_puts.loc[:, ("$ to Spot")] / last_price) * 100, ndigits=4
-            )
+        Parameters
+        ----------
+        expiration: object
+            The expiration, as a Timestamp or date string.
 
-            ticker_puts.loc[:, ("Breakeven")] = (
-                ticker_puts.loc[:, ("Strike")] - ticker_puts.loc[:, ("Ask")]
-            )
+        Returns
+        -------
+        pd.DataFrame: The chains of the expiration, as in get_ticker_chains.
+        """
 
-            ticker_puts.loc[:, ("Delta $")] = (
-                (ticker_puts.loc[:, ("Delta")] * 100)
-                * (ticker_puts.loc[:, ("OI")])
-                * last_price
-                * (-1)
-            )
+        expiration = pd.Timestamp(expiration)
+        with self._lock:
+            frame = self._frames.get(expiration)
+            full = self._full
+        if frame is not None:
+            return frame
+        if expiration not in self._positions:
+            return DataFrame(columns=CHAINS_COLUMNS)
+
+        if full is not None:
+            frame = full[full.index.get_level_values("Expiration") == expiration]
+        else:
+            timer = instrumentation.start("chains.materialize")
+            records = [self._records[position] for position in self._positions[expiration]]
+            frame, _ = enrich_chains(decode_options(records), self.last_price)
+            timer.stop(rows=len(frame))
+        with self._lock:
+            self._frames[expiration] = frame
 
-            ticker_puts.loc[:, ("GEX")] = (
-                ticker_puts.loc[:, ("Gamma")]
-                * 100
-                * ticker_puts.loc[:, ("OI")]
-                * (last_price * last_price)
-                * 0.01
-            )
+        return frame
 
-            ticker_puts.GEX = ticker_puts.GEX.astype(int)
-            ticker_puts["Delta $"] = ticker_puts["Delta $"].astype(int)
-            ticker_puts.set_index(keys=["Expiration", "Strike", "Type"], inplace=True)
-
-            ticker_chains = pd.concat([ticker_puts, ticker_calls]).sort_index()
-
-            temp = ticker_chains.reset_index().get(["Expiration"])
-            temp.Expiration = pd.DatetimeIndex(data=temp.Expiration)
-            temp_ = temp.Expiration - datetime.now()
-            temp_ = temp_.astype(str)
-            temp_ = temp_.str.extractall(r"^(?P<DTE>\d*)")
-            temp_ = temp_.droplevel("match")
-            temp_.DTE = temp_.DTE.fillna("-1")
-            temp_.DTE = temp_.DTE.astype(int)
-            temp_.DTE = temp_.DTE + 1
-            ticker_chains = temp_.join(ticker_chains.reset_index()).set_index(
-                ["Expiration", "Strike", "Type"]
-            )
+    def select(self, expirations: list) -> DataFrame:
+        """The complete chains of some expirations, building only those."""
 
-            ticker_chains["Expected Move"] = round(
-                (ticker_chains["Last Price"] * ticker_chains["IV"])
-                * (np.sqrt(ticker_chains["DTE"] / 252)),
-                ndigits=2,
-            )
+        frames = [self.expiration(expiration) for expiration in sorted(set(pd.to_datetime(list(expirations))))]
+        if not frames:
+            return DataFrame(columns=CHAINS_COLUMNS)
 
-            ticker_chains_cols: list[str] = [
-                "DTE",
-                "Tick",
-                "Last Price",
-                "Expected Move",
-                "% Change",
-                "Theoretical",
-                "$ to Spot",
-                "% to Spot",
-                "Breakeven",
-                "Vol",
-                "OI",
-                "Delta $",
-                "GEX",
-                "IV",
-                "Theta",
-                "Delta",
-                "Gamma",
-                "Vega",
-                "Rho",
-                "Open",
-                "High",
-                "Low",
-                "Prev Close",
-                "Bid Size",
-                "Bid",
-                "Ask",
-                "Ask Size",
-                "Timestamp",
-            ]
+        return pd.concat(frames)
 
-            ticker_chains = DataFrame(data=ticker_chains, columns=ticker_chains_cols)
+    def to_frame(self) -> DataFrame:
+        """The complete chains of every expiration, built in one pass on first access."""
 
-    except HTTPError:
-        print("There was an error with the request'\n")
+        with self._lock:
+            full = self._full
+        if full is not None:
+            return full
 
-    return ticker_chains
+        timer = instrumentation.start("chains.materialize")
+        full, _ = enrich_chains(decode_options(self._records), self.last_price)
+        full.attrs = dict(self.light.attrs)
+        timer.stop(rows=len(full))
+        with self._lock:
+            self._full = full
 
+        return full
 
 # %%
 def separate_chains(chains_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -728,8 +1249,9 @@ def separate_chains(chains_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame
     """
 
     if not chains_df.empty and chains_df is not None:
-        calls: pd.DataFrame = chains_df.filter(like="Call", axis=0).copy()
-        puts: pd.DataFrame = chains_df.filter(like="Put", axis=0).copy()
+        option_types = chains_df.index.get_level_values("Type")
+        calls: pd.DataFrame = chains_df[option_types == "Call"]
+        puts: pd.DataFrame = chains_df[option_types == "Put"]
 
         return calls, puts
 
@@ -743,13 +1265,34 @@ def separate_chains(chains_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame
         return calls, puts
 
 
+# %%
+def sum_by_type(chains_df: pd.DataFrame, key: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Sums OI, Vol, Delta $ and GEX by `key` for calls and puts.
+
+    A pyarrow Table is aggregated with Arrow's group-by, without converting it to pandas.
+
+    Example
+    -------
+    calls_by_strike, puts_by_strike = sum_by_type(chains_df, 'Strike')
+    """
+
+    if arrow_chains.is_table(chains_df):
+        return arrow_chains.sum_by_type(chains_df, key)
+
+    calls, puts = separate_chains(chains_df)
+    columns = ["OI", "Vol", "Delta $", "GEX"]
+    calls_by_key = calls.reset_index().groupby(key).sum(numeric_only=True)[columns]
+    puts_by_key = puts.reset_index().groupby(key).sum(numeric_only=True)[columns]
+
+    return calls_by_key, puts_by_key
+
 # %%
 def calc_chains_by_expiration(chains_df: pd.DataFrame) -> pd.DataFrame:
     """Calculates stats for options chains by expiration.
     Parameters
     ----------
-    chains_df: pd.DataFrame
-        DataFrame of options chains to use.
+    chains_df: pd.DataFrame or pa.Table
+        DataFrame of options chains to use, or a Table from get_ticker_table.
 
     Returns
     -------
@@ -761,15 +1304,9 @@ def calc_chains_by_expiration(chains_df: pd.DataFrame) -> pd.DataFrame:
     chains_by_expiration = calc_chains_by_expiration(chains_df)
     """
 
-    if not chains_df.empty and chains_df is not None:
-
-        calls, puts = separate_chains(chains_df)
+    if arrow_chains.is_table(chains_df) or (chains_df is not None and not chains_df.empty):
 
-        calls_by_expiration = (
-            calls.reset_index()
-            .groupby("Expiration")
-            .sum(numeric_only=True)[["OI", "Vol", "Delta $", "GEX"]]
-        )
+        calls_by_expiration, puts_by_expiration = sum_by_type(chains_df, "Expiration")
 
         calls_by_expiration = calls_by_expiration.rename(
             columns={
@@ -780,12 +1317,6 @@ def calc_chains_by_expiration(chains_df: pd.DataFrame) -> pd.DataFrame:
             }
         )
 
-        puts_by_expiration = (
-            puts.reset_index()
-            .groupby("Expiration")
-            .sum(numeric_only=True)[["OI", "Vol", "Delta $", "GEX"]]
-        )
-
         puts_by_expiration["Delta $"] = puts_by_expiration["Delta $"] * (-1)
         puts_by_expiration["GEX"] = puts_by_expiration["GEX"] * (-1)
 
@@ -865,8 +1396,8 @@ def calc_chains_by_strike(chains_df: pd.DataFrame) -> pd.DataFrame:
     """
     Parameters
     ----------
-    chains_df: pd.DataFrame
-        Dataframe of the chains by expiration
+    chains_df: pd.DataFrame or pa.Table
+        Dataframe of the chains by expiration, or a Table from get_ticker_table
 
     Returns
     -------
@@ -878,15 +1409,9 @@ def calc_chains_by_strike(chains_df: pd.DataFrame) -> pd.DataFrame:
     chains_by_strike = calc_chains_by_strike(chains_df)
     """
 
-    if not chains_df.empty and chains_df is not None:
-
-        calls, puts = separate_chains(chains_df)
+    if arrow_chains.is_table(chains_df) or (chains_df is not None and not chains_df.empty):
 
-        calls_by_strike = (
-            calls.reset_index()
-            .groupby("Strike")
-            .sum(numeric_only=True)[["OI", "Vol", "Delta $", "GEX"]]
-        )
+        calls_by_strike, puts_by_strike = sum_by_type(chains_df, "Strike")
 
         calls_by_strike = calls_by_strike.rename(
             columns={
@@ -897,12 +1422,6 @@ def calc_chains_by_strike(chains_df: pd.DataFrame) -> pd.DataFrame:
             }
         )
 
-        puts_by_strike = (
-            puts.reset_index()
-            .groupby("Strike")
-            .sum(numeric_only=True)[["OI", "Vol", "Delta $", "GEX"]]
-        )
-
         puts_by_strike["Delta $"] = puts_by_strike["Delta $"] * (-1)
         puts_by_strike["GEX"] = puts_by_strike["GEX"] * (-1)
 
@@ -956,15 +1475,319 @@ def calc_chains_by_strike(chains_df: pd.DataFrame) -> pd.DataFrame:
         chains_by_strike = pd.DataFrame()
         return chains_by_strike
 
+# %%
+def calc_max_pain(chains_df: pd.DataFrame) -> pd.DataFrame:
+    """Calculates the max pain strike and the OI pin level for each expiration.
+
+    Total option-holder payout at every candidate strike is evaluated with cumulative
+    sums over the sorted strikes of each expiration, rather than a strike-by-strike loop.
+
+    Parameters
+    ----------
+    chains_df: pd.DataFrame
+        DataFrame of options chains to use.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with Max Pain, Pin Strike and Pin OI % by expiration date.
+
+    Example
+    -------
+    max_pain = calc_max_pain(chains_df)
+    """
+
+    if not chains_df.empty and chains_df is not None:
+
+        # Index options list monthly expirations under two roots, i.e. SPX and SPXW, so the OI of a key is summed.
+
+        oi = chains_df["OI"].groupby(level=["Expiration", "Strike", "Type"]).sum().unstack("Type")
+        oi = oi.reindex(columns=["Call", "Put"])
+        oi = oi.fillna(0).astype(float).sort_index()
+        expirations = oi.index.get_level_values("Expiration")
+        strikes = pd.Series(oi.index.get_level_values("Strike"), index=oi.index)
+        calls = oi["Call"]
+        puts = oi["Put"]
+
+        # Calls pay out on strikes below the settlement, puts on strikes above it.
+
+        call_oi_cum = calls.groupby(expirations).cumsum()
+        call_k_cum = (calls * strikes).groupby(expirations).cumsum()
+        put_oi_cum = puts.groupby(expirations).cumsum()
+        put_k_cum = (puts * strikes).groupby(expirations).cumsum()
+        put_oi_total = puts.groupby(expirations).transform("sum")
+        put_k_total = (puts * strikes).groupby(expirations).transform("sum")
+
+        call_payout = strikes * call_oi_cum - call_k_cum
+        put_payout = (put_k_total - put_k_cum) - strikes * (put_oi_total - put_oi_cum)
+        payout = (call_payout + put_payout) * 100
+
+        net_oi = calls + puts
+        max_pain = strikes.loc[payout.groupby(expirations).idxmin()].droplevel("Strike")
+        pin_strike = strikes.loc[net_oi.groupby(expirations).idxmax()].droplevel("Strike")
+        pin_oi = net_oi.groupby(expirations).max() / net_oi.groupby(expirations).sum()
+
+        chains_max_pain = pd.DataFrame(
+            {
+                "Max Pain": max_pain,
+                "Pin Strike": pin_strike,
+                "Pin OI %": round(pin_oi * 100, ndigits=4),
+            }
+        )
+
+        return chains_max_pain
+
+    else:
+        print(
+            "There was an error with the input data, or the DataFrame passed was empty."
+            "\n"
+        )
+        chains_max_pain = pd.DataFrame()
+        return chains_max_pain
+
+# %%
+def calc_iv_skew(
+    calls: pd.DataFrame, puts: pd.DataFrame, stock_price: float
+) -> pd.DataFrame:
+    """Calculates the IV skew between ATM calls and 5% OTM puts for each expiration.
+
+    The lowest call strike between 99.5% and 105% of the price, and the lowest
+    put strike between 94% and 100% of the price, are used for each expiration.
+
+    Parameters
+    ----------
+    calls: pd.DataFrame
+        DataFrame of call options chains.
+    puts: pd.DataFrame
+        DataFrame of put options chains.
+    stock_price: float
+        Current price of the underlying.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame of Call Strike, Call IV, Put Strike, Put IV and IV Skew by expiration date.
+
+    Example
+    -------
+    iv_skew = calc_iv_skew(calls, puts, 4000)
+    """
+
+    stock_price = float(stock_price)
+    atm_calls: DataFrame = calls.reset_index()[["Expiration", "Strike", "IV"]]
+    call_strikes = atm_calls["Strike"]
+    atm_calls = atm_calls[
+        (call_strikes >= stock_price * 0.995) & (call_strikes <= stock_price * 1.05)
+    ]
+    atm_calls = (
+        atm_calls.sort_values(["Expiration", "Strike"], kind="stable")
+        .drop_duplicates("Expiration")
+        .set_index("Expiration")
+    )
+    atm_calls = atm_calls.rename(columns={"Strike": "Call Strike", "IV": "Call IV"})
+    otm_puts: DataFrame = puts.reset_index()[["Expiration", "Strike", "IV"]]
+    put_strikes = otm_puts["Strike"]
+    otm_puts = otm_puts[
+        (put_strikes >= stock_price * 0.94) & (put_strikes <= stock_price)
+    ]
+    otm_puts = (
+        otm_puts.sort_values(["Expiration", "Strike"], kind="stable")
+        .drop_duplicates("Expiration")
+        .set_index("Expiration")
+    )
+    otm_puts = otm_puts.rename(columns={"Strike": "Put Strike", "IV": "Put IV"})
+    iv_skew: DataFrame = atm_calls.join(otm_puts)
+    iv_skew["IV Skew"] = iv_skew["Put IV"] - iv_skew["Call IV"]
+
+    return iv_skew
+
+# %%
+def calc_ticker_summary(ticker: object) -> pd.Series:
+    """Calculates the summary metrics shown in the dashboard header for a loaded ticker.
+
+    Parameters
+    ----------
+    ticker: object
+        A Ticker object returned by Ticker.get_ticker.
+
+    Returns
+    -------
+    pd.Series
+        IV30, Put-Call Ratio, Turnover Ratio, Net GEX and the front-month IV Skew.
+
+    Example
+    -------
+    summary = calc_ticker_summary(ticker)
+    """
+
+    totals = ticker.by_expiration.sum(numeric_only=True)
+    skew = ticker.skew["IV Skew"].dropna()
+
+    ticker_summary = pd.Series(
+        {
+            "IV30": float(ticker.details["IV30"]),
+            "Put-Call Ratio": float(ticker.details["Put-Call Ratio"]),
+            "Turnover Ratio": (totals["Call Vol"] + totals["Put Vol"])
+            / (totals["Call OI"] + totals["Put OI"]),
+            "Net GEX": totals["Net GEX"],
+            "IV Skew": skew.iloc[0] if not skew.empty else np.nan,
+        },
+        name=ticker.symbol,
+    )
+
+    return ticker_summary
+
+# %%
+def calc_ticker_analytics(
+    chains_df: pd.DataFrame, stock_price: float, chains_table: Optional[object] = None
+) -> dict:
+    """Runs the CPU-bound analytics of Ticker.get_ticker on a loaded chain.
+
+    Parameters
+    ----------
+    chains_df: pd.DataFrame
+        DataFrame of options chains.
+    stock_price: float
+        Current price of the underlying.
+    chains_table: pa.Table
+        The same chains as a Table, if the Arrow backend built them, for the Arrow aggregations.
+
+    Returns
+    -------
+    dict: calls, puts, by_expiration, by_strike, skew, gex_profile, gex_levels, distribution, expected_range
+        and cube.
+
+    Example
+    -------
+    analytics = calc_ticker_analytics(chains_df, 4000)
+    """
+
+    chains = chains_table if arrow_chains.is_table(chains_table) else chains_df
+    timer = instrumentation.start("ticker.separate_chains")
+    calls, puts = separate_chains(chains_df)
+    timer.stop()
+    timer = instrumentation.start("ticker.by_expiration")
+    by_expiration = calc_chains_by_expiration(chains)
+    timer.stop(rows=len(by_expiration))
+    timer = instrumentation.start("ticker.by_strike")
+    by_strike = calc_chains_by_strike(chains)
+    timer.stop(rows=len(by_strike))
+    timer = instrumentation.start("ticker.max_pain")
+    by_expiration = by_expiration.join(calc_max_pain(chains_df))
+    timer.stop()
+
+    # Calculate IV Skew by Expiration
+
+    timer = instrumentation.start("ticker.skew")
+    iv_skew: DataFrame = calc_iv_skew(calls, puts, stock_price)
+    by_expiration["IV Skew"] = iv_skew["IV Skew"]
+    timer.stop(rows=len(iv_skew))
+    timer = instrumentation.start("ticker.gex_profile")
+    gex_profile, gex_levels = calc_gex_profile(chains_df, stock_price)
+    timer.stop(rows=len(gex_profile))
+    timer = instrumentation.start("ticker.distribution")
+    distribution = calc_implied_distribution(calls, puts, stock_price)
+    expected_range = calc_expected_range(distribution, stock_price)
+    timer.stop(rows=len(distribution))
+    timer = instrumentation.start("ticker.cube")
+    cube = AnalyticsCube(chains_df, stock_price)
+    timer.stop(rows=len(chains_df))
+
+    return {
+        "calls": calls,
+        "puts": puts,
+        "by_expiration": by_expiration,
+        "by_strike": by_strike,
+        "skew": iv_skew,
+        "gex_profile": gex_profile,
+        "gex_levels": gex_levels,
+        "distribution": distribution,
+        "expected_range": expected_range,
+        "cube": cube,
+    }
+
+def calc_ticker_products(options: bytes, stock_price: float, backend: str = "pandas") -> dict:
+    """Decodes a raw options payload and runs the analytics of Ticker.load on it.
+
+    Decoding and analytics run in the worker pool when there is one,
+    otherwise with the `backend` from chains_backend. The lazy backend runs
+    the analytics on the light columns of a LazyChain and leaves chains None.
+
+    Returns
+    -------
+    dict: table, chains, lazy and the products of calc_ticker_analytics. table is None but for the Arrow
+        backend and the worker pool, and lazy is None but for the lazy backend.
+
+    Example
+    -------
+    products = calc_ticker_products(get_ticker_options('SPX'), 4000)
+    """
+
+    timer = instrumentation.start("ticker.chains")
+    pool = workers.get_pool()
+    analytics: Optional[dict] = None
+    lazy: Optional[LazyChain] = None
+    if pool is not None:
+        # Decoding and analytics run in a worker process; the frames come back as Arrow IPC.
+
+        analytics = workers.run_ticker_analytics(pool, options, stock_price)
+        chains_table = analytics.pop("table")
+        chains_df = arrow_chains.to_pandas(chains_table)
+        analytics["calls"], analytics["puts"] = separate_chains(chains_df)
+    elif backend == "arrow":
+        chains_table = build_chains_table(options, stock_price)
+        chains_df = arrow_chains.to_pandas(chains_table)
+    elif backend == "lazy":
+        chains_table = None
+        lazy = LazyChain(options, stock_price)
+        chains_df = lazy.light
+    else:
+        chains_table = None
+        chains_df = parse_ticker_chains(options, stock_price)
+    timer.stop(rows=len(chains_df))
+    if analytics is None:
+        analytics = calc_ticker_analytics(chains_df, stock_price, chains_table)
+
+    return {"table": chains_table, "chains": None if lazy is not None else chains_df, "lazy": lazy, **analytics}
+
 # %%
 
 class Ticker(object):
     """Class object for a single ticker"""
 
+    lazy: Optional[LazyChain] = None
+    _chains: Optional[DataFrame] = None
+
     def __init__(self) -> None:
         return None
     self = __init__
 
+    @property
+    def chains(self) -> Optional[DataFrame]:
+        """The complete chains. With the lazy backend, every expiration is built on first access."""
+
+        if self._chains is None and self.lazy is not None:
+            self._chains = self.lazy.to_frame()
+
+        return self._chains
+
+    @chains.setter
+    def chains(self, chains_df: Optional[DataFrame]) -> None:
+        self._chains = chains_df
+
+    def expiration_chains(self, expirations: list) -> DataFrame:
+        """The complete chains of some expirations. With the lazy backend, only those are built.
+
+        Example
+        -------
+        front_month = ticker.expiration_chains(ticker.by_expiration.index[:1])
+        """
+
+        if self._chains is None and self.lazy is not None:
+            return self.lazy.select(expirations)
+
+        return self.chains[self.chains.index.get_level_values("Expiration").isin(pd.to_datetime(list(expirations)))]
+
     def get_ticker(self, symbol:str) -> object:
         """Gets all data from the CBOE for a given ticker and returns an object
 
@@ -981,11 +1804,23 @@ class Ticker(object):
             ticker.expirations
             ticker.iv
             ticker.chains
+            ticker.table (pa.Table with the Arrow backend, otherwise None)
             ticker.calls
             ticker.puts
             ticker.by_expiration
             ticker.by_strike
             ticker.skew
+            ticker.iv_report
+            ticker.snapshot
+            ticker.version
+            ticker.gex_profile
+            ticker.gex_levels
+            ticker.distribution
+            ticker.expected_range
+            ticker.cube
+            ticker.summary
+            ticker.realized_vol
+            ticker.iv_stats
 
         Examples
         --------
@@ -995,49 +1830,124 @@ class Ticker(object):
 
         """
         try:
+            total = instrumentation.start("ticker.total")
             self.symbol = symbol.upper()
-            self.details, self.expirations = get_ticker_info(self.symbol)
-            symbol_ = self.details.columns[0]
-            self.details = self.details[symbol_]
-            stock_price = self.details["Current Price"]
-            self.stock_price = stock_price
-            self.iv = get_ticker_iv(self.symbol)
-            self.iv = self.iv[symbol_]
-            self.chains = get_ticker_chains(self.symbol)
-            self.calls, self.puts = separate_chains(self.chains)
-            self.by_expiration = calc_chains_by_expiration(self.chains)
-            self.by_strike = calc_chains_by_strike(self.chains)
-            self.details["Put-Call Ratio"] = (
-                self.by_expiration.sum()["Put OI"] / self.by_expiration.sum()["Call OI"]
-            )
-            self.name = str(directory.query("`Symbol` ==  @ticker.symbol")['Company Name'][0])
-
-            # Calculate IV Skew by Expiration
-
-            atm_calls: DataFrame = self.calls.reset_index()[
-                ["Expiration", "Strike", "IV"]
-            ]
-            atm_calls = atm_calls.query(
-                "@self.stock_price*0.995 <= Strike <= @self.stock_price*1.05"
-            )
-            atm_calls = atm_calls.groupby("Expiration")[["Strike", "IV"]]
-            atm_calls = atm_calls.apply(lambda x: x.loc[x["Strike"].idxmin()])
-            atm_calls = atm_calls.rename(columns={"Strike": "Call Strike", "IV": "Call IV"})
-            otm_puts: DataFrame = self.puts.reset_index()[["Expiration", "Strike", "IV"]]
-            otm_puts = otm_puts.query(
-                "@self.stock_price*0.94 <= Strike <= @self.stock_price"
-            )
-            otm_puts = otm_puts.groupby("Expiration")[["Strike", "IV"]]
-            otm_puts = otm_puts.apply(lambda x: x.loc[x["Strike"].idxmin()])
-            otm_puts = otm_puts.rename(columns={"Strike": "Put Strike", "IV": "Put IV"})
-            iv_skew: DataFrame = atm_calls.join(otm_puts)
-            iv_skew["IV Skew"] = iv_skew["Put IV"] - iv_skew["Call IV"]
-            self.skew = iv_skew
-            self.by_expiration["IV Skew"] = iv_skew["IV Skew"]
+            timer = instrumentation.start("ticker.info")
+            details, expirations = get_ticker_info(self.symbol)
+            timer.stop()
+            timer = instrumentation.start("ticker.iv")
+            iv = get_ticker_iv(self.symbol)
+            timer.stop()
+            self.load(self.symbol, details, expirations, iv, get_ticker_options(self.symbol))
+            total.stop(rows=len(self.calls) + len(self.puts))
 
         except Exception:
             print("\n")
 
-        return ticker
+        return self
+
+    def load(
+        self,
+        symbol: str,
+        details: pd.DataFrame,
+        expirations: list[str],
+        iv: pd.DataFrame,
+        options: Optional[bytes],
+    ) -> object:
+        """Builds the ticker from its fetched info, IV and raw options payload, without any requests.
+
+        This is the CPU-bound part of get_ticker, shared with the async loader.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker symbol.
+        details: pd.DataFrame
+            The ticker details, from get_ticker_info.
+        expirations: list[str]
+            The expiration dates, from get_ticker_info.
+        iv: pd.DataFrame
+            The annual high/low table, from get_ticker_iv.
+        options: bytes
+            The raw delayed_quotes/options payload, from get_ticker_options.
+
+        Returns
+        -------
+        object: The ticker, as from get_ticker.
+
+        Example
+        -------
+        spx = Ticker().load('SPX', *get_ticker_info('SPX'), get_ticker_iv('SPX'), get_ticker_options('SPX'))
+        """
+
+        if options is None:
+            print("No data found for the symbol: " f"{symbol}" "")
+            raise ValueError(f"No options data for {symbol}")
+
+        self.symbol = symbol.upper()
+        symbol_ = details.columns[0]
+        self.details = details[symbol_]
+        self.expirations = expirations
+        stock_price = self.details["Current Price"]
+        self.stock_price = stock_price
+        self.iv = iv[symbol_]
 
-ticker: Ticker = Ticker()
\ No newline at end of file
+        # An unchanged payload at an unchanged price gives the same chains and analytics, so they are reused.
+
+        products = cached_parse("ticker", self.symbol, options, calc_ticker_products, float(self.stock_price), chains_backend())
+        self.table = products["table"]
+        self.lazy = products["lazy"]
+        self.chains = products["chains"]
+
+        # The snapshot and activity stages only need the light columns, so a lazy chain stays unbuilt.
+
+        contracts = self.lazy.light if self.lazy is not None else self.chains
+        self.iv_report = pd.Series(contracts.attrs.get("IV Solver", {}), name="IV Solver", dtype=object)
+        self.snapshot = contracts.attrs.get("Snapshot", "")
+
+        # The analytics also depend on the price and annual ranges from the other payloads, and DTE on the day.
+
+        self.version = snapshot_id(
+            json.dumps([self.snapshot, float(self.stock_price), str(datetime.now().date()), self.iv.astype(str).tolist()]).encode()
+        )
+        self.calls = products["calls"]
+        self.puts = products["puts"]
+        self.by_expiration = products["by_expiration"]
+        self.by_strike = products["by_strike"]
+        self.skew = products["skew"]
+        self.gex_profile = products["gex_profile"]
+        self.gex_levels = products["gex_levels"]
+        self.distribution = products["distribution"]
+        self.expected_range = products["expected_range"]
+        self.cube = products["cube"]
+        self.details["Put-Call Ratio"] = (
+            self.by_expiration.sum()["Put OI"] / self.by_expiration.sum()["Call OI"]
+        )
+        self.name = str(get_directory_names().get(self.symbol, self.symbol))
+        timer = instrumentation.start("ticker.summary")
+        self.summary = calc_ticker_summary(self)
+        history.record(self.symbol, self.summary, snapshot_id=self.snapshot)
+        snapshots.record(self.symbol, contracts, snapshot_id=self.snapshot)
+        timer.stop()
+        timer = instrumentation.start("ticker.volatility")
+        iv_range = pd.to_numeric(self.iv, errors="coerce")
+        self.realized_vol = volatility.series(self.symbol)
+        self.iv_stats = volatility.calc_iv_stats(
+            self.symbol,
+            self.summary["IV30"],
+            iv_range.get("IV30 1Y High", np.nan),
+            iv_range.get("IV30 1Y Low", np.nan),
+            history.resample(self.symbol, "1D", start=utc_now() - pd.Timedelta(days=366), columns=["IV30"])["IV30"],
+        )
+        timer.stop(rows=len(self.realized_vol))
+        timer = instrumentation.start("ticker.activity")
+        self.unusual_activity = activity.update(self.symbol, contracts, snapshots)
+        timer.stop(rows=len(contracts))
+
+        return self
+
+ticker: Ticker = Ticker()
+history: HistoryStore = HistoryStore()
+snapshots: SnapshotHistory = SnapshotHistory()
+activity: ActivityMonitor = ActivityMonitor()
+governor: MemoryGovernor = MemoryGovernor(max_entries=MAX_PARSED, store=snapshots)
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""Analytics Cube of a Loaded Chain
+
+The OI, Vol, Delta $ and GEX of every contract are summed once per snapshot
+into a dense (Expiration x Moneyness x Delta x Type x measure) array, with
+each contract placed by integer-coded dimensions and a single bincount per
+measure. Any roll-up, drill-down or heatmap is then a sum over the cube's
+axes, a few thousand cells, instead of another groupby over the chain.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional
+from pandas import DataFrame
+
+__docformat__: Literal["numpy"] = "numpy"
+
+CUBE_DIMENSIONS: list[str] = ["Expiration", "Moneyness", "Delta", "Type"]
+CUBE_MEASURES: list[str] = ["OI", "Vol", "Delta $", "GEX"]
+
+# Bucket edges of the strike's % to spot, and of the absolute delta.
+
+MONEYNESS_EDGES: list[float] = [-20, -10, -5, -2, 0, 2, 5, 10, 20]
+DELTA_EDGES: list[float] = [0.1, 0.25, 0.4, 0.6, 0.75, 0.9]
+OPTION_TYPES: list[str] = ["Call", "Put"]
+
+#%%
+def bucket_labels(edges: list[float], unit: str = "", digits: int = 0) -> list[str]:
+    """Labels of the buckets below, between and above `edges`."""
+
+    text = [f"{edge:.{digits}f}{unit}" for edge in edges]
+    return [f"< {text[0]}"] + [f"{low} to {high}" for low, high in zip(text, text[1:])] + [f"> {text[-1]}"]
+
+# %%
+class AnalyticsCube(object):
+    """Measures of a chain summed by Expiration, Moneyness bucket, Delta bucket and Type.
+
+    Attributes
+    ----------
+    dimensions: dict
+        Labels of each dimension, in axis order.
+    values: np.ndarray
+        Sums shaped (Expiration, Moneyness, Delta, Type, measure), in CUBE_MEASURES order.
+
+    Example
+    -------
+    cube = AnalyticsCube(ticker.chains, ticker.stock_price)
+
+    oi_by_delta_per_week = cube.rollup('Expiration', 'Delta', 'OI', freq = 'W')
+
+    put_gex_by_moneyness = cube.rollup('Moneyness', measure = 'GEX', where = {'Type': ['Put']})
+    """
+
+    def __init__(self, chains_df: DataFrame, stock_price: float) -> None:
+        expiration = chains_df.index.get_level_values("Expiration")
+        strike = chains_df.index.get_level_values("Strike").to_numpy(dtype=float)
+        option_type = chains_df.index.get_level_values("Type")
+
+        expiration_codes, expirations = pd.factorize(expiration, sort=True)
+        moneyness = (strike / float(stock_price) - 1) * 100
+        codes = [
+            expiration_codes,
+            np.searchsorted(MONEYNESS_EDGES, moneyness, side="right"),
+            np.searchsorted(DELTA_EDGES, np.abs(chains_df["Delta"].to_numpy(dtype=float)), side="right"),
+            np.where(option_type == "Call", 0, 1),
+        ]
+        self.dimensions: dict = {
+            "Expiration": pd.DatetimeIndex(expirations, name="Expiration"),
+            "Moneyness": pd.Index(bucket_labels(MONEYNESS_EDGES, "%"), name="Moneyness"),
+            "Delta": pd.Index(bucket_labels(DELTA_EDGES, digits=2), name="Delta"),
+            "Type": pd.Index(OPTION_TYPES, name="Type"),
+        }
+        shape = tuple(len(labels) for labels in self.dimensions.values())
+
+        # One flat cell per contract, then one bincount per measure.
+
+        cells = np.ravel_multi_index(codes, shape)
+        size = int(np.prod(shape))
+        self.values: np.ndarray = np.stack(
+            [
+                np.bincount(cells, weights=chains_df[measure].to_numpy(dtype=float), minlength=size)
+                for measure in CUBE_MEASURES
+            ],
+            axis=-1,
+        ).reshape(shape + (len(CUBE_MEASURES),))
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, dimensions: dict) -> "AnalyticsCube":
+        """Rebuilds a cube from its values and dimensions, i.e. as sent back by a worker process."""
+
+        cube = cls.__new__(cls)
+        cube.values = values
+        cube.dimensions = dict(dimensions)
+
+        return cube
+
+    def rollup(
+        self,
+        rows: str,
+        columns: Optional[str] = None,
+        measure: str = "OI",
+        where: Optional[dict] = None,
+        freq: Optional[str] = None,
+    ) -> DataFrame:
+        """Sums a measure over every dimension but `rows` and `columns`.
+
+        Parameters
+        ----------
+        rows: str
+            Dimension of the rows, one of CUBE_DIMENSIONS.
+        columns: str
+            Dimension of the columns. Without one, the measure is the only column.
+        measure: str
+            One of CUBE_MEASURES.
+        where: dict
+            Labels to keep by dimension, to drill down, i.e. {'Type': ['Put']}.
+        freq: str
+            Pandas period alias to group expirations by, i.e. 'W' or 'M'.
+
+        Returns
+        -------
+        pd.DataFrame: The measure by `rows` and `columns`.
+        """
+
+        names = list(self.dimensions)
+        values = self.values[..., CUBE_MEASURES.index(measure)]
+        labels = dict(self.dimensions)
+        for dimension, keep in (where or {}).items():
+            axis = names.index(dimension)
+            mask = labels[dimension].isin(pd.to_datetime(keep) if dimension == "Expiration" else keep)
+            values = np.compress(mask, values, axis=axis)
+            labels[dimension] = labels[dimension][mask]
+
+        kept = [rows] if columns is None else [rows, columns]
+        values = values.sum(axis=tuple(axis for axis, name in enumerate(names) if name not in kept))
+        if columns is not None and names.index(columns) < names.index(rows):
+            values = values.T
+
+        # Expirations are sorted, so every period is a contiguous run of them.
+
+        if freq is not None and "Expiration" in kept:
+            periods = labels["Expiration"].to_period(freq).start_time
+            starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]]) if len(periods) else np.array([], int)
+            axis = kept.index("Expiration")
+            values = np.add.reduceat(values, starts, axis=axis) if len(starts) else values
+            labels["Expiration"] = pd.DatetimeIndex(periods[starts], name="Expiration")
+
+        values = np.rint(values).astype(np.int64)
+        if columns is None:
+            return DataFrame({measure: values}, index=labels[rows])
+
+        return DataFrame(values, index=labels[rows], columns=labels[columns])
+
+    def to_frame(self) -> DataFrame:
+        """Every non-empty cell, indexed by CUBE_DIMENSIONS, with a column per measure."""
+
+        index = pd.MultiIndex.from_product(list(self.dimensions.values()))
+        frame = DataFrame(
+            np.rint(self.values.reshape(-1, len(CUBE_MEASURES))).astype(np.int64), index=index, columns=CUBE_MEASURES
+        )
+
+        return frame[(frame != 0).any(axis=1)]
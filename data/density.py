@@ -0,0 +1,266 @@
+"""Risk-Neutral Implied Distribution by Expiration (Breeden-Litzenberger)
+
+The market-implied density of the underlying at an expiration is the second
+derivative of the call price with respect to strike. Call prices come from
+Black-Scholes on a uniform strike grid per expiration, with the out-of-the-
+money IV smile interpolated onto the grid and smoothed, so that every
+expiration is differentiated at once in one (expirations x strikes) array.
+The first derivative is taken analytically, with the smile's slope, and only
+the second one numerically, which keeps the density free of rounding noise
+in short-dated expirations.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Literal
+from pandas import DataFrame
+from .iv_solver import bs_d1_d2, norm_cdf, norm_pdf
+
+__docformat__: Literal["numpy"] = "numpy"
+
+DENSITY_POINTS: int = 201
+DENSITY_WIDTH: float = 5.0
+SMOOTHING: int = 9
+MIN_STRIKES: int = 5
+RANGE_QUANTILES: tuple = (0.1587, 0.5, 0.8413)
+
+DISTRIBUTION_COLUMNS: list[str] = ["IV", "Density", "CDF"]
+RANGE_COLUMNS: list[str] = ["DTE", "Mean", "Implied Low", "Median", "Implied High", "Expected Move", "Expected Move %"]
+
+#%%
+def interp_by_group(
+    codes: np.ndarray, x: np.ndarray, xp_codes: np.ndarray, xp: np.ndarray, fp: np.ndarray
+) -> np.ndarray:
+    """np.interp within groups, in one call for every group.
+
+    Each group's points are offset past the previous group's, so a single
+    interpolation over the concatenated points never crosses groups. Values
+    are flat beyond the first and last point of their group.
+
+    Parameters
+    ----------
+    codes: np.ndarray
+        Group of each value to interpolate. Every group must have points.
+    x: np.ndarray
+        Values to interpolate.
+    xp_codes: np.ndarray
+        Group of each point, sorted.
+    xp: np.ndarray
+        Points, sorted within each group.
+    fp: np.ndarray
+        Values at the points.
+
+    Returns
+    -------
+    np.ndarray: The interpolated values.
+    """
+
+    first = np.searchsorted(xp_codes, codes, side="left")
+    last = np.searchsorted(xp_codes, codes, side="right") - 1
+    x = np.clip(x, xp[first], xp[last])
+    low = float(xp.min()) if len(xp) else 0.0
+    span = (float(xp.max()) - low) * 2 + 1 if len(xp) else 1.0
+
+    return np.interp(codes * span + (x - low), xp_codes * span + (xp - low), fp)
+
+def smooth_rows(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered moving average along each row, with the edge values repeated."""
+
+    if window <= 1:
+        return values
+    half = window // 2
+    padded = np.pad(values, ((0, 0), (half + 1, half)), mode="edge")
+    sums = np.cumsum(padded, axis=1)
+
+    return (sums[:, window:] - sums[:, :-window]) / window
+
+# %%
+def calc_implied_distribution(
+    calls: DataFrame,
+    puts: DataFrame,
+    last_price: float,
+    points: int = DENSITY_POINTS,
+    width: float = DENSITY_WIDTH,
+    smoothing: int = SMOOTHING,
+) -> DataFrame:
+    """Risk-neutral density and CDF of the underlying at every expiration.
+
+    Parameters
+    ----------
+    calls: pd.DataFrame
+        Call chains with DTE and IV, indexed by Expiration, Strike and Type.
+    puts: pd.DataFrame
+        Put chains with DTE and IV, indexed by Expiration, Strike and Type.
+    last_price: float
+        Price of the underlying, used as the forward.
+    points: int
+        Strikes in the grid of each expiration.
+    width: float
+        Half-width of each grid, in at-the-money standard deviations to the expiration.
+    smoothing: int
+        Grid points in the moving average applied to the interpolated smile.
+
+    Returns
+    -------
+    pd.DataFrame: IV, Density (per dollar of the underlying) and CDF, indexed by Expiration and Strike.
+        Expirations under one day or with fewer than MIN_STRIKES quoted strikes are left out.
+
+    Example
+    -------
+    distribution = calc_implied_distribution(ticker.calls, ticker.puts, ticker.stock_price)
+    """
+
+    last_price = float(last_price)
+
+    # The smile is taken from out-of-the-money contracts, puts below the price and calls at or above it.
+
+    smile = pd.concat(
+        [
+            calls.loc[calls.index.get_level_values("Strike") >= last_price, ["DTE", "IV"]],
+            puts.loc[puts.index.get_level_values("Strike") < last_price, ["DTE", "IV"]],
+        ]
+    )
+    smile = smile[(smile["IV"] > 0) & (smile["DTE"] >= 1)].droplevel("Type").sort_index()
+    expiration = smile.index.get_level_values("Expiration")
+    strike = smile.index.get_level_values("Strike").to_numpy(dtype=float)
+    counts = pd.Series(1, index=expiration).groupby(level=0).transform("size").to_numpy()
+    keep = counts >= MIN_STRIKES
+    codes, expirations = pd.factorize(expiration[keep], sort=True)
+    x = np.log(strike[keep] / last_price)
+    iv = smile["IV"].to_numpy(dtype=float)[keep]
+    if not len(expirations):
+        return DataFrame(
+            columns=DISTRIBUTION_COLUMNS,
+            index=pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), []], names=["Expiration", "Strike"]),
+        )
+
+    first = np.searchsorted(codes, np.arange(len(expirations)))
+    t = smile["DTE"].to_numpy(dtype=float)[keep][first][:, None] / 365
+    groups = np.arange(len(expirations))
+    atm_iv = interp_by_group(groups, np.zeros(len(groups)), codes, x, iv)[:, None]
+
+    # Rows are expirations, columns the uniform strike grid of each.
+
+    spread = width * atm_iv * np.sqrt(t)
+    low, high = last_price * np.exp(-spread), last_price * np.exp(spread)
+    strikes = low + (high - low) * np.linspace(0, 1, points)[None, :]
+    step = (high - low) / (points - 1)
+    grid_iv = interp_by_group(np.repeat(groups, points), np.log(strikes / last_price).ravel(), codes, x, iv)
+    grid_iv = smooth_rows(grid_iv.reshape(len(groups), points), smoothing)
+
+    # With the smile, dC/dK = -N(d2) + vega x dIV/dK, and the CDF is 1 + dC/dK.
+
+    slope = np.gradient(grid_iv, axis=1) / step
+    d1, d2 = bs_d1_d2(last_price, strikes, t, grid_iv)
+    cdf = norm_cdf(-d2) + last_price * norm_pdf(d1) * np.sqrt(t) * slope
+    cdf = np.maximum.accumulate(np.clip(cdf, 0, 1), axis=1)
+    density = np.gradient(cdf, axis=1) / step
+
+    return DataFrame(
+        {"IV": np.round(grid_iv.ravel(), 6), "Density": density.ravel(), "CDF": cdf.ravel()},
+        index=pd.MultiIndex.from_arrays(
+            [np.repeat(expirations, points), np.round(strikes.ravel(), 4)], names=["Expiration", "Strike"]
+        ),
+    )
+
+def calc_expected_range(distribution: DataFrame, last_price: float, quantiles: tuple = RANGE_QUANTILES) -> DataFrame:
+    """Mean, one standard deviation equivalent range and median of the implied distribution.
+
+    Implied Low and Implied High are the 15.87% and 84.13% quantiles, and the
+    Expected Move is half the range between them.
+
+    Returns
+    -------
+    pd.DataFrame: RANGE_COLUMNS by Expiration.
+    """
+
+    expirations = distribution.index.get_level_values("Expiration").unique()
+    if not len(expirations):
+        return DataFrame(columns=RANGE_COLUMNS, index=pd.DatetimeIndex([], name="Expiration"))
+
+    shape = (len(expirations), -1)
+    strikes = distribution.index.get_level_values("Strike").to_numpy(dtype=float).reshape(shape)
+    cdf = distribution["CDF"].to_numpy().reshape(shape)
+    density = distribution["Density"].to_numpy().reshape(shape)
+    step = strikes[:, 1] - strikes[:, 0]
+    mass = density.sum(axis=1) * step
+    mean = (strikes * density).sum(axis=1) * step / np.where(mass > 0, mass, np.nan)
+
+    # Each quantile lies between the last grid strike under it and the next one.
+
+    rows = np.arange(len(expirations))
+    levels = []
+    for quantile in quantiles:
+        above = np.clip((cdf < quantile).sum(axis=1), 1, strikes.shape[1] - 1)
+        below = above - 1
+        gap = cdf[rows, above] - cdf[rows, below]
+        weight = np.where(gap > 0, (quantile - cdf[rows, below]) / np.where(gap > 0, gap, 1), 0)
+        levels.append(strikes[rows, below] + np.clip(weight, 0, 1) * step)
+    implied_low, median, implied_high = levels
+    expected_move = (implied_high - implied_low) / 2
+
+    days = (expirations - pd.Timestamp.now()) // pd.Timedelta(days=1) + 1
+
+    return DataFrame(
+        {
+            "DTE": np.asarray(days, dtype=int),
+            "Mean": np.round(mean, 2),
+            "Implied Low": np.round(implied_low, 2),
+            "Median": np.round(median, 2),
+            "Implied High": np.round(implied_high, 2),
+            "Expected Move": np.round(expected_move, 2),
+            "Expected Move %": np.round(expected_move / float(last_price) * 100, 4),
+        },
+        index=pd.DatetimeIndex(expirations, name="Expiration"),
+    )
+
+def calc_touch_probability(distribution: DataFrame, chains_df: DataFrame, last_price: float) -> DataFrame:
+    """Probability of finishing in the money and of touching the strike, from the implied CDF.
+
+    The probability of touch is the usual reflection estimate, twice the
+    probability of finishing beyond the strike, capped at 1.
+
+    Parameters
+    ----------
+    distribution: pd.DataFrame
+        The output of calc_implied_distribution.
+    chains_df: pd.DataFrame
+        DataFrame of options chains, indexed by Expiration, Strike and Type.
+    last_price: float
+        Price of the underlying.
+
+    Returns
+    -------
+    pd.DataFrame: Prob ITM and Prob Touch, indexed like `chains_df`. Contracts of expirations without a
+        distribution are NaN.
+
+    Example
+    -------
+    touch = calc_touch_probability(ticker.distribution, ticker.calls, ticker.stock_price)
+    """
+
+    expirations = distribution.index.get_level_values("Expiration").unique()
+    group = expirations.get_indexer(chains_df.index.get_level_values("Expiration"))
+    strike = chains_df.index.get_level_values("Strike").to_numpy(dtype=float)
+    is_call = chains_df.index.get_level_values("Type") == "Call"
+    cdf = np.full(len(chains_df), np.nan)
+    found = group >= 0
+    if found.any():
+        points = len(distribution) // len(expirations)
+        cdf[found] = interp_by_group(
+            group[found],
+            strike[found],
+            np.repeat(np.arange(len(expirations)), points),
+            distribution.index.get_level_values("Strike").to_numpy(dtype=float),
+            distribution["CDF"].to_numpy(),
+        )
+
+    beyond = np.where(strike >= float(last_price), 1 - cdf, cdf)
+
+    return DataFrame(
+        {
+            "Prob ITM": np.round(np.where(is_call, 1 - cdf, cdf), 4),
+            "Prob Touch": np.round(np.minimum(2 * beyond, 1), 4),
+        },
+        index=chains_df.index,
+    )
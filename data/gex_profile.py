@@ -0,0 +1,141 @@
+"""Gamma Exposure Profile"""
+
+import numpy as np
+import pandas as pd
+from typing import Literal, Tuple
+from pandas import DataFrame
+from .iv_solver import norm_pdf
+
+__docformat__: Literal["numpy"] = "numpy"
+
+GRID_WIDTH: float = 0.20
+GRID_POINTS: int = 201
+MAX_CELLS: int = 4_000_000
+
+#%%
+def calc_gex_profile(
+    chains_df: DataFrame,
+    last_price: float,
+    width: float = GRID_WIDTH,
+    points: int = GRID_POINTS,
+    max_cells: int = MAX_CELLS,
+    rate: float = 0.0,
+) -> Tuple[DataFrame, pd.Series]:
+    """Recalculates total dealer gamma exposure across a grid of hypothetical spot prices.
+
+    Gamma is evaluated as one (contracts x spot-grid) matrix. When the matrix would
+    exceed `max_cells` elements, the grid is processed in column chunks so memory
+    stays bounded for large index chains.
+
+    Parameters
+    ----------
+    chains_df: pd.DataFrame
+        DataFrame of options chains, indexed by Expiration, Strike and Type.
+    last_price: float
+        Current price of the underlying.
+    width: float
+        Grid half-width as a fraction of the current price.
+    points: int
+        Number of spot prices in the grid.
+    max_cells: int
+        Maximum number of matrix elements evaluated at once.
+    rate: float
+        Continuously compounded risk-free rate.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, pd.Series]: gex_profile,gex_levels
+        GEX per 1% move at each spot price, and the zero-gamma flip level with the call and put walls.
+
+    Example
+    -------
+    gex_profile, gex_levels = calc_gex_profile(ticker.chains, ticker.stock_price)
+    """
+
+    last_price = float(last_price)
+    spot_grid = np.linspace(last_price * (1 - width), last_price * (1 + width), points)
+
+    strikes = chains_df.index.get_level_values("Strike").to_numpy(dtype=float)
+    is_call = chains_df.index.get_level_values("Type").to_numpy() == "Call"
+    oi = chains_df["OI"].to_numpy(dtype=float)
+    iv = chains_df["IV"].to_numpy(dtype=float)
+    t = np.maximum(chains_df["DTE"].to_numpy(dtype=float), 1) / 365
+
+    live = (oi > 0) & (iv > 0)
+    strikes, is_call, oi, iv, t = strikes[live], is_call[live], oi[live], iv[live], t[live]
+
+    # Contract weights, with puts negative so that the sum is the net dealer exposure.
+
+    call_weights = np.where(is_call, 100 * oi, 0.0)
+    put_weights = np.where(is_call, 0.0, -100 * oi)
+    log_strikes = np.log(strikes)[:, None]
+    vol_t = (iv * np.sqrt(t))[:, None]
+    drift = ((rate + 0.5 * iv * iv) * t)[:, None]
+
+    call_gex = np.zeros(points)
+    put_gex = np.zeros(points)
+    chunk: int = max(1, max_cells // max(1, strikes.size))
+
+    for start in range(0, points, chunk):
+        spots = spot_grid[start : start + chunk]
+        d1 = (np.log(spots)[None, :] - log_strikes + drift) / vol_t
+        gamma = norm_pdf(d1) / (spots[None, :] * vol_t)
+        scale = spots * spots * 0.01
+        call_gex[start : start + chunk] = (call_weights @ gamma) * scale
+        put_gex[start : start + chunk] = (put_weights @ gamma) * scale
+
+    gex_profile = DataFrame(
+        {"Call GEX": call_gex, "Put GEX": put_gex, "Net GEX": call_gex + put_gex},
+        index=pd.Index(np.round(spot_grid, 2), name="Spot"),
+    )
+
+    gex_levels = pd.Series(
+        {
+            "Zero Gamma": calc_zero_gamma(gex_profile, last_price),
+            "Call Wall": np.nan,
+            "Put Wall": np.nan,
+            "Net GEX": float(np.interp(last_price, spot_grid, gex_profile["Net GEX"])),
+        },
+        name="GEX Levels",
+    )
+
+    # A chain may list only one type, so a missing side is selected as empty rather than with xs.
+
+    by_strike = chains_df.groupby(level=["Strike", "Type"])["GEX"].sum()
+    types = by_strike.index.get_level_values("Type")
+    call_strikes = by_strike[types == "Call"].droplevel("Type")
+    put_strikes = by_strike[types == "Put"].droplevel("Type")
+    if not call_strikes.empty:
+        gex_levels["Call Wall"] = float(call_strikes.idxmax())
+    if not put_strikes.empty:
+        gex_levels["Put Wall"] = float(put_strikes.idxmax())
+
+    return gex_profile, gex_levels
+
+def calc_zero_gamma(gex_profile: DataFrame, last_price: float) -> float:
+    """Finds the spot price where net GEX changes sign, nearest to the current price.
+
+    Parameters
+    ----------
+    gex_profile: pd.DataFrame
+        DataFrame returned by calc_gex_profile.
+    last_price: float
+        Current price of the underlying.
+
+    Returns
+    -------
+    float: The interpolated flip level, or NaN when net GEX does not change sign on the grid.
+    """
+
+    spots = gex_profile.index.to_numpy(dtype=float)
+    net = gex_profile["Net GEX"].to_numpy(dtype=float)
+    crossings = np.flatnonzero(np.sign(net[:-1]) * np.sign(net[1:]) < 0)
+
+    if crossings.size == 0:
+        return np.nan
+
+    x0, x1 = spots[crossings], spots[crossings + 1]
+    y0, y1 = net[crossings], net[crossings + 1]
+    levels = x0 - y0 * (x1 - x0) / (y1 - y0)
+
+    return float(round(levels[np.abs(levels - last_price).argmin()], 2))
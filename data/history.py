@@ -0,0 +1,297 @@
+"""Append-Only Time-Series Store for Ticker Summary Metrics
+
+Times are stored and queried as naive UTC timestamps. Use utc_now() rather
+than pd.Timestamp.now() for "now" in queries, because the latter is local time.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional
+from pandas import DataFrame
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+__docformat__: Literal["numpy"] = "numpy"
+
+HISTORY_DIR: str = os.path.join(os.path.expanduser("~"), ".cboe_dashboard", "history")
+HISTORY_COLUMNS: list[str] = [
+    "IV30",
+    "Put-Call Ratio",
+    "Turnover Ratio",
+    "Net GEX",
+    "IV Skew",
+]
+
+#%%
+def utc_now() -> pd.Timestamp:
+    """The current time as a naive UTC Timestamp, the clock of the history and snapshot stores."""
+
+    return pd.Timestamp(time.time_ns())
+
+# %%
+class HistoryStore(object):
+    """Append-only store of summary metrics, one file of fixed-width rows per symbol.
+
+    Each row is an int64 nanosecond UTC timestamp followed by a float64 per
+    metric. The row is appended with a single write under an exclusive file
+    lock. The Streamlit app, the API and the scanner can therefore record the
+    same symbol, and a failed write never shifts the columns. A partial row
+    left by a failed write is truncated before the next append and ignored by
+    reads. The metric names of a file are kept next to it, in columns.json.
+    Rows are appended by a background thread, so `record` only puts the row
+    on a queue and returns immediately.
+
+    Example
+    -------
+    history = HistoryStore()
+
+    history.record('SPX', ticker.summary)
+
+    spx_history = history.read('SPX', start = '2026-01-01')
+    """
+
+    def __init__(self, path: str = HISTORY_DIR, columns: list[str] = HISTORY_COLUMNS) -> None:
+        self.path = path
+        self.columns = list(columns)
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._last: dict = {}
+
+    def _rows_file(self, symbol: str) -> str:
+        return os.path.join(self.path, symbol.upper(), "rows.bin")
+
+    def _columns_file(self, symbol: str) -> str:
+        return os.path.join(self.path, symbol.upper(), "columns.json")
+
+    def _file_columns(self, symbol: str) -> list[str]:
+        """The metrics stored in a symbol's rows, in order, written by whichever store created the file."""
+
+        columns_file = self._columns_file(symbol)
+        if not os.path.isfile(columns_file):
+            return self.columns
+        with open(columns_file) as file:
+            return json.load(file)
+
+    @staticmethod
+    def _row_dtype(columns: list[str]) -> np.dtype:
+        return np.dtype([("Timestamp", "<i8")] + [(column, "<f8") for column in columns])
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="history-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            symbol, timestamp, values = self._queue.get()
+            try:
+                self._append(symbol, timestamp, values)
+            except OSError as error:
+                print("Could not record history for " f"{symbol}: {error}")
+            finally:
+                self._queue.task_done()
+
+    def _append(self, symbol: str, timestamp: int, values: np.ndarray) -> None:
+        os.makedirs(os.path.join(self.path, symbol.upper()), exist_ok=True)
+        columns_file = self._columns_file(symbol)
+        if not os.path.isfile(columns_file):
+            temp_file = f"{columns_file}.{os.getpid()}.tmp"
+            with open(temp_file, "w") as file:
+                json.dump(self.columns, file)
+            os.replace(temp_file, columns_file)
+
+        columns = self._file_columns(symbol)
+        named = dict(zip(self.columns, values))
+        row = np.zeros(1, dtype=self._row_dtype(columns))
+        row["Timestamp"] = timestamp
+        for column in columns:
+            row[column] = named.get(column, np.nan)
+
+        with open(self._rows_file(symbol), "ab") as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(file.fileno()).st_size
+                if size % row.itemsize:
+                    file.truncate(size - size % row.itemsize)
+                file.write(row.tobytes())
+                file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    def record(
+        self,
+        symbol: str,
+        summary: pd.Series,
+        timestamp: Optional[pd.Timestamp] = None,
+        snapshot_id: str = "",
+    ) -> bool:
+        """Queues one row of summary metrics for the symbol.
+
+        A row with the same snapshot id and metrics as the previous one of the
+        symbol is not stored, so reloading an unchanged ticker, i.e. on a
+        Streamlit rerun, adds nothing.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker the metrics belong to.
+        summary: pd.Series
+            Metrics keyed by column name. Missing columns are stored as NaN.
+        timestamp: pd.Timestamp
+            Time of the fetch, in UTC when naive. Defaults to now.
+        snapshot_id: str
+            The payload's snapshot id, i.e. ticker.snapshot.
+
+        Returns
+        -------
+        bool: Whether the row was queued.
+        """
+
+        stamp: int = time.time_ns() if timestamp is None else pd.Timestamp(timestamp).value
+        values = np.array(
+            [summary.get(column, np.nan) for column in self.columns], dtype=float
+        )
+        with self._lock:
+            last = self._last.get(symbol.upper())
+            if last is not None and last[0] == snapshot_id and np.array_equal(last[1], values, equal_nan=True):
+                return False
+            self._last[symbol.upper()] = (snapshot_id, values)
+        self._start_writer()
+        self._queue.put_nowait((symbol.upper(), stamp, values))
+
+        return True
+
+    def flush(self) -> None:
+        """Blocks until every queued row is on disk."""
+
+        self._queue.join()
+
+    def symbols(self) -> list[str]:
+        """Lists the symbols with recorded history."""
+
+        if not os.path.isdir(self.path):
+            return []
+
+        return sorted(
+            symbol
+            for symbol in os.listdir(self.path)
+            if os.path.isfile(self._rows_file(symbol))
+        )
+
+    def read(
+        self,
+        symbol: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        columns: Optional[list[str]] = None,
+    ) -> DataFrame:
+        """Reads the recorded metrics for a symbol over a time range.
+
+        The rows are memory-mapped and the range is located by binary search on
+        the timestamps, so only the requested rows are read from disk. Rows
+        stamped before a row another process wrote first are put back in time
+        order.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker to read.
+        start: pd.Timestamp
+            Inclusive start of the range, in UTC when naive. Defaults to the first row.
+        end: pd.Timestamp
+            Inclusive end of the range, in UTC when naive. Defaults to the last row.
+        columns: list[str]
+            Metrics to read. Defaults to all of them.
+
+        Returns
+        -------
+        pd.DataFrame: DataFrame of metrics indexed by Timestamp, in UTC.
+
+        Example
+        -------
+        spx_history = history.read('SPX', start = '2026-01-01', columns = ['IV30'])
+        """
+
+        columns = self.columns if columns is None else list(columns)
+        rows_file = self._rows_file(symbol)
+        dtype = self._row_dtype(self._file_columns(symbol))
+
+        if not os.path.isfile(rows_file) or os.path.getsize(rows_file) < dtype.itemsize:
+            return DataFrame(columns=columns, index=pd.DatetimeIndex([], name="Timestamp"))
+
+        # A partial row at the end, from a failed write, is left out.
+
+        rows: int = os.path.getsize(rows_file) // dtype.itemsize
+        records = np.memmap(rows_file, dtype=dtype, mode="r", shape=(rows,))
+        timestamps = records["Timestamp"]
+
+        # Rows are stamped when recorded but appended later, by several processes, so they can be out of order.
+
+        if rows > 1 and bool((timestamps[1:] < timestamps[:-1]).any()):
+            records = records[np.argsort(timestamps, kind="stable")]
+            timestamps = records["Timestamp"]
+        first: int = 0 if start is None else int(
+            np.searchsorted(timestamps, pd.Timestamp(start).value, side="left")
+        )
+        last: int = rows if end is None else int(
+            np.searchsorted(timestamps, pd.Timestamp(end).value, side="right")
+        )
+
+        data: dict = {
+            column: np.array(records[column][first:last]) if column in dtype.names else np.full(last - first, np.nan)
+            for column in columns
+        }
+
+        return DataFrame(
+            data,
+            index=pd.DatetimeIndex(np.array(timestamps[first:last]), name="Timestamp"),
+            columns=columns,
+        )
+
+    def resample(
+        self,
+        symbol: str,
+        rule: str = "1D",
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        columns: Optional[list[str]] = None,
+    ) -> DataFrame:
+        """Reads a range of metrics and downsamples it to the last value per period.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker to read.
+        rule: str
+            Pandas offset alias for the period, i.e. '1h' or '1D'.
+        start: pd.Timestamp
+            Inclusive start of the range.
+        end: pd.Timestamp
+            Inclusive end of the range.
+        columns: list[str]
+            Metrics to read. Defaults to all of them.
+
+        Returns
+        -------
+        pd.DataFrame: DataFrame of metrics indexed by period.
+
+        Example
+        -------
+        spx_daily = history.resample('SPX', '1D')
+        """
+
+        return self.read(symbol, start, end, columns).resample(rule).last().dropna(how="all")
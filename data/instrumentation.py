@@ -0,0 +1,236 @@
+"""Per-Stage Timing Instrumentation"""
+
+import json
+import time
+import threading
+import collections
+from typing import Literal, Optional
+from pandas import DataFrame
+
+__docformat__: Literal["numpy"] = "numpy"
+
+MAX_RECORDS: int = 5000
+
+#%%
+class Stage(object):
+    """A running timer for one stage of the pipeline."""
+
+    __slots__ = ("_owner", "name", "start", "bytes", "rows")
+
+    def __init__(self, owner: "Instrumentation", name: str) -> None:
+        self._owner = owner
+        self.name = name
+        self.bytes: int = 0
+        self.rows: int = 0
+        self.start: float = time.perf_counter()
+
+    def record(self, bytes: int = 0, rows: int = 0) -> None:
+        """Adds a byte count and/or row count to the stage."""
+
+        self.bytes += int(bytes)
+        self.rows += int(rows)
+
+    def stop(self, bytes: int = 0, rows: int = 0) -> None:
+        """Stops the timer and stores the stage."""
+
+        self.record(bytes, rows)
+        self._owner._add(self.name, time.perf_counter() - self.start, self.bytes, self.rows)
+
+    def __enter__(self) -> "Stage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+class NullStage(object):
+    """Stage returned while instrumentation is disabled. Every method is a no-op."""
+
+    __slots__ = ()
+
+    def record(self, bytes: int = 0, rows: int = 0) -> None:
+        pass
+
+    def stop(self, bytes: int = 0, rows: int = 0) -> None:
+        pass
+
+    def __enter__(self) -> "NullStage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+NULL_STAGE: NullStage = NullStage()
+
+# %%
+class Instrumentation(object):
+    """Collects wall time, byte counts and row counts for named pipeline stages.
+
+    While disabled, `start` and `stage` return a shared no-op object, so the
+    instrumented code only pays for one attribute check per stage.
+
+    Example
+    -------
+    instrumentation.enabled = True
+
+    with instrumentation.stage('chains.http') as stage:
+        r = requests.get(url)
+        stage.record(bytes = len(r.content))
+
+    timer = instrumentation.start('chains.enrich')
+    ...
+    timer.stop(rows = len(ticker_chains))
+
+    print(instrumentation.to_prometheus())
+    """
+
+    def __init__(self, enabled: bool = False, max_records: int = MAX_RECORDS) -> None:
+        self.enabled: bool = enabled
+        self.records: collections.deque = collections.deque(maxlen=max_records)
+        self.stage_totals: dict = {}
+        self.counters: dict = collections.defaultdict(float)
+        self.gauges: dict = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str):
+        """Starts a timer for a stage. Call `stop` on the result when it finishes."""
+
+        if not self.enabled:
+            return NULL_STAGE
+
+        return Stage(self, name)
+
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as a stage."""
+
+        return self.start(name)
+
+    def _add(self, name: str, seconds: float, bytes: int, rows: int) -> None:
+        self.records.append(
+            {
+                "Stage": name,
+                "Seconds": seconds,
+                "Bytes": bytes,
+                "Rows": rows,
+                "Timestamp": time.time(),
+            }
+        )
+
+        # The records only keep the latest stages, so the totals since start are kept apart for the counters.
+
+        with self._lock:
+            totals = self.stage_totals.setdefault(name, {"Calls": 0, "Total Seconds": 0.0, "Bytes": 0, "Rows": 0})
+            totals["Calls"] += 1
+            totals["Total Seconds"] += seconds
+            totals["Bytes"] += bytes
+            totals["Rows"] += rows
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Increments a counter, even while timing is disabled."""
+
+        with self._lock:
+            self.counters[name] += value
+
+    def gauge(self, name: str, value: float) -> None:
+        """Sets a gauge to its current value."""
+
+        self.gauges[name] = value
+
+    def reset(self) -> None:
+        """Clears every stored stage, counter and gauge."""
+
+        self.records.clear()
+        with self._lock:
+            self.stage_totals.clear()
+            self.counters.clear()
+        self.gauges.clear()
+
+    def last(self, n: Optional[int] = None) -> DataFrame:
+        """Returns the most recent stages, in the order they finished."""
+
+        records = list(self.records)
+
+        return DataFrame(records if n is None else records[-n:],
+                         columns=["Stage", "Seconds", "Bytes", "Rows", "Timestamp"])
+
+    def summary(self) -> DataFrame:
+        """Aggregates the stored stages by name, over the latest `max_records` stages.
+
+        Returns
+        -------
+        pd.DataFrame: Calls, total, mean and max seconds, bytes and rows by stage.
+        """
+
+        records = self.last()
+        if records.empty:
+            return DataFrame(
+                columns=["Calls", "Total Seconds", "Mean Seconds", "Max Seconds", "Bytes", "Rows"]
+            )
+
+        stages = records.groupby("Stage", sort=False)
+        stages_summary = DataFrame(
+            {
+                "Calls": stages["Seconds"].count(),
+                "Total Seconds": stages["Seconds"].sum(),
+                "Mean Seconds": stages["Seconds"].mean(),
+                "Max Seconds": stages["Seconds"].max(),
+                "Bytes": stages["Bytes"].sum(),
+                "Rows": stages["Rows"].sum(),
+            }
+        )
+
+        return stages_summary
+
+    def to_json(self) -> str:
+        """Exports the stage summary, counters and gauges as JSON."""
+
+        return json.dumps(
+            {
+                "stages": self.summary().reset_index().to_dict(orient="records"),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            },
+            default=float,
+        )
+
+    def to_prometheus(self, prefix: str = "cboe") -> str:
+        """Exports the stage totals, counters and gauges in the Prometheus text format.
+
+        The stage counters are totals since start or the last reset, so they
+        never decrease. stage_seconds_max is a gauge over the latest stored
+        stages.
+        """
+
+        lines: list[str] = []
+        with self._lock:
+            totals = {stage: dict(values) for stage, values in self.stage_totals.items()}
+        metrics = {
+            "stage_calls_total": "Calls",
+            "stage_seconds_total": "Total Seconds",
+            "stage_bytes_total": "Bytes",
+            "stage_rows_total": "Rows",
+        }
+        for metric, column in metrics.items():
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for stage, values in totals.items():
+                lines.append(f'{prefix}_{metric}{{stage="{stage}"}} {float(values[column])}')
+
+        lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+        for stage, value in self.summary()["Max Seconds"].items():
+            lines.append(f'{prefix}_stage_seconds_max{{stage="{stage}"}} {float(value)}')
+
+        for name, value in sorted(self.counters.items()):
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {float(value)}")
+
+        for name, value in sorted(self.gauges.items()):
+            metric = f"{prefix}_{_metric_name(name)}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {float(value)}")
+
+        return "\n".join(lines) + "\n"
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name.lower()).strip("_")
+
+instrumentation: Instrumentation = Instrumentation()
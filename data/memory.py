@@ -0,0 +1,279 @@
+"""Memory Governor for the Parsed Ticker Products of cboe_model
+
+Every parsed payload kept for the content-hash skip of cboe_model (chains,
+Arrow tables, analytics) is measured by its deep size and held under one
+budget. When the budget is exceeded, entries are evicted by a size- and
+cost-aware LRU, and large ones, such as index chains, are written to the
+disk snapshot store and read back on their next use instead of being
+parsed again. At most `max_spilled` entries stay spilled; older spills are
+dropped with their files.
+
+The budget does not cover the other caches of the process, which are
+bounded by entry count: the CDN response bodies of ValidatorCache, the
+Tickers of PresentationCache, the tickers and bodies of the API
+TickerCache and the daily series of VolatilityEngine.
+"""
+
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional, Tuple
+from pandas import DataFrame
+from .instrumentation import instrumentation
+from .snapshots import SnapshotHistory
+
+__docformat__: Literal["numpy"] = "numpy"
+
+MEMORY_BUDGET: int = int(float(os.environ.get("CBOE_MEMORY_BUDGET_MB", "1024")) * 2**20)
+SPILL_BYTES: int = 32 * 2**20
+MAX_ENTRIES: int = 32
+MAX_SPILLED: int = 16
+
+# Lists longer than this are sized from a sample of their items, i.e. the raw option records of a lazy chain.
+
+SAMPLE_ITEMS: int = 1000
+
+USAGE_COLUMNS: list[str] = ["Kind", "Symbol", "MB", "Cost (s)", "Priority", "State"]
+
+#%%
+def deep_size(value: object, seen: Optional[set] = None) -> int:
+    """Estimates the bytes held by an object and everything it references.
+
+    DataFrames, Series and indexes report their own deep usage, numpy arrays
+    and pyarrow Tables their buffers. Containers and plain objects are walked,
+    counting each referenced object once.
+
+    Example
+    -------
+    chains_bytes = deep_size(ticker.chains)
+    """
+
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, "get_total_buffer_size"):
+        return int(value.get_total_buffer_size())
+    if isinstance(value, (bytes, bytearray, str, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += deep_size(key, seen) + deep_size(item, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        if len(items) > SAMPLE_ITEMS:
+            step = len(items) / SAMPLE_ITEMS
+            sample = [items[int(i * step)] for i in range(SAMPLE_ITEMS)]
+            size += int(sum(deep_size(item, set()) for item in sample) * step)
+        else:
+            size += sum(deep_size(item, seen) for item in items)
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+
+    return size
+
+# %%
+class MemoryGovernor(object):
+    """Keeps the parsed ticker products of cboe_model under a memory budget.
+
+    Eviction is GreedyDual-Size: an entry's priority is the clock plus its
+    refresh cost per megabyte, renewed on every hit. The lowest priority is
+    evicted first and the clock advances to it, so unused entries age out,
+    and among recently used ones the large and cheap to rebuild go first.
+    Entries of at least `spill_bytes` are spilled to the snapshot store
+    rather than dropped, and read back on their next hit. Beyond
+    `max_spilled`, the lowest priority spills are dropped and their files
+    deleted, so a scan over many symbols does not leave them on disk.
+
+    Example
+    -------
+    governor = MemoryGovernor(budget = 512 * 2**20, store = snapshots)
+
+    governor.put(('chains', 'SPX'), digest, chains_df, cost = 2.1)
+
+    hit, chains_df = governor.get(('chains', 'SPX'), digest)
+
+    governor.usage()
+    """
+
+    def __init__(
+        self,
+        budget: int = MEMORY_BUDGET,
+        spill_bytes: int = SPILL_BYTES,
+        max_entries: int = MAX_ENTRIES,
+        max_spilled: int = MAX_SPILLED,
+        store: Optional[SnapshotHistory] = None,
+    ) -> None:
+        self.budget = budget
+        self.spill_bytes = spill_bytes
+        self.max_entries = max_entries
+        self.max_spilled = max_spilled
+        self.store = store
+        self._entries: dict = {}
+        self._clock: float = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        """Bytes held in memory by the cached entries."""
+
+        with self._lock:
+            return sum(entry["size"] for entry in self._entries.values() if entry["value"] is not None)
+
+    def _priority(self, entry: dict) -> float:
+        return self._clock + entry["cost"] / max(entry["size"] / 2**20, 1e-3)
+
+    def get(self, key: tuple, digest: tuple) -> Tuple[bool, object]:
+        """Returns (True, value) for an entry stored under `key` with the same `digest`, else (False, None).
+
+        A spilled entry is read back from the snapshot store and counted as memory.restored. Spills are
+        stored with their digest, so a stale spill file is never returned.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["digest"] != digest:
+                return False, None
+            entry["priority"] = self._priority(entry)
+            value = entry["value"]
+        if value is not None:
+            return True, value
+
+        spilled = self.store.restore(key[1], self._spill_name(key)) if self.store is not None else None
+        value = spilled[1] if isinstance(spilled, tuple) and spilled[0] == digest else None
+        if value is None:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            self._discard([key])
+            return False, None
+
+        instrumentation.count("memory.restored")
+        instrumentation.count("memory.bytes_restored", entry["size"])
+        with self._lock:
+            entry["value"] = value
+        self._evict()
+
+        return True, value
+
+    def put(self, key: tuple, digest: tuple, value: object, cost: float = 0.0) -> None:
+        """Stores a value under `key`, replacing the previous one, and evicts until back under budget.
+
+        Parameters
+        ----------
+        key: tuple
+            (kind, symbol).
+        digest: tuple
+            Identifies the payload and arguments the value was built from.
+        value: object
+            The cached value.
+        cost: float
+            Seconds it took to build the value.
+        """
+
+        entry = {"digest": digest, "value": value, "size": deep_size(value), "cost": float(cost)}
+        with self._lock:
+            entry["priority"] = self._priority(entry)
+            previous = self._entries.get(key)
+            self._entries[key] = entry
+        # A restored entry keeps its spill file, so any entry large enough to have spilled may have one.
+
+        if previous is not None and previous["size"] >= self.spill_bytes:
+            self._discard([key])
+        self._evict()
+
+    def _evict(self) -> None:
+        """Evicts the lowest priority entries until the budget and the entry limits are met."""
+
+        spills = []
+        dropped = []
+        with self._lock:
+            resident = {key: entry for key, entry in self._entries.items() if entry["value"] is not None}
+            used = sum(entry["size"] for entry in resident.values())
+            while resident and (used > self.budget or len(resident) > self.max_entries):
+                key = min(resident, key=lambda item: resident[item]["priority"])
+                entry = resident.pop(key)
+                used -= entry["size"]
+                self._clock = entry["priority"]
+                if self.store is not None and entry["size"] >= self.spill_bytes:
+                    spills.append((key, (entry["digest"], entry["value"])))
+                    entry["value"] = None
+                else:
+                    del self._entries[key]
+                    instrumentation.count("memory.evicted")
+
+            spilled = {key: entry for key, entry in self._entries.items() if entry["value"] is None}
+            while len(spilled) > self.max_spilled:
+                key = min(spilled, key=lambda item: spilled[item]["priority"])
+                spilled.pop(key)
+                del self._entries[key]
+                dropped.append(key)
+                instrumentation.count("memory.evicted")
+            instrumentation.gauge("memory.bytes", used)
+            instrumentation.gauge("memory.budget", self.budget)
+
+        # Writing a spill can take a while for an index chain, so it happens outside the lock.
+
+        for key, value in spills:
+            try:
+                self.store.spill(key[1], self._spill_name(key), value)
+                instrumentation.count("memory.spilled")
+            except Exception as error:
+                print(f"Could not spill {key}: {error}")
+                with self._lock:
+                    self._entries.pop(key, None)
+                instrumentation.count("memory.evicted")
+        self._discard(dropped)
+
+    def _discard(self, keys: list) -> None:
+        """Deletes the spill files of entries no longer held."""
+
+        if self.store is None:
+            return
+        for key in keys:
+            try:
+                self.store.discard(key[1], self._spill_name(key))
+            except OSError as error:
+                print(f"Could not delete the spill of {key}: {error}")
+
+    @staticmethod
+    def _spill_name(key: tuple) -> str:
+        return str(key[0])
+
+    def usage(self) -> DataFrame:
+        """The size, refresh cost, priority and state of every entry, largest first."""
+
+        with self._lock:
+            rows = [
+                [
+                    key[0],
+                    key[1],
+                    round(entry["size"] / 2**20, 2),
+                    round(entry["cost"], 4),
+                    round(entry["priority"], 4),
+                    "Memory" if entry["value"] is not None else "Spilled",
+                ]
+                for key, entry in self._entries.items()
+            ]
+
+        return DataFrame(rows, columns=USAGE_COLUMNS).sort_values("MB", ascending=False, ignore_index=True)
+
+    def clear(self) -> None:
+        """Drops every entry, including the spilled ones."""
+
+        with self._lock:
+            spilled = [key for key, entry in self._entries.items() if entry["size"] >= self.spill_bytes]
+            self._entries.clear()
+            self._clock = 0.0
+        self._discard(spilled)
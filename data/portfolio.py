@@ -0,0 +1,248 @@
+"""Option Positions Joined Against the Loaded Chains
+
+Positions are keyed by Symbol, Expiration, Strike and Type. The positions of
+each symbol are joined to its chain with one hashed MultiIndex lookup, and
+their greeks, Delta $ and GEX are scaled by quantity and summed into
+exposures per underlying, next to the market-wide figures of the same
+chain. A whole portfolio refreshes in one pass through the batch loader of
+async_model, so every underlying is requested at once and unchanged payloads
+reuse their parsed chains.
+"""
+
+import io
+import asyncio
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional, Tuple, Union
+from pandas import DataFrame
+from . import async_model
+from .instrumentation import instrumentation
+from .strategy import unique_contracts
+
+__docformat__: Literal["numpy"] = "numpy"
+
+CONTRACT_SIZE: int = 100
+POSITION_COLUMNS: list[str] = ["Symbol", "Expiration", "Strike", "Type", "Quantity"]
+LEG_INDEX: list[str] = ["Expiration", "Strike", "Type"]
+QUOTE_COLUMNS: list[str] = ["DTE", "Bid", "Ask", "Theoretical", "IV", "Delta", "Gamma", "Theta", "Vega"]
+EXPOSURE_COLUMNS: list[str] = [
+    "Positions",
+    "Market Value",
+    "Delta",
+    "Delta $",
+    "Gamma",
+    "GEX",
+    "Theta",
+    "Vega",
+    "Market Delta $",
+    "Market Net GEX",
+]
+TYPE_ALIASES: dict = {"C": "Call", "CALL": "Call", "P": "Put", "PUT": "Put"}
+
+#%%
+def parse_positions(positions: Union[bytes, str, DataFrame]) -> DataFrame:
+    """Reads positions from a CSV payload or a grid, and normalizes their keys.
+
+    Column names are matched without case. Type may be C, P, Call or Put.
+    Rows with a missing or invalid key or quantity are dropped, and the same
+    contract entered twice is summed.
+
+    Parameters
+    ----------
+    positions: bytes, str or pd.DataFrame
+        A CSV with Symbol, Expiration, Strike, Type and Quantity columns, or a DataFrame of them.
+
+    Returns
+    -------
+    pd.DataFrame: POSITION_COLUMNS, with Expiration as a Timestamp and Strike as a float.
+
+    Example
+    -------
+    positions = parse_positions(b'Symbol,Expiration,Strike,Type,Quantity\\nSPX,2024-12-20,4000,P,-2')
+    """
+
+    if isinstance(positions, (bytes, str)):
+        text = positions.decode("utf-8-sig") if isinstance(positions, bytes) else positions
+        positions = pd.read_csv(io.StringIO(text))
+
+    columns = {str(column).strip().lower(): column for column in positions.columns}
+    missing = [column for column in POSITION_COLUMNS if column.lower() not in columns]
+    if missing:
+        print(f"The positions are missing the columns: {missing}")
+        return DataFrame(columns=POSITION_COLUMNS)
+
+    frame = DataFrame({column: positions[columns[column.lower()]].to_numpy() for column in POSITION_COLUMNS})
+    frame["Symbol"] = frame["Symbol"].astype(str).str.strip().str.upper()
+    frame["Expiration"] = pd.to_datetime(frame["Expiration"], errors="coerce")
+    frame["Strike"] = pd.to_numeric(frame["Strike"], errors="coerce").astype(float)
+    frame["Type"] = frame["Type"].astype(str).str.strip().str.upper().map(TYPE_ALIASES)
+    frame["Quantity"] = pd.to_numeric(frame["Quantity"], errors="coerce")
+
+    valid = frame.notna().all(axis=1) & (frame["Symbol"] != "") & (frame["Quantity"] != 0)
+    if not valid.all():
+        print(f"Dropped {int((~valid).sum())} positions with a missing or invalid key or quantity.")
+
+    return frame[valid].groupby(["Symbol"] + LEG_INDEX, as_index=False, sort=True)["Quantity"].sum()
+
+def join_positions(positions: DataFrame, chains_df: DataFrame, last_price: float) -> DataFrame:
+    """Joins the positions of one underlying to its chain and scales their greeks by quantity.
+
+    Marks are the Bid/Ask mid, or the Theoretical price without a two-sided
+    quote. Delta is in shares, Theta per day, Vega per vol point and GEX in
+    dollars per 1% move, as in the chain's GEX column.
+
+    Parameters
+    ----------
+    positions: pd.DataFrame
+        Positions of one symbol, from parse_positions.
+    chains_df: pd.DataFrame
+        DataFrame of options chains, indexed by Expiration, Strike and Type. Where two roots share a
+        key, the one with the most open interest is used.
+    last_price: float
+        Price of the underlying.
+
+    Returns
+    -------
+    pd.DataFrame: The positions with Found, Mark, Market Value and their exposures. Positions not
+        in the chain have Found False and NaN values.
+    """
+
+    # get_indexer probes the chain's hashed MultiIndex engine once for every position. It needs unique
+    # keys, and index chains list monthly expirations under two roots (SPX and SPXW).
+
+    chains_df = unique_contracts(chains_df) if len(chains_df) else chains_df
+    keys = pd.MultiIndex.from_frame(positions[LEG_INDEX])
+    rows = chains_df.index.get_indexer(keys) if len(chains_df) else np.full(len(positions), -1)
+    found = rows >= 0
+    quotes = {
+        column: np.where(found, chains_df[column].to_numpy(dtype=float)[np.maximum(rows, 0)], np.nan)
+        if len(chains_df)
+        else np.full(len(positions), np.nan)
+        for column in QUOTE_COLUMNS
+    }
+
+    size = positions["Quantity"].to_numpy(dtype=float) * CONTRACT_SIZE
+    two_sided = (quotes["Bid"] > 0) & (quotes["Ask"] > 0)
+    mark = np.where(two_sided, (quotes["Bid"] + quotes["Ask"]) / 2, quotes["Theoretical"])
+    last_price = float(last_price)
+
+    legs = positions.reset_index(drop=True).copy()
+    legs["Found"] = found
+    legs["DTE"] = quotes["DTE"]
+    legs["Mark"] = np.round(mark, 4)
+    legs["IV"] = quotes["IV"]
+    legs["Market Value"] = np.round(size * mark, 2)
+    legs["Delta"] = np.round(size * quotes["Delta"], 4)
+    legs["Delta $"] = np.round(size * quotes["Delta"] * last_price, 2)
+    legs["Gamma"] = np.round(size * quotes["Gamma"], 4)
+    legs["GEX"] = np.round(size * quotes["Gamma"] * last_price * last_price * 0.01, 2)
+    legs["Theta"] = np.round(size * quotes["Theta"], 4)
+    legs["Vega"] = np.round(size * quotes["Vega"], 4)
+
+    return legs
+
+def calc_exposures(legs: DataFrame, market: Optional[DataFrame] = None) -> DataFrame:
+    """Sums the joined positions into exposures per underlying, with a Total row.
+
+    Parameters
+    ----------
+    legs: pd.DataFrame
+        Joined positions, from join_positions.
+    market: pd.DataFrame
+        Market Delta $ and Market Net GEX by Symbol, to show next to the position exposures.
+
+    Returns
+    -------
+    pd.DataFrame: EXPOSURE_COLUMNS by Symbol.
+    """
+
+    measures = EXPOSURE_COLUMNS[1:8]
+    joined = legs[legs["Found"]] if "Found" in legs else legs
+    exposures = joined.groupby("Symbol")[measures].sum()
+    exposures.insert(0, "Positions", joined.groupby("Symbol").size())
+    exposures = exposures.reindex(legs["Symbol"].unique()).fillna(0)
+    if market is not None:
+        exposures = exposures.join(market[["Market Delta $", "Market Net GEX"]])
+    exposures = DataFrame(exposures, columns=EXPOSURE_COLUMNS)
+    exposures.loc["Total"] = exposures.sum(numeric_only=True)
+    exposures["Positions"] = exposures["Positions"].astype(int)
+
+    return exposures.round(2)
+
+# %%
+def join_portfolio(positions: DataFrame, tickers: dict) -> Tuple[DataFrame, DataFrame]:
+    """Joins the positions of every underlying to its loaded ticker.
+
+    Parameters
+    ----------
+    positions: pd.DataFrame
+        Positions from parse_positions.
+    tickers: dict
+        Symbol -> loaded Ticker, or the exception that stopped its load, as from async_model.get_tickers.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, pd.DataFrame]: The joined positions, and the exposures by Symbol.
+    """
+
+    timer = instrumentation.start("portfolio.join")
+    frames, market = [], {}
+    for symbol, symbol_positions in positions.groupby("Symbol", sort=True):
+        ticker = tickers.get(symbol)
+        if ticker is None or isinstance(ticker, BaseException):
+            print(f"Could not load {symbol}: {ticker}")
+            frames.append(join_positions(symbol_positions, DataFrame(columns=QUOTE_COLUMNS), np.nan))
+            continue
+
+        # Only the expirations held are needed, so a lazy chain builds just those.
+
+        try:
+            chains_df = ticker.expiration_chains(symbol_positions["Expiration"].unique())
+            frames.append(join_positions(symbol_positions, chains_df, float(ticker.stock_price)))
+        except Exception as error:
+            print(f"Could not join the positions of {symbol}: {error}")
+            frames.append(join_positions(symbol_positions, DataFrame(columns=QUOTE_COLUMNS), np.nan))
+            continue
+        market[symbol] = {
+            "Market Delta $": float(ticker.by_expiration["Net Delta $"].sum()),
+            "Market Net GEX": float(ticker.summary["Net GEX"]),
+        }
+
+    legs = pd.concat(frames, ignore_index=True) if frames else join_positions(positions, DataFrame(), np.nan)
+    exposures = calc_exposures(legs, DataFrame.from_dict(market, orient="index", columns=["Market Delta $", "Market Net GEX"]))
+    timer.stop(rows=len(legs))
+
+    return legs, exposures
+
+async def get_portfolio(
+    positions: DataFrame,
+    concurrency: int = async_model.ASYNC_CONCURRENCY,
+    timeout: Optional[float] = None,
+) -> Tuple[DataFrame, DataFrame]:
+    """Loads every underlying of the positions in one batch and joins the positions to them.
+
+    Example
+    -------
+    legs, exposures = await get_portfolio(parse_positions(open('positions.csv', 'rb').read()))
+    """
+
+    symbols = list(positions["Symbol"].unique())
+    tickers = await async_model.get_tickers(symbols, concurrency=concurrency, timeout=timeout)
+
+    return await asyncio.to_thread(join_portfolio, positions, tickers)
+
+def load_portfolio(positions: DataFrame, timeout: Optional[float] = None) -> Tuple[DataFrame, DataFrame]:
+    """Runs get_portfolio from synchronous code, such as the Streamlit script.
+
+    Example
+    -------
+    legs, exposures = load_portfolio(parse_positions(uploaded_file.getvalue()))
+    """
+
+    async def run() -> Tuple[DataFrame, DataFrame]:
+        try:
+            return await get_portfolio(positions, timeout=timeout)
+        finally:
+            await async_model.aclose()
+
+    return asyncio.run(run())
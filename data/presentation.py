@@ -0,0 +1,218 @@
+"""Display-Ready Frames for the Dashboard
+
+Builds the grid and chart frames shown by cboe.py once per ticker snapshot,
+so Streamlit reruns (every widget interaction) reuse them instead of casting,
+resetting indexes and reshaping the same frames again.
+"""
+
+import copy
+import threading
+import collections
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional, Tuple
+from pandas import DataFrame
+from .density import calc_touch_probability
+
+try:
+    from st_aggrid import GridOptionsBuilder
+except ImportError:
+    GridOptionsBuilder = None
+
+__docformat__: Literal["numpy"] = "numpy"
+
+MAX_PRESENTATIONS: int = 16
+
+#%%
+class Presentation(object):
+    """Display-ready frames for one loaded ticker.
+
+    Attributes
+    ----------
+    grids: dict
+        Frames for AgGrid, with flat indexes and Expiration as text. The chains grids are added on first use.
+    grid_options: dict
+        AgGrid options built from each grid frame, or empty if st_aggrid is not installed.
+    charts: dict
+        Frames for the bar, line and area charts.
+    metrics: dict
+        Values for the header metrics.
+
+    Example
+    -------
+    presentation = Presentation(ticker)
+
+    AgGrid(presentation.grid('by_strike'), gridOptions = presentation.grid_options.get('by_strike'))
+    """
+
+    def __init__(self, ticker: object) -> None:
+        by_expiration = ticker.by_expiration.copy()
+        by_expiration.index = by_expiration.index.astype(str)
+        skew = ticker.skew.copy()
+        skew.index = skew.index.astype(str)
+
+        self.symbol: str = ticker.symbol
+        self.snapshot: str = getattr(ticker, "snapshot", "")
+        self._calls = ticker.calls["IV"]
+        self._puts = ticker.puts["IV"]
+        self._smiles: dict = {}
+        self._distribution = ticker.distribution
+        self._distributions: dict = {}
+        self.stock_price = float(ticker.stock_price)
+
+        # The chains grids are built later, and every session reloads the shared ticker, so a copy of this
+        # snapshot is kept rather than the ticker itself.
+
+        self._ticker = copy.copy(ticker)
+
+        self.grids: dict = {
+            "by_expiration": by_expiration.reset_index(),
+            "by_strike": ticker.by_strike.reset_index(),
+            "skew": skew.reset_index(),
+        }
+        self.grid_options: dict = {}
+        if GridOptionsBuilder is not None:
+            for name, grid in self.grids.items():
+                self.grid_options[name] = GridOptionsBuilder.from_dataframe(grid).build()
+
+        ratios = by_expiration[["OI Ratio", "Vol Ratio", "Vol-OI Ratio"]]
+        self.charts: dict = {
+            "oi_by_strike": DataFrame(
+                {"Puts": ticker.by_strike["Put OI"] * (-1), "Calls": ticker.by_strike["Call OI"]}
+            ),
+            "oi_by_expiration": DataFrame(
+                {"Puts": by_expiration["Put OI"] * (-1), "Calls": by_expiration["Call OI"]}
+            ).fillna(value=0),
+            "ratios": ratios.replace([np.inf, -np.inf], np.nan).fillna(value=0.0000),
+            "gex_by_strike": DataFrame(
+                {"Puts": ticker.by_strike["Put GEX"], "Calls": ticker.by_strike["Call GEX"]}
+            ).fillna(value=0),
+            "gex_by_expiration": DataFrame(
+                {"Puts": by_expiration["Put GEX"], "Calls": by_expiration["Call GEX"]}
+            ).fillna(value=0),
+            "skew": skew.rename(columns={"Call IV": "ATM Call IV", "Put IV": "5% OTM Put IV"}),
+        }
+
+        totals = ticker.by_expiration[["Call OI", "Put OI", "Call Vol", "Put Vol", "Call GEX", "Put GEX"]].sum()
+        put_gex = totals["Put GEX"] * (-1)
+        self.metrics: dict = {
+            "Net Put - Call OI": int(totals["Put OI"]) - int(totals["Call OI"]),
+            "Put/Call Vol Ratio": round(totals["Put Vol"] / totals["Call Vol"], ndigits=4),
+            "Net Put - Call Vol": int(totals["Put Vol"]) - int(totals["Call Vol"]),
+            "Turnover Ratio": round(
+                (totals["Put Vol"] + totals["Call Vol"]) / (totals["Put OI"] + totals["Call OI"]),
+                ndigits=4,
+            ),
+            "Net Volume - OI": int(
+                (totals["Put Vol"] + totals["Call Vol"]) - (totals["Put OI"] + totals["Call OI"])
+            ),
+            "Net GEX": int(put_gex + totals["Call GEX"]),
+            "Net Call - Put GEX": int(totals["Call GEX"] - put_gex),
+        }
+
+    def grid(self, name: str) -> DataFrame:
+        """Returns a grid frame for AgGrid, which adds a row id column to the frame it is given."""
+
+        if name == "chains":
+            return self.chains_grid()
+
+        return self.grids[name].copy(deep=False)
+
+    def chains_grid(self, expiration: Optional[str] = None) -> DataFrame:
+        """Returns the chains grid of one expiration, or of every expiration, built on first use.
+
+        With a lazy chain, only the expiration shown is materialized.
+        """
+
+        name = "chains" if expiration is None else f"chains {expiration}"
+        if name not in self.grids:
+            if expiration is None:
+                chains = self._ticker.chains.reset_index()
+            else:
+                chains = self._ticker.expiration_chains([expiration]).reset_index()
+            chains["Expiration"] = chains["Expiration"].astype(str)
+            self.grids[name] = chains
+            if GridOptionsBuilder is not None and "chains" not in self.grid_options:
+                self.grid_options["chains"] = GridOptionsBuilder.from_dataframe(chains).build()
+
+        return self.grids[name].copy(deep=False)
+
+    def smile(self, expiration: str) -> DataFrame:
+        """Returns the Call IV and Put IV by strike for one expiration, built on first use."""
+
+        if expiration not in self._smiles:
+            smile = DataFrame(
+                {
+                    "Call IV": self._calls.loc[expiration].droplevel("Type"),
+                    "Put IV": self._puts.loc[expiration].droplevel("Type"),
+                }
+            )
+            self._smiles[expiration] = smile[(smile["Call IV"] > 0) & (smile["Put IV"] > 0)]
+
+        return self._smiles[expiration]
+
+    def distribution(self, expiration: str) -> Tuple[DataFrame, DataFrame]:
+        """Returns the implied Density and CDF by strike, and the Prob ITM and Prob Touch of the listed
+        strikes, for one expiration, built on first use."""
+
+        if expiration not in self._distributions:
+            distribution = self._distribution.loc[expiration, ["Density", "CDF"]]
+            calls = self._calls.loc[[pd.Timestamp(expiration)]].to_frame()
+            touch = calc_touch_probability(self._distribution, calls, self.stock_price)
+            touch = DataFrame(
+                {
+                    "Call Prob ITM": touch["Prob ITM"],
+                    "Put Prob ITM": (1 - touch["Prob ITM"]).round(4),
+                    "Prob Touch": touch["Prob Touch"],
+                }
+            ).droplevel(["Expiration", "Type"])
+            self._distributions[expiration] = (distribution, touch)
+
+        return self._distributions[expiration]
+
+# %%
+class PresentationCache(object):
+    """Keeps the Presentation of the most recently shown ticker snapshots.
+
+    Entries are keyed by symbol and ticker version, the hash of the options
+    payload, price and annual ranges, so a refresh that changes any of them
+    gets a new Presentation and an unchanged one reuses the cached frames.
+
+    Example
+    -------
+    presentation = presentations.get(ticker)
+    """
+
+    def __init__(self, max_size: int = MAX_PRESENTATIONS) -> None:
+        self.max_size = max_size
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ticker: object) -> Presentation:
+        """Returns the Presentation for a loaded ticker, building it if this version is new."""
+
+        version: Optional[str] = getattr(ticker, "version", "")
+        if not version:
+            return Presentation(ticker)
+
+        key = (ticker.symbol, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        presentation = Presentation(ticker)
+        with self._lock:
+            self._entries[key] = presentation
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return presentation
+
+    def clear(self) -> None:
+        """Drops every cached Presentation."""
+
+        with self._lock:
+            self._entries.clear()
+
+presentations: PresentationCache = PresentationCache()
@@ -0,0 +1,381 @@
+"""Data Providers for CBOE Payloads"""
+
+import os
+import time
+import random
+import threading
+import requests
+import collections
+from typing import Literal, Optional
+from .instrumentation import instrumentation
+
+__docformat__: Literal["numpy"] = "numpy"
+
+SYMBOL_INFO_URL: str = (
+    "https://www.cboe.com/education/tools/trade-optimizer/symbol-info/?symbol="
+)
+HISTORICAL_DATA_URL: str = "https://cdn.cboe.com/api/global/delayed_quotes/historical_data/"
+OPTIONS_URL: str = "https://cdn.cboe.com/api/global/delayed_quotes/options/"
+EQUITY_DIRECTORY_URL: str = (
+    "https://www.cboe.com/us/options/symboldir/equity_index_options/?download=csv"
+)
+INDEX_DIRECTORY_URL: str = (
+    "https://cdn.cboe.com/api/global/us_indices/definitions/all_indices.json"
+)
+MAX_VALIDATED: int = 64
+
+#%%
+class DataProvider(object):
+    """Interface for the sources of raw CBOE payloads.
+
+    Each method returns the undecoded payload as bytes, or None when the source
+    has no data for the symbol. `index` is True for index symbols, which CBOE
+    serves under a prefixed name.
+    """
+
+    def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        """Returns the symbol-info JSON payload."""
+        raise NotImplementedError
+
+    def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        """Returns the delayed_quotes/historical_data JSON payload."""
+        raise NotImplementedError
+
+    def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        """Returns the delayed_quotes/options JSON payload."""
+        raise NotImplementedError
+
+    def equity_directory(self) -> Optional[bytes]:
+        """Returns the equity and index options listings CSV."""
+        raise NotImplementedError
+
+    def index_directory(self) -> Optional[bytes]:
+        """Returns the index definitions JSON."""
+        raise NotImplementedError
+
+# %%
+class ValidatorCache(object):
+    """ETag and Last-Modified validators, with the body they validate, of the most recent URLs.
+
+    Requests for a cached URL are sent as conditional requests, and a 304 Not
+    Modified response is answered with the cached body. The fetch.not_modified
+    and fetch.bytes_saved counters record the bodies that were not downloaded.
+
+    Parameters
+    ----------
+    max_urls: int
+        URLs kept, least recently used first out.
+    """
+
+    def __init__(self, max_urls: int = MAX_VALIDATED) -> None:
+        self.max_urls = max_urls
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def headers(self, url: str) -> dict:
+        """Returns the conditional request headers for a URL."""
+
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+    def not_modified(self, url: str) -> Optional[bytes]:
+        """Returns the cached body after a 304 response, or None if the URL is not cached."""
+
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+        if entry is None:
+            return None
+        instrumentation.count("fetch.not_modified")
+        instrumentation.count("fetch.bytes_saved", len(entry[2]))
+
+        return entry[2]
+
+    def store(self, url: str, headers: dict, body: bytes) -> None:
+        """Keeps the validators of a 200 response, if it has any."""
+
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return None
+        with self._lock:
+            self._entries[url] = (etag, last_modified, body)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_urls:
+                self._entries.popitem(last=False)
+
+# %%
+class CboeProvider(DataProvider):
+    """Live provider for www.cboe.com and cdn.cboe.com.
+
+    Payloads served with an ETag or Last-Modified header are revalidated with
+    conditional requests, so an unchanged payload is not downloaded again.
+
+    Parameters
+    ----------
+    timeout: float
+        Seconds allowed for each request, or None for no limit.
+    validators: ValidatorCache
+        Validators shared with other providers. A new cache by default.
+
+    Example
+    -------
+    set_provider(CboeProvider())
+    """
+
+    def __init__(self, timeout: Optional[float] = None, validators: Optional[ValidatorCache] = None) -> None:
+        self.timeout = timeout
+        self.validators = validators if validators is not None else ValidatorCache()
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Gets a URL and returns the body, or None if the status is not 200 or 304."""
+
+        r = requests.get(url, headers=self.validators.headers(url), timeout=self.timeout)
+        if r.status_code == 304:
+            return self.validators.not_modified(url)
+        if r.status_code != 200:
+            return None
+        self.validators.store(url, r.headers, r.content)
+
+        return r.content
+
+    def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.get(SYMBOL_INFO_URL + ("^" if index else "") + symbol)
+
+    def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.get(HISTORICAL_DATA_URL + ("_" if index else "") + f"{symbol}.json")
+
+    def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.get(OPTIONS_URL + ("_" if index else "") + f"{symbol}.json")
+
+    def equity_directory(self) -> Optional[bytes]:
+        return self.get(EQUITY_DIRECTORY_URL)
+
+    def index_directory(self) -> Optional[bytes]:
+        return self.get(INDEX_DIRECTORY_URL)
+
+# %%
+class ReplayProvider(DataProvider):
+    """Serves captured payloads from local files at a configurable latency.
+
+    The files use this layout:
+
+    <path>/symbol_info/<SYMBOL>.json
+    <path>/historical_data/<SYMBOL>.json
+    <path>/options/<SYMBOL>.json
+    <path>/directory/equity_index_options.csv
+    <path>/directory/all_indices.json
+
+    Any payload may instead be a directory of snapshots, i.e.
+    <path>/options/<SYMBOL>/<timestamp>.json, in which case successive
+    requests step through the snapshots in name order and wrap around.
+
+    Parameters
+    ----------
+    path: str
+        Root directory of the captured payloads.
+    latency: float
+        Seconds to wait before serving each payload.
+    jitter: float
+        Maximum extra random delay, in seconds.
+
+    Example
+    -------
+    set_provider(ReplayProvider('benchmarks/fixtures/spx', latency = 0.25))
+    """
+
+    def __init__(self, path: str, latency: float = 0.0, jitter: float = 0.0) -> None:
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self._positions: dict = {}
+        self._lock = threading.Lock()
+
+    def read(self, *parts: str) -> Optional[bytes]:
+        """Reads a payload, stepping through snapshots when the path is a directory."""
+
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        file_path = os.path.join(self.path, *parts)
+        snapshots = os.path.splitext(file_path)[0]
+        if os.path.isdir(snapshots):
+            names = sorted(os.listdir(snapshots))
+            if not names:
+                return None
+            with self._lock:
+                position = self._positions.get(snapshots, 0)
+                self._positions[snapshots] = position + 1
+            file_path = os.path.join(snapshots, names[position % len(names)])
+
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, "rb") as file:
+            return file.read()
+
+    def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.read("symbol_info", f"{symbol}.json")
+
+    def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.read("historical_data", f"{symbol}.json")
+
+    def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.read("options", f"{symbol}.json")
+
+    def equity_directory(self) -> Optional[bytes]:
+        return self.read("directory", "equity_index_options.csv")
+
+    def index_directory(self) -> Optional[bytes]:
+        return self.read("directory", "all_indices.json")
+
+# %%
+class RecordingProvider(DataProvider):
+    """Wraps another provider and captures every payload in the ReplayProvider layout.
+
+    Parameters
+    ----------
+    provider: DataProvider
+        The provider to capture from, usually CboeProvider.
+    path: str
+        Root directory to write the payloads to.
+    snapshots: bool
+        When True, each payload is written as a new timestamped snapshot
+        instead of overwriting the previous capture.
+
+    Example
+    -------
+    set_provider(RecordingProvider(CboeProvider(), 'captures/2026-10-16', snapshots = True))
+    """
+
+    def __init__(self, provider: DataProvider, path: str, snapshots: bool = False) -> None:
+        self.provider = provider
+        self.path = path
+        self.snapshots = snapshots
+
+    def write(self, payload: Optional[bytes], folder: str, name: str) -> Optional[bytes]:
+        """Writes a payload to the capture directory and returns it unchanged."""
+
+        if payload is None:
+            return None
+        if self.snapshots:
+            stem, extension = os.path.splitext(name)
+            folder = os.path.join(folder, stem)
+            name = f"{time.strftime('%Y%m%dT%H%M%S')}_{time.time_ns() % 10**9:09d}{extension}"
+        os.makedirs(os.path.join(self.path, folder), exist_ok=True)
+        with open(os.path.join(self.path, folder, name), "wb") as file:
+            file.write(payload)
+
+        return payload
+
+    def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.write(self.provider.symbol_info(symbol, index), "symbol_info", f"{symbol}.json")
+
+    def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.write(
+            self.provider.historical_data(symbol, index), "historical_data", f"{symbol}.json"
+        )
+
+    def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        return self.write(self.provider.options(symbol, index), "options", f"{symbol}.json")
+
+    def equity_directory(self) -> Optional[bytes]:
+        return self.write(
+            self.provider.equity_directory(), "directory", "equity_index_options.csv"
+        )
+
+    def index_directory(self) -> Optional[bytes]:
+        return self.write(self.provider.index_directory(), "directory", "all_indices.json")
+
+# %%
+class RateLimiter(object):
+    """Token bucket shared by the threads making requests.
+
+    Parameters
+    ----------
+    rate: float
+        Requests allowed per second, on average.
+    burst: int
+        Requests allowed at once after an idle period.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+        self._tokens: float = float(self.burst)
+        self._updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a request may be made."""
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class RateLimitedProvider(DataProvider):
+    """Wraps another provider so that every request first takes a token from a RateLimiter.
+
+    Example
+    -------
+    set_provider(RateLimitedProvider(CboeProvider(), RateLimiter(rate = 20, burst = 5)))
+    """
+
+    def __init__(self, provider: DataProvider, limiter: RateLimiter) -> None:
+        self.provider = provider
+        self.limiter = limiter
+
+    def symbol_info(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        self.limiter.acquire()
+        return self.provider.symbol_info(symbol, index)
+
+    def historical_data(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        self.limiter.acquire()
+        return self.provider.historical_data(symbol, index)
+
+    def options(self, symbol: str, index: bool = False) -> Optional[bytes]:
+        self.limiter.acquire()
+        return self.provider.options(symbol, index)
+
+    def equity_directory(self) -> Optional[bytes]:
+        self.limiter.acquire()
+        return self.provider.equity_directory()
+
+    def index_directory(self) -> Optional[bytes]:
+        self.limiter.acquire()
+        return self.provider.index_directory()
+
+# %%
+def provider_from_env() -> DataProvider:
+    """Chooses the provider from the environment.
+
+    CBOE_REPLAY_DIR selects a ReplayProvider over that directory, with
+    CBOE_REPLAY_LATENCY and CBOE_REPLAY_JITTER in seconds. Otherwise the
+    live CboeProvider is used.
+    """
+
+    replay_dir = os.environ.get("CBOE_REPLAY_DIR")
+    if replay_dir:
+        return ReplayProvider(
+            replay_dir,
+            latency=float(os.environ.get("CBOE_REPLAY_LATENCY", 0)),
+            jitter=float(os.environ.get("CBOE_REPLAY_JITTER", 0)),
+        )
+
+    return CboeProvider()
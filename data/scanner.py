@@ -0,0 +1,304 @@
+"""Market-Wide Options Scanner over the CBOE Listings Directory
+
+Walks every optionable symbol with a bounded pool of threads, under a shared
+request rate limit, and keeps one row of compact stats per symbol. Each row
+is appended to a CSV state file as soon as it is scanned, so a stopped or
+crashed scan resumes where it left off, and later scans only revisit symbols
+whose row is older than `max_age`. After each pass, the file is compacted to
+the latest row per symbol, so it does not grow with every rescan.
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Literal, Optional
+from pandas import DataFrame
+from . import cboe_model as cboe
+from .providers import DataProvider, RateLimitedProvider, RateLimiter
+
+__docformat__: Literal["numpy"] = "numpy"
+
+SCANNER_DIR: str = os.path.join(os.path.expanduser("~"), ".cboe_dashboard", "scanner")
+SCAN_COLUMNS: list[str] = [
+    "Name",
+    "Price",
+    "IV30",
+    "IV30 1Y High",
+    "IV30 1Y Low",
+    "IV Rank",
+    "Put-Call Ratio",
+    "Put-Call Vol Ratio",
+    "Turnover Ratio",
+    "Net GEX",
+    "IV Skew",
+    "Contracts",
+    "Scanned",
+]
+
+#%%
+def scan_symbol(symbol: str, provider: Optional[DataProvider] = None) -> pd.Series:
+    """Computes the scanner stats for one symbol.
+
+    Only the requests and analytics the stats need are run: one request each
+    for the symbol info, the options and the historical data, and no GEX
+    profile, max pain or history. Symbols without data get a row of NaN, so
+    that a scan does not retry them until the row expires.
+
+    Parameters
+    ----------
+    symbol: str
+        The ticker to scan.
+    provider: DataProvider
+        Source of the payloads, i.e. the scanner's rate-limited provider. Defaults to cboe_model.provider.
+
+    Returns
+    -------
+    pd.Series: One row of SCAN_COLUMNS, named by the symbol.
+
+    Example
+    -------
+    aapl = scan_symbol('AAPL')
+    """
+
+    source = cboe.provider if provider is None else provider
+    index = cboe.is_index(symbol)
+    row = pd.Series(np.nan, index=SCAN_COLUMNS, dtype=object, name=symbol)
+    row["Name"] = str(cboe.get_directory_names().get(symbol, symbol))
+    row["Contracts"] = 0
+    row["Scanned"] = pd.Timestamp.now()
+
+    details, _ = cboe.parse_ticker_info(source.symbol_info(symbol, index=index), symbol)
+    if details.empty:
+        return row
+    details = details.iloc[:, 0]
+    stock_price = float(details["Current Price"])
+
+    payload = source.options(symbol, index=index)
+    if payload is None:
+        return row
+    if cboe.use_arrow():
+        chains_table = cboe.build_chains_table(payload, stock_price)
+        chains_df = cboe.arrow_chains.to_pandas(chains_table)
+        by_expiration = cboe.calc_chains_by_expiration(chains_table)
+    else:
+        chains_df = cboe.parse_ticker_chains(payload, stock_price)
+        by_expiration = cboe.calc_chains_by_expiration(chains_df)
+    if chains_df.empty:
+        return row
+
+    cboe.activity.update(symbol, chains_df, cboe.snapshots)
+    calls, puts = cboe.separate_chains(chains_df)
+    skew = cboe.calc_iv_skew(calls, puts, stock_price)
+    totals = by_expiration.sum()
+    details["Put-Call Ratio"] = totals["Put OI"] / totals["Call OI"]
+    summary = cboe.calc_ticker_summary(
+        SimpleNamespace(symbol=symbol, details=details, by_expiration=by_expiration, skew=skew)
+    )
+
+    iv = cboe.parse_ticker_iv(source.historical_data(symbol, index=index), symbol)
+    iv = pd.to_numeric(iv.iloc[:, 0], errors="coerce") if not iv.empty else pd.Series(dtype=float)
+    iv_high = iv.get("IV30 1Y High", np.nan)
+    iv_low = iv.get("IV30 1Y Low", np.nan)
+
+    row["Price"] = stock_price
+    row["IV30"] = summary["IV30"]
+    row["IV30 1Y High"] = iv_high
+    row["IV30 1Y Low"] = iv_low
+    row["IV Rank"] = (
+        round((summary["IV30"] - iv_low) / (iv_high - iv_low) * 100, ndigits=2)
+        if iv_high > iv_low
+        else np.nan
+    )
+    row["Put-Call Ratio"] = round(summary["Put-Call Ratio"], ndigits=4)
+    row["Put-Call Vol Ratio"] = round(totals["Put Vol"] / totals["Call Vol"], ndigits=4)
+    row["Turnover Ratio"] = round(summary["Turnover Ratio"], ndigits=4)
+    row["Net GEX"] = summary["Net GEX"]
+    row["IV Skew"] = summary["IV Skew"]
+    row["Contracts"] = len(chains_df)
+
+    return row
+
+def screen(results: DataFrame, criteria: dict) -> DataFrame:
+    """Filters scanner results by column ranges.
+
+    Parameters
+    ----------
+    results: pd.DataFrame
+        Scanner results, i.e. from Scanner.results().
+    criteria: dict
+        Column -> (minimum, maximum). Either bound may be None.
+
+    Returns
+    -------
+    pd.DataFrame: The rows within every range.
+
+    Example
+    -------
+    cheap_puts = screen(scanner.results(), {'IV Rank': (None, 20), 'Put-Call Ratio': (1.0, None)})
+    """
+
+    mask = pd.Series(True, index=results.index)
+    for column, (minimum, maximum) in criteria.items():
+        values = pd.to_numeric(results[column], errors="coerce")
+        if minimum is not None:
+            mask &= values >= minimum
+        if maximum is not None:
+            mask &= values <= maximum
+
+    return results[mask]
+
+# %%
+class Scanner(object):
+    """Scans the CBOE listings directory and keeps the results in a resumable state file.
+
+    Parameters
+    ----------
+    path: str
+        Directory of the state file.
+    concurrency: int
+        Symbols scanned at once.
+    rate: float
+        Requests per second to the provider, shared by every scanning thread.
+    max_age: float
+        Seconds before a scanned row is considered stale and scanned again.
+
+    Example
+    -------
+    scanner = Scanner(concurrency = 16, rate = 20)
+
+    scanner.start()
+
+    scanner.progress
+
+    results = scanner.results().sort_values('IV Rank', ascending = False)
+    """
+
+    def __init__(
+        self,
+        path: str = SCANNER_DIR,
+        concurrency: int = 16,
+        rate: float = 20.0,
+        max_age: float = 6 * 3600,
+    ) -> None:
+        self.path = path
+        self.concurrency = concurrency
+        self.rate = rate
+        self.max_age = max_age
+        self.progress: dict = {"Total": 0, "Done": 0, "Errors": 0, "Running": False}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def state_file(self) -> str:
+        return os.path.join(self.path, "results.csv")
+
+    def results(self) -> DataFrame:
+        """Returns the latest row for every scanned symbol, indexed by Symbol."""
+
+        with self._lock:
+            return self._read()
+
+    def _read(self) -> DataFrame:
+        if not os.path.isfile(self.state_file):
+            return DataFrame(columns=SCAN_COLUMNS).rename_axis("Symbol")
+
+        results = pd.read_csv(self.state_file, index_col="Symbol", parse_dates=["Scanned"])
+
+        return results[~results.index.duplicated(keep="last")].reindex(columns=SCAN_COLUMNS)
+
+    def compact(self) -> None:
+        """Rewrites the state file with only the latest row per symbol."""
+
+        with self._lock:
+            if not os.path.isfile(self.state_file):
+                return
+            results = self._read()
+            results.to_csv(self.state_file + ".tmp")
+            os.replace(self.state_file + ".tmp", self.state_file)
+
+    def pending(self, symbols: list[str]) -> list[str]:
+        """Returns the symbols without a row newer than `max_age`."""
+
+        scanned = self.results()["Scanned"]
+        fresh = scanned[scanned >= pd.Timestamp.now() - pd.Timedelta(seconds=self.max_age)]
+
+        return [symbol for symbol in symbols if symbol not in fresh.index]
+
+    def _append(self, row: pd.Series) -> None:
+        frame = row.to_frame().transpose().rename_axis("Symbol")
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            exists = os.path.isfile(self.state_file)
+            frame.to_csv(self.state_file, mode="a", header=not exists)
+
+    def run(self, symbols: Optional[list[str]] = None) -> DataFrame:
+        """Scans the pending symbols, blocking until done or stopped.
+
+        Parameters
+        ----------
+        symbols: list[str]
+            Symbols to scan. Defaults to the whole listings directory.
+
+        Returns
+        -------
+        pd.DataFrame: The scanner results, including earlier scans.
+        """
+
+        if symbols is None:
+            symbols = cboe.get_directory().index.unique().tolist()
+
+        # A crashed pass leaves its rows appended to the previous ones, so the file is compacted first too.
+
+        self.compact()
+        symbols = self.pending(symbols)
+        self._stop.clear()
+        self.progress = {"Total": len(symbols), "Done": 0, "Errors": 0, "Running": True}
+
+        # The scan's requests share one rate limit. Only the scan uses the limited provider, so dashboard
+        # sessions are not throttled by it.
+
+        limited = RateLimitedProvider(cboe.provider, RateLimiter(self.rate, burst=self.concurrency))
+
+        def scan(symbol: str) -> Optional[pd.Series]:
+            if self._stop.is_set():
+                return None
+            return scan_symbol(symbol, limited)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = [executor.submit(scan, symbol) for symbol in symbols]
+                for future in as_completed(futures):
+                    try:
+                        row = future.result()
+                    except Exception as error:
+                        print("Scanner error: " f"{error}")
+                        self.progress["Errors"] += 1
+                        continue
+                    if row is not None:
+                        self._append(row)
+                        self.progress["Done"] += 1
+        finally:
+            self.compact()
+            self.progress["Running"] = False
+
+        return self.results()
+
+    def start(self, symbols: Optional[list[str]] = None) -> None:
+        """Runs the scan in a background thread, unless one is already running."""
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self.run, args=(symbols,), name="scanner", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the scan after the symbols in flight. The next run resumes from there."""
+
+        self._stop.set()
+
+scanner: Scanner = Scanner()
@@ -0,0 +1,373 @@
+"""Delta-Compressed Intraday Snapshots of the Options Chains
+
+Each refresh of a chain is stored as the cells that changed since the
+previous refresh of the same session, keyed by contract, so storage grows
+with the number of changes rather than with the size of the chain. A full
+keyframe is written every `keyframe_every` refreshes, so rebuilding any
+point in time reads one keyframe and the deltas after it.
+
+Files for one symbol and session, under <path>/<SYMBOL>/<YYYY-MM-DD>/:
+
+expiration.i8, strike.f8, type.i1   Contract keys, by contract id
+delta_snapshot.i4                   Snapshot number of each changed cell
+delta_contract.i4                   Contract id of each changed cell
+delta_column.i1                     Column number of each changed cell
+delta_value.f8                      New value of each changed cell
+keyframe_<snapshot>.f8              Full state after that snapshot
+totals.f8                           Column totals of each snapshot
+snapshot.i8                         Nanosecond UTC timestamp of each snapshot, written last
+"""
+
+import os
+import time
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional
+from pandas import DataFrame
+
+__docformat__: Literal["numpy"] = "numpy"
+
+SNAPSHOT_DIR: str = os.path.join(os.path.expanduser("~"), ".cboe_dashboard", "snapshots")
+SNAPSHOT_COLUMNS: list[str] = ["OI", "Vol", "GEX", "Delta $", "IV", "Last Price"]
+TOTAL_COLUMNS: list[str] = ["OI", "Vol", "GEX", "Delta $"]
+KEYFRAME_EVERY: int = 50
+
+#%%
+def combine_roots(chains_df: DataFrame, columns: list[str] = SNAPSHOT_COLUMNS) -> DataFrame:
+    """The tracked columns of a chain with one row per Expiration, Strike and Type.
+
+    Index options list monthly expirations under two roots, i.e. SPX and
+    SPXW, under the same key. Their OI, Vol, GEX and Delta $ are summed, and
+    the other columns are taken from the root with the most open interest.
+
+    Example
+    -------
+    contracts = combine_roots(ticker.chains)
+    """
+
+    frame = chains_df.reindex(columns=columns)
+    if frame.index.is_unique:
+        return frame
+
+    if "OI" in chains_df.columns:
+        frame = frame.iloc[np.argsort(-chains_df["OI"].to_numpy(dtype=float), kind="stable")]
+    grouped = frame.groupby(level=["Expiration", "Strike", "Type"], sort=True)
+    summed = [column for column in columns if column in TOTAL_COLUMNS]
+    others = [column for column in columns if column not in TOTAL_COLUMNS]
+
+    return pd.concat([grouped[summed].sum(min_count=1), grouped[others].first()], axis=1)[columns]
+
+# %%
+class SnapshotHistory(object):
+    """Stores each refresh of a chain as per-contract column deltas, one session per day.
+
+    Example
+    -------
+    snapshots = SnapshotHistory()
+
+    snapshots.record('SPX', ticker.chains)
+
+    times = snapshots.times('SPX')
+
+    chains_at_noon = snapshots.at('SPX', times[len(times) // 2])
+    """
+
+    def __init__(
+        self,
+        path: str = SNAPSHOT_DIR,
+        columns: list[str] = SNAPSHOT_COLUMNS,
+        keyframe_every: int = KEYFRAME_EVERY,
+    ) -> None:
+        self.path = path
+        self.columns = list(columns)
+        self.keyframe_every = keyframe_every
+        self._sessions: dict = {}
+        self._lock = threading.Lock()
+
+    def _session_dir(self, symbol: str, day: str) -> str:
+        return os.path.join(self.path, symbol.upper(), day)
+
+    def days(self, symbol: str) -> list[str]:
+        """Lists the sessions recorded for a symbol, oldest first."""
+
+        symbol_dir = os.path.join(self.path, symbol.upper())
+        if not os.path.isdir(symbol_dir):
+            return []
+
+        return sorted(
+            day for day in os.listdir(symbol_dir)
+            if os.path.isfile(os.path.join(symbol_dir, day, "snapshot.i8"))
+        )
+
+    def times(self, symbol: str, day: Optional[str] = None) -> pd.DatetimeIndex:
+        """Returns the snapshot times of a session. Defaults to the latest session."""
+
+        day = day or (self.days(symbol) or [""])[-1]
+        snapshot_file = os.path.join(self._session_dir(symbol, day), "snapshot.i8")
+        if not day or not os.path.isfile(snapshot_file):
+            return pd.DatetimeIndex([], name="Timestamp")
+
+        return pd.DatetimeIndex(np.fromfile(snapshot_file, dtype=np.int64), name="Timestamp")
+
+    def totals(self, symbol: str, day: Optional[str] = None) -> DataFrame:
+        """Returns the total OI, Vol, GEX and Delta $ of every snapshot in a session."""
+
+        day = day or (self.days(symbol) or [""])[-1]
+        times = self.times(symbol, day)
+        if times.empty:
+            return DataFrame(columns=TOTAL_COLUMNS, index=times)
+
+        totals = np.fromfile(
+            os.path.join(self._session_dir(symbol, day), "totals.f8"), dtype=np.float64
+        ).reshape(-1, len(self.columns))[: len(times)]
+
+        return DataFrame(totals, index=times, columns=self.columns).reindex(columns=TOTAL_COLUMNS)
+
+    def _read_contracts(self, session_dir: str) -> pd.MultiIndex:
+        expiration = np.fromfile(os.path.join(session_dir, "expiration.i8"), dtype=np.int64)
+        strike = np.fromfile(os.path.join(session_dir, "strike.f8"), dtype=np.float64)
+        is_call = np.fromfile(os.path.join(session_dir, "type.i1"), dtype=np.int8)
+        rows = min(expiration.size, strike.size, is_call.size)
+
+        return pd.MultiIndex.from_arrays(
+            [
+                pd.DatetimeIndex(expiration[:rows]),
+                strike[:rows],
+                np.where(is_call[:rows] == 1, "Call", "Put"),
+            ],
+            names=["Expiration", "Strike", "Type"],
+        )
+
+    def _rebuild(self, session_dir: str, snapshot: int, contracts: int) -> np.ndarray:
+        """Rebuilds the full state after `snapshot` from the nearest keyframe and the deltas after it."""
+
+        width = len(self.columns)
+        keyframes = sorted(
+            int(name[9:-3]) for name in os.listdir(session_dir)
+            if name.startswith("keyframe_") and int(name[9:-3]) <= snapshot
+        )
+        state = np.full((contracts, width), np.nan)
+        start = 0
+        if keyframes:
+            keyframe = np.fromfile(
+                os.path.join(session_dir, f"keyframe_{keyframes[-1]:06d}.f8"), dtype=np.float64
+            ).reshape(-1, width)
+            state[: len(keyframe)] = keyframe
+            start = keyframes[-1] + 1
+
+        delta_file = os.path.join(session_dir, "delta_snapshot.i4")
+        if not os.path.isfile(delta_file) or os.path.getsize(delta_file) == 0:
+            return state
+
+        delta_snapshot = np.memmap(delta_file, dtype=np.int32, mode="r")
+        first = int(np.searchsorted(delta_snapshot, start, side="left"))
+        last = int(np.searchsorted(delta_snapshot, snapshot, side="right"))
+        if last > first:
+            contract = np.fromfile(
+                os.path.join(session_dir, "delta_contract.i4"), dtype=np.int32, count=last
+            )[first:]
+            column = np.fromfile(
+                os.path.join(session_dir, "delta_column.i1"), dtype=np.int8, count=last
+            )[first:]
+            value = np.fromfile(
+                os.path.join(session_dir, "delta_value.f8"), dtype=np.float64, count=last
+            )[first:]
+
+            # Deltas are in time order, so the last change of each cell wins.
+
+            cell = contract.astype(np.int64) * width + column
+            cells, position = np.unique(cell[::-1], return_index=True)
+            state.flat[cells] = value[::-1][position]
+
+        return state
+
+    def at(self, symbol: str, when: Optional[pd.Timestamp] = None, day: Optional[str] = None) -> DataFrame:
+        """Rebuilds the chain columns as of the last snapshot at or before `when`.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker to rebuild.
+        when: pd.Timestamp
+            Point in time, in UTC when naive. Defaults to the latest snapshot.
+        day: str
+            Session as YYYY-MM-DD. Defaults to the session of `when`, or the latest one.
+
+        Returns
+        -------
+        pd.DataFrame: The tracked columns indexed by Expiration, Strike and Type.
+
+        Example
+        -------
+        chains = snapshots.at('SPX', '2026-10-16 11:30')
+        """
+
+        if day is None:
+            day = pd.Timestamp(when).strftime("%Y-%m-%d") if when is not None else (self.days(symbol) or [""])[-1]
+        times = self.times(symbol, day)
+        snapshot = len(times) - 1 if when is None else int(
+            np.searchsorted(times.asi8, pd.Timestamp(when).value, side="right")
+        ) - 1
+        if snapshot < 0:
+            return DataFrame(columns=self.columns)
+
+        session_dir = self._session_dir(symbol, day)
+        contracts = self._read_contracts(session_dir)
+        state = self._rebuild(session_dir, snapshot, len(contracts))
+        listed = ~np.isnan(state).all(axis=1)
+        frame = DataFrame(state[listed], index=contracts[listed], columns=self.columns)
+
+        # Sessions recorded before the roots of a key were combined can hold the same key twice.
+
+        return combine_roots(frame, self.columns).sort_index()
+
+    def _session(self, symbol: str, day: str) -> dict:
+        """Returns the in-memory state of a session, loading it from disk after a restart."""
+
+        key = (symbol.upper(), day)
+        if key not in self._sessions:
+            session_dir = self._session_dir(symbol, day)
+            os.makedirs(session_dir, exist_ok=True)
+            snapshots = len(self.times(symbol, day))
+            contracts = self._read_contracts(session_dir) if snapshots else pd.MultiIndex.from_arrays(
+                [pd.DatetimeIndex([]), np.array([], dtype=float), np.array([], dtype=object)],
+                names=["Expiration", "Strike", "Type"],
+            )
+            state = (
+                self._rebuild(session_dir, snapshots - 1, len(contracts))
+                if snapshots
+                else np.full((0, len(self.columns)), np.nan)
+            )
+            self._sessions = {k: v for k, v in self._sessions.items() if k[0] != key[0]}
+            self._sessions[key] = {"contracts": contracts, "state": state, "snapshots": snapshots}
+
+        return self._sessions[key]
+
+    def record(
+        self,
+        symbol: str,
+        chains_df: DataFrame,
+        timestamp: Optional[pd.Timestamp] = None,
+        snapshot_id: str = "",
+    ) -> int:
+        """Stores one refresh of a chain as the cells that changed since the previous one.
+
+        Contracts missing from the refresh are stored as NaN, so they drop out of later rebuilds.
+        A refresh with the same payload snapshot id as the previous one is not stored. Contracts of
+        two roots under one key are combined first, as in combine_roots.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker the chains belong to.
+        chains_df: pd.DataFrame
+            Chains indexed by Expiration, Strike and Type.
+        timestamp: pd.Timestamp
+            Time of the refresh, in UTC when naive. Defaults to now.
+        snapshot_id: str
+            The payload's snapshot id, i.e. ticker.snapshot.
+
+        Returns
+        -------
+        int: The number of changed cells stored.
+        """
+
+        stamp: int = time.time_ns() if timestamp is None else pd.Timestamp(timestamp).value
+        day = pd.Timestamp(stamp).strftime("%Y-%m-%d")
+        session_dir = self._session_dir(symbol, day)
+        width = len(self.columns)
+
+        with self._lock:
+            session = self._session(symbol, day)
+            if snapshot_id and snapshot_id == session.get("snapshot_id"):
+                return 0
+            contracts: pd.MultiIndex = session["contracts"]
+            chains_df = combine_roots(chains_df, self.columns)
+            keys = chains_df.index
+            ids = contracts.get_indexer(keys) if len(contracts) else np.full(len(keys), -1)
+            new = ids < 0
+            if new.any():
+                new_keys = keys[new]
+                ids[new] = np.arange(len(contracts), len(contracts) + new.sum())
+                with open(os.path.join(session_dir, "expiration.i8"), "ab") as file:
+                    file.write(new_keys.get_level_values("Expiration").asi8.astype(np.int64).tobytes())
+                with open(os.path.join(session_dir, "strike.f8"), "ab") as file:
+                    file.write(new_keys.get_level_values("Strike").to_numpy(dtype=np.float64).tobytes())
+                with open(os.path.join(session_dir, "type.i1"), "ab") as file:
+                    file.write((new_keys.get_level_values("Type") == "Call").astype(np.int8).tobytes())
+                contracts = contracts.append(new_keys)
+
+            state = np.full((len(contracts), width), np.nan)
+            state[ids] = chains_df.to_numpy(dtype=np.float64)
+            previous = session["state"]
+            unchanged = np.zeros(state.shape, dtype=bool)
+            unchanged[: len(previous)] = (state[: len(previous)] == previous) | (
+                np.isnan(state[: len(previous)]) & np.isnan(previous)
+            )
+            unchanged[len(previous):] = np.isnan(state[len(previous):])
+            contract, column = np.nonzero(~unchanged)
+
+            snapshot: int = session["snapshots"]
+            files = {
+                "delta_snapshot.i4": np.full(contract.size, snapshot, dtype=np.int32),
+                "delta_contract.i4": contract.astype(np.int32),
+                "delta_column.i1": column.astype(np.int8),
+                "delta_value.f8": state[contract, column],
+                "totals.f8": np.nansum(state, axis=0),
+            }
+            for name, values in files.items():
+                with open(os.path.join(session_dir, name), "ab") as file:
+                    file.write(values.tobytes())
+            if snapshot and snapshot % self.keyframe_every == 0:
+                state.tofile(os.path.join(session_dir, f"keyframe_{snapshot:06d}.f8"))
+
+            # The timestamp is written last, so readers never see a partial snapshot.
+
+            with open(os.path.join(session_dir, "snapshot.i8"), "ab") as file:
+                file.write(np.int64(stamp).tobytes())
+
+            session.update(
+                {"contracts": contracts, "state": state, "snapshots": snapshot + 1, "snapshot_id": snapshot_id}
+            )
+
+        return int(contract.size)
+
+    def _spill_path(self, symbol: str, name: str) -> str:
+        return os.path.join(self.path, symbol.upper(), "spill", f"{name}.pkl")
+
+    def spill(self, symbol: str, name: str, value: object) -> str:
+        """Writes an object evicted from memory, i.e. a parsed index chain, under the symbol's directory.
+
+        Returns
+        -------
+        str: The path of the spill file.
+        """
+
+        path = self._spill_path(symbol, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+        return path
+
+    def restore(self, symbol: str, name: str) -> Optional[object]:
+        """Reads back a spilled object, or None if there is none."""
+
+        path = self._spill_path(symbol, name)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def discard(self, symbol: str, name: str) -> None:
+        """Deletes a spilled object."""
+
+        path = self._spill_path(symbol, name)
+        if os.path.isfile(path):
+            os.remove(path)
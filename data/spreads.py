@@ -0,0 +1,309 @@
+"""Vertical and Calendar Spread Screener
+
+Enumerates every candidate spread of a chain without a Python loop over
+contracts. Verticals pair each strike with the next `max_steps` listed
+strikes of the same expiration, one shifted array at a time, and stop once
+every pair at a step is wider than `max_width`. Calendars pair the same
+strike across the next `max_gap` expirations of a strike x expiration grid.
+Candidates outside the moneyness band, without quotes or below the open
+interest floor are pruned before pairing, and only the best `top` of each
+batch reach a bounded heap.
+
+Prices are per share, with the long leg at the Ask and the short leg at the Bid.
+"""
+
+import heapq
+import itertools
+import numpy as np
+from typing import Literal, Optional
+from pandas import DataFrame
+from .iv_solver import norm_cdf
+
+__docformat__: Literal["numpy"] = "numpy"
+
+TOP_SPREADS: int = 100
+MAX_STEPS: int = 20
+MAX_WIDTH_PCT: float = 0.05
+MAX_MONEYNESS: float = 0.25
+MAX_GAP: int = 3
+
+# Vertical spreads as (option type, long leg, bullish, credit).
+
+VERTICAL_SPREADS: dict = {
+    "Bull Call": ("Call", "lower", True, False),
+    "Bear Call": ("Call", "upper", False, True),
+    "Bull Put": ("Put", "lower", True, True),
+    "Bear Put": ("Put", "upper", False, False),
+}
+CALENDAR_SPREADS: dict = {
+    "Call Calendar": "Call",
+    "Put Calendar": "Put",
+}
+SPREAD_TYPES: list[str] = list(VERTICAL_SPREADS) + list(CALENDAR_SPREADS)
+
+SPREAD_COLUMNS: list[str] = [
+    "Strategy",
+    "Expiration",
+    "Long Expiration",
+    "DTE",
+    "Long Strike",
+    "Short Strike",
+    "Width",
+    "Net Credit",
+    "Max Profit",
+    "Max Loss",
+    "Return on Risk",
+    "Breakeven",
+    "Prob. Proxy",
+    "Expected Value",
+    "Min OI",
+]
+RANK_COLUMNS: list[str] = ["Return on Risk", "Expected Value", "Prob. Proxy", "Max Profit", "Net Credit", "Max Loss"]
+LEG_COLUMNS: list[str] = ["DTE", "Bid", "Ask", "Delta", "IV", "OI"]
+
+#%%
+def prune_legs(
+    options_df: DataFrame,
+    last_price: float,
+    max_moneyness: float = MAX_MONEYNESS,
+    min_oi: int = 0,
+    max_dte: Optional[int] = None,
+) -> dict:
+    """Keeps the quoted contracts near the money, sorted by Expiration and Strike.
+
+    Returns
+    -------
+    dict: Arrays of Expiration, Strike and LEG_COLUMNS, without the Type level.
+    """
+
+    legs = options_df[LEG_COLUMNS].reset_index()
+    strike = legs["Strike"].to_numpy(dtype=float)
+    keep = (
+        (np.abs(strike / last_price - 1) <= max_moneyness)
+        & ((legs["Bid"] > 0) | (legs["Ask"] > 0)).to_numpy()
+        & (legs["OI"] >= min_oi).to_numpy()
+        & (legs["DTE"] >= 0).to_numpy()
+    )
+    if max_dte is not None:
+        keep &= (legs["DTE"] <= max_dte).to_numpy()
+
+    legs = legs[keep].sort_values(["Expiration", "Strike"], ignore_index=True)
+
+    return {column: legs[column].to_numpy() for column in legs.columns if column != "Type"}
+
+def push_top(heap: list, counter: itertools.count, spreads: dict, score: np.ndarray, top: int) -> None:
+    """Pushes the best `top` spreads of a batch into a bounded min-heap of (score, sequence, row)."""
+
+    valid = np.flatnonzero(np.isfinite(score))
+    if heap and len(heap) >= top:
+        valid = valid[score[valid] > heap[0][0]]
+    if len(valid) > top:
+        valid = valid[np.argpartition(score[valid], -top)[-top:]]
+
+    rows = zip(*[np.broadcast_to(spreads[column], score.shape)[valid] for column in SPREAD_COLUMNS])
+    for position, row in zip(valid, rows):
+        item = (float(score[position]), next(counter), row)
+        if len(heap) < top:
+            heapq.heappush(heap, item)
+        elif item[0] > heap[0][0]:
+            heapq.heappushpop(heap, item)
+
+def calc_vertical_spreads(
+    legs: dict,
+    strategy: str,
+    step: int,
+    max_width: float,
+) -> Optional[dict]:
+    """Every vertical of one strategy whose strikes are `step` listed strikes apart.
+
+    Parameters
+    ----------
+    legs: dict
+        Contracts of one type from prune_legs.
+    strategy: str
+        One of VERTICAL_SPREADS.
+    step: int
+        Listed strikes between the lower and upper leg.
+    max_width: float
+        The widest spread, in strike points.
+
+    Returns
+    -------
+    dict: Arrays of SPREAD_COLUMNS with NaN ranks for the invalid pairs, or None when no pair at
+        this step is within `max_width`, so no wider step can be either.
+    """
+
+    option_type, long_leg, bullish, credit = VERTICAL_SPREADS[strategy]
+    lower = {column: values[:-step] for column, values in legs.items()}
+    upper = {column: values[step:] for column, values in legs.items()}
+    width = upper["Strike"] - lower["Strike"]
+    pairs = (lower["Expiration"] == upper["Expiration"]) & (width <= max_width)
+    if not pairs.any():
+        return None
+
+    long, short = (lower, upper) if long_leg == "lower" else (upper, lower)
+    net = short["Bid"] - long["Ask"]
+    max_profit = net if credit else width + net
+    max_loss = width - net if credit else -net
+    valid = pairs & (short["Bid"] > 0) & (long["Ask"] > 0) & (max_profit > 0) & (max_loss > 0)
+
+    # The breakeven is always between the strikes, where the delta is interpolated as the probability of finishing above it.
+
+    breakeven = lower["Strike"] + np.abs(net) if option_type == "Call" else upper["Strike"] - np.abs(net)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = lower["Delta"] + (upper["Delta"] - lower["Delta"]) * (breakeven - lower["Strike"]) / width
+        above = np.abs(delta) if option_type == "Call" else 1 - np.abs(delta)
+        probability = np.clip(above if bullish else 1 - above, 0, 1)
+        return_on_risk = np.where(valid, max_profit / max_loss, np.nan)
+
+    return {
+        "Strategy": np.array(strategy, dtype=object),
+        "Expiration": lower["Expiration"],
+        "Long Expiration": lower["Expiration"],
+        "DTE": lower["DTE"],
+        "Long Strike": long["Strike"],
+        "Short Strike": short["Strike"],
+        "Width": width,
+        "Net Credit": np.where(valid, net, np.nan),
+        "Max Profit": np.where(valid, max_profit, np.nan),
+        "Max Loss": np.where(valid, max_loss, np.nan),
+        "Return on Risk": return_on_risk,
+        "Breakeven": breakeven,
+        "Prob. Proxy": np.where(valid, probability, np.nan),
+        "Expected Value": np.where(valid, probability * max_profit - (1 - probability) * max_loss, np.nan),
+        "Min OI": np.minimum(lower["OI"], upper["OI"]),
+    }
+
+def calc_calendar_spreads(legs: dict, strategy: str, gap: int) -> dict:
+    """Every calendar of one strategy, short the nearer expiration and long the one `gap` listed expirations later.
+
+    Max Profit is the far leg's at-the-money Black-Scholes value at the near
+    expiration, with the far leg's IV, less the debit. Calendars have two
+    breakevens, so Breakeven, Prob. Proxy and Expected Value are NaN.
+
+    Returns
+    -------
+    dict: Arrays of SPREAD_COLUMNS with NaN ranks for the invalid pairs.
+    """
+
+    expirations, expiration_codes = np.unique(legs["Expiration"], return_inverse=True)
+    strikes, strike_codes = np.unique(legs["Strike"], return_inverse=True)
+    grid = {}
+    for column in ["Bid", "Ask", "IV", "DTE", "OI"]:
+        grid[column] = np.full((len(expirations), len(strikes)), np.nan)
+        grid[column][expiration_codes, strike_codes] = legs[column]
+    near = {column: values[:-gap].ravel() for column, values in grid.items()}
+    far = {column: values[gap:].ravel() for column, values in grid.items()}
+
+    net = near["Bid"] - far["Ask"]
+    t = np.maximum(far["DTE"] - near["DTE"], 0) / 365
+    strike = np.tile(strikes, len(expirations) - gap)
+    max_profit = strike * (2 * norm_cdf(0.5 * far["IV"] * np.sqrt(t)) - 1) + net
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid = (near["Bid"] > 0) & (far["Ask"] > 0) & (net < 0) & (max_profit > 0)
+        return_on_risk = np.where(valid, max_profit / -net, np.nan)
+
+    return {
+        "Strategy": np.array(strategy, dtype=object),
+        "Expiration": np.repeat(expirations[:-gap], len(strikes)),
+        "Long Expiration": np.repeat(expirations[gap:], len(strikes)),
+        "DTE": np.nan_to_num(near["DTE"]).astype(int),
+        "Long Strike": strike,
+        "Short Strike": strike,
+        "Width": np.array(0.0),
+        "Net Credit": np.where(valid, net, np.nan),
+        "Max Profit": np.where(valid, max_profit, np.nan),
+        "Max Loss": np.where(valid, -net, np.nan),
+        "Return on Risk": return_on_risk,
+        "Breakeven": np.array(np.nan),
+        "Prob. Proxy": np.array(np.nan),
+        "Expected Value": np.array(np.nan),
+        "Min OI": np.nan_to_num(np.fmin(near["OI"], far["OI"])).astype(int),
+    }
+
+def screen_spreads(
+    calls: DataFrame,
+    puts: DataFrame,
+    last_price: float,
+    strategies: list[str] = SPREAD_TYPES,
+    rank_by: str = "Return on Risk",
+    ascending: bool = False,
+    top: int = TOP_SPREADS,
+    max_steps: int = MAX_STEPS,
+    max_width: Optional[float] = None,
+    max_gap: int = MAX_GAP,
+    max_moneyness: float = MAX_MONEYNESS,
+    min_oi: int = 0,
+    max_dte: Optional[int] = None,
+) -> DataFrame:
+    """Ranks the vertical and calendar spreads of a chain.
+
+    Parameters
+    ----------
+    calls: pd.DataFrame
+        Ticker.calls.
+    puts: pd.DataFrame
+        Ticker.puts.
+    last_price: float
+        Price of the underlying.
+    strategies: list[str]
+        Any of SPREAD_TYPES.
+    rank_by: str
+        One of RANK_COLUMNS. Spreads where it is NaN are not ranked.
+    ascending: bool
+        Rank the lowest values first, i.e. for Max Loss.
+    top: int
+        Spreads returned.
+    max_steps: int
+        Most listed strikes between the legs of a vertical.
+    max_width: float
+        Widest vertical, in strike points. Defaults to MAX_WIDTH_PCT of the last price.
+    max_gap: int
+        Most listed expirations between the legs of a calendar.
+    max_moneyness: float
+        Legs with strikes further than this fraction from the last price are skipped.
+    min_oi: int
+        Legs with less open interest are skipped.
+    max_dte: int
+        Legs expiring later are skipped.
+
+    Returns
+    -------
+    pd.DataFrame: The best `top` spreads by `rank_by`, with SPREAD_COLUMNS.
+
+    Example
+    -------
+    spreads = screen_spreads(ticker.calls, ticker.puts, ticker.stock_price, ['Bull Put', 'Bear Call'], rank_by = 'Expected Value')
+    """
+
+    max_width = last_price * MAX_WIDTH_PCT if max_width is None else max_width
+    sign = -1.0 if ascending else 1.0
+    legs = {
+        option_type: prune_legs(options_df, last_price, max_moneyness, min_oi, max_dte)
+        for option_type, options_df in [("Call", calls), ("Put", puts)]
+    }
+    heap: list = []
+    counter = itertools.count()
+
+    def push(spreads: dict) -> None:
+        push_top(heap, counter, spreads, sign * np.broadcast_to(spreads[rank_by], spreads["Net Credit"].shape), top)
+
+    for strategy in strategies:
+        if strategy in VERTICAL_SPREADS:
+            type_legs = legs[VERTICAL_SPREADS[strategy][0]]
+            for step in range(1, min(max_steps, len(type_legs["Strike"]) - 1) + 1):
+                spreads = calc_vertical_spreads(type_legs, strategy, step, max_width)
+                if spreads is None:
+                    break
+                push(spreads)
+        elif strategy in CALENDAR_SPREADS:
+            type_legs = legs[CALENDAR_SPREADS[strategy]]
+            for gap in range(1, min(max_gap, len(np.unique(type_legs["Expiration"])) - 1) + 1):
+                spreads = calc_calendar_spreads(type_legs, strategy, gap)
+                push(spreads)
+
+    ranked = DataFrame([row for _, _, row in sorted(heap, reverse=True)], columns=SPREAD_COLUMNS)
+    for column in ["Net Credit", "Max Profit", "Max Loss", "Return on Risk", "Breakeven", "Prob. Proxy", "Expected Value"]:
+        ranked[column] = ranked[column].astype(float).round(4)
+
+    return ranked
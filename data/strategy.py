@@ -0,0 +1,277 @@
+"""Multi-Leg Strategy Payoff and Scenario P&L
+
+Legs are contracts of a loaded chain, referenced by (Expiration, Strike, Type)
+with a signed quantity. The P&L of the whole position is evaluated over a
+spot x days-forward x IV-shift grid as one broadcasted (legs x spot x days x
+IV) array, either by Black-Scholes repricing or from the chain's greeks.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Literal, Optional
+from pandas import DataFrame
+from .iv_solver import bs_d1_d2, norm_cdf
+
+__docformat__: Literal["numpy"] = "numpy"
+
+CONTRACT_SIZE: int = 100
+SPOT_WIDTH: float = 0.20
+SPOT_POINTS: int = 200
+DAYS_POINTS: int = 30
+IV_SHIFTS: np.ndarray = np.round(np.linspace(-0.10, 0.10, 11), 2)
+LEG_INDEX: list[str] = ["Expiration", "Strike", "Type"]
+
+# Presets as (Type, strike steps from the money, quantity, expiration number).
+
+STRATEGY_PRESETS: dict = {
+    "Long Call": [("Call", 0, 1, 0)],
+    "Long Put": [("Put", 0, 1, 0)],
+    "Bull Call Spread": [("Call", 0, 1, 0), ("Call", 1, -1, 0)],
+    "Bear Put Spread": [("Put", 0, 1, 0), ("Put", -1, -1, 0)],
+    "Long Straddle": [("Call", 0, 1, 0), ("Put", 0, 1, 0)],
+    "Short Strangle": [("Call", 1, -1, 0), ("Put", -1, -1, 0)],
+    "Iron Condor": [("Put", -2, 1, 0), ("Put", -1, -1, 0), ("Call", 1, -1, 0), ("Call", 2, 1, 0)],
+    "Iron Butterfly": [("Put", -1, 1, 0), ("Put", 0, -1, 0), ("Call", 0, -1, 0), ("Call", 1, 1, 0)],
+    "Call Calendar": [("Call", 0, -1, 0), ("Call", 0, 1, 1)],
+}
+
+#%%
+def unique_contracts(chains_df: DataFrame) -> DataFrame:
+    """The chain with one contract per Expiration, Strike and Type.
+
+    Index options list monthly expirations under two roots, i.e. SPX and
+    SPXW, and the chain keeps both under the same key. The root with the most
+    open interest is kept, since its quotes are the ones that trade.
+
+    Example
+    -------
+    contracts = unique_contracts(ticker.chains).reindex(legs.index)
+    """
+
+    if chains_df.index.is_unique:
+        return chains_df
+
+    order = np.argsort(-chains_df["OI"].to_numpy(dtype=float), kind="stable")
+    ordered = chains_df.iloc[order]
+
+    return ordered[~ordered.index.duplicated(keep="first")].sort_index()
+
+#%%
+def preset_legs(
+    chains_df: DataFrame,
+    name: str,
+    last_price: float,
+    expiration: Optional[pd.Timestamp] = None,
+    step: int = 1,
+) -> DataFrame:
+    """Builds the legs of a preset strategy around the at-the-money strike.
+
+    Parameters
+    ----------
+    chains_df: pd.DataFrame
+        DataFrame of options chains, indexed by Expiration, Strike and Type.
+    name: str
+        One of STRATEGY_PRESETS.
+    last_price: float
+        Price of the underlying.
+    expiration: pd.Timestamp
+        The first expiration of the strategy. Defaults to the nearest one.
+    step: int
+        Listed strikes between the legs.
+
+    Returns
+    -------
+    pd.DataFrame: Expiration, Strike, Type and Quantity of each leg.
+
+    Example
+    -------
+    condor = preset_legs(ticker.chains, 'Iron Condor', ticker.stock_price, step = 5)
+    """
+
+    expirations = chains_df.index.get_level_values("Expiration").unique().sort_values()
+    first = 0 if expiration is None else int(expirations.searchsorted(pd.Timestamp(expiration)))
+    rows = []
+    for option_type, steps, quantity, offset in STRATEGY_PRESETS[name]:
+        leg_expiration = expirations[min(first + offset, len(expirations) - 1)]
+        strikes = np.sort(chains_df.xs(leg_expiration, level="Expiration").index.get_level_values("Strike").unique())
+        atm = int(np.abs(strikes - last_price).argmin())
+        strike = strikes[int(np.clip(atm + steps * step, 0, len(strikes) - 1))]
+        rows.append({"Expiration": leg_expiration, "Strike": strike, "Type": option_type, "Quantity": quantity})
+
+    return DataFrame(rows, columns=LEG_INDEX + ["Quantity"])
+
+def build_legs(chains_df: DataFrame, legs: DataFrame) -> DataFrame:
+    """Joins the legs to their contracts in the chain.
+
+    Long legs are entered at the Ask and short legs at the Bid, falling back to
+    the Theoretical price when there is no quote.
+
+    Parameters
+    ----------
+    chains_df: pd.DataFrame
+        DataFrame of options chains, indexed by Expiration, Strike and Type.
+    legs: pd.DataFrame
+        Expiration, Strike, Type and Quantity of each leg.
+
+    Returns
+    -------
+    pd.DataFrame: The legs with Quantity, Entry, Mark, DTE, IV and greeks, indexed by Expiration, Strike and Type.
+    """
+
+    legs = legs.copy()
+    legs["Expiration"] = pd.to_datetime(legs["Expiration"])
+    legs["Strike"] = legs["Strike"].astype(float)
+    legs = legs.groupby(LEG_INDEX, sort=False)["Quantity"].sum().to_frame()
+    legs = legs[legs["Quantity"] != 0]
+
+    contracts = unique_contracts(chains_df).reindex(legs.index)
+    missing = contracts["DTE"].isna()
+    if missing.any():
+        raise KeyError(f"Contracts not in the chain: {list(legs.index[missing])}")
+
+    quote = np.where(legs["Quantity"] > 0, contracts["Ask"], contracts["Bid"])
+    legs["Entry"] = np.where(quote > 0, quote, contracts["Theoretical"])
+    legs["Mark"] = contracts["Theoretical"].astype(float)
+    for column in ["DTE", "IV", "Delta", "Gamma", "Theta", "Vega"]:
+        legs[column] = contracts[column].astype(float)
+
+    return legs
+
+def calc_strategy_greeks(legs: DataFrame, last_price: float) -> pd.Series:
+    """Net cost and greeks of a position, for the whole contract size.
+
+    Returns
+    -------
+    pd.Series: Cost (positive for a debit), Delta, Gamma, Theta, Vega and Delta $.
+    """
+
+    size = legs["Quantity"] * CONTRACT_SIZE
+    greeks = pd.Series(
+        {
+            "Cost": float((size * legs["Entry"]).sum()),
+            "Delta": float((size * legs["Delta"]).sum()),
+            "Gamma": float((size * legs["Gamma"]).sum()),
+            "Theta": float((size * legs["Theta"]).sum()),
+            "Vega": float((size * legs["Vega"]).sum()),
+        }
+    )
+    greeks["Delta $"] = greeks["Delta"] * last_price
+
+    return greeks.round(4)
+
+def calc_strategy_pnl(
+    legs: DataFrame,
+    last_price: float,
+    spot: Optional[np.ndarray] = None,
+    days: Optional[np.ndarray] = None,
+    iv_shifts: np.ndarray = IV_SHIFTS,
+    method: str = "reprice",
+    rate: float = 0.0,
+) -> np.ndarray:
+    """Position P&L over a spot x days-forward x IV-shift grid, in one broadcasted operation.
+
+    Parameters
+    ----------
+    legs: pd.DataFrame
+        Legs from build_legs.
+    last_price: float
+        Price of the underlying.
+    spot: np.ndarray
+        Spot prices. Defaults to SPOT_POINTS prices within SPOT_WIDTH of the last price.
+    days: np.ndarray
+        Days forward. Defaults to DAYS_POINTS days up to the first expiration.
+    iv_shifts: np.ndarray
+        Absolute shifts added to every leg's IV, i.e. 0.05 for +5 vol points.
+    method: str
+        'reprice' values every leg with Black-Scholes at each scenario, and at
+        intrinsic value once expired. 'greeks' starts from the Theoretical
+        mark and uses the chain's delta, gamma, theta (per day) and vega (per
+        vol point).
+    rate: float
+        Continuously compounded risk-free rate, for repricing.
+
+    Returns
+    -------
+    np.ndarray: P&L in dollars, shaped (spot, days, iv_shifts).
+
+    Example
+    -------
+    legs = build_legs(ticker.chains, preset_legs(ticker.chains, 'Iron Condor', ticker.stock_price))
+
+    pnl = calc_strategy_pnl(legs, ticker.stock_price)
+    """
+
+    spot = calc_spot_grid(last_price) if spot is None else np.asarray(spot, dtype=float)
+    days = calc_days_grid(legs) if days is None else np.asarray(days, dtype=float)
+    iv_shifts = np.asarray(iv_shifts, dtype=float)
+
+    # Axes are (legs, spot, days, iv_shifts).
+
+    def leg(values: object) -> np.ndarray:
+        return np.asarray(values, dtype=float)[:, None, None, None]
+
+    S = spot[None, :, None, None]
+    days_forward = days[None, None, :, None]
+    shift = iv_shifts[None, None, None, :]
+    quantity = leg(legs["Quantity"]) * CONTRACT_SIZE
+
+    if method == "greeks":
+        move = S - last_price
+        change = (
+            leg(legs["Delta"]) * move
+            + 0.5 * leg(legs["Gamma"]) * move * move
+            + leg(legs["Theta"]) * np.minimum(days_forward, leg(legs["DTE"]))
+            + leg(legs["Vega"]) * shift * 100
+        )
+        return (quantity * (leg(legs["Mark"]) - leg(legs["Entry"]) + change)).sum(axis=0)
+
+    # Calls and puts share one formula with w = +1 or -1, so each scenario needs two normal CDFs rather than four.
+
+    strike = leg(legs.index.get_level_values("Strike"))
+    w = leg(np.where(legs.index.get_level_values("Type") == "Call", 1.0, -1.0))
+    t = np.maximum(leg(legs["DTE"]) - days_forward, 0) / 365
+    sigma = np.maximum(leg(legs["IV"]) + shift, 1e-4)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = bs_d1_d2(S, strike, np.maximum(t, 1e-12), sigma, rate)
+        price = w * (S * norm_cdf(w * d1) - strike * np.exp(-rate * t) * norm_cdf(w * d2))
+    value = np.where(t > 0, price, np.maximum(w * (S - strike), 0))
+
+    return (quantity * (value - leg(legs["Entry"]))).sum(axis=0)
+
+def calc_spot_grid(last_price: float, width: float = SPOT_WIDTH, points: int = SPOT_POINTS) -> np.ndarray:
+    """Spot prices within `width` of the last price."""
+
+    return np.linspace(last_price * (1 - width), last_price * (1 + width), points)
+
+def calc_days_grid(legs: DataFrame, points: int = DAYS_POINTS) -> np.ndarray:
+    """Days forward from today to the first expiration of the legs."""
+
+    return np.linspace(0, max(float(legs["DTE"].min()), 0), points)
+
+def calc_strategy_payoff(legs: DataFrame, last_price: float, spot: Optional[np.ndarray] = None) -> DataFrame:
+    """P&L today and at the first expiration, and the risk summary of a position.
+
+    Later legs of calendars are valued with Black-Scholes at the first expiration.
+
+    Returns
+    -------
+    pd.DataFrame: Today and Expiration P&L by Spot, with the Max Profit, Max Loss and Breakevens
+        within the spot grid in attrs.
+    """
+
+    spot = calc_spot_grid(last_price) if spot is None else np.asarray(spot, dtype=float)
+    first_expiration = float(legs["DTE"].min())
+    pnl = calc_strategy_pnl(legs, last_price, spot, np.array([0.0, first_expiration]), np.array([0.0]))[:, :, 0]
+    payoff = DataFrame({"Today": pnl[:, 0], "Expiration": pnl[:, 1]}, index=pd.Index(spot, name="Spot"))
+
+    at_expiration = pnl[:, 1]
+    crossings = np.nonzero(np.diff(np.sign(at_expiration)) != 0)[0]
+    breakevens = [
+        float(spot[i] - at_expiration[i] * (spot[i + 1] - spot[i]) / (at_expiration[i + 1] - at_expiration[i]))
+        for i in crossings
+    ]
+    payoff.attrs["Max Profit"] = float(at_expiration.max())
+    payoff.attrs["Max Loss"] = float(at_expiration.min())
+    payoff.attrs["Breakevens"] = [round(price, 2) for price in breakevens]
+
+    return payoff
@@ -0,0 +1,226 @@
+"""Realized and Implied Volatility Series from the historical_data Payload
+
+The daily bars in delayed_quotes/historical_data are kept per symbol as typed
+arrays, together with rolling realized volatility over HV_WINDOWS. Each new
+payload only appends the days after the last cached one, and only the rolling
+windows ending on those days are computed. IV rank and IV percentile are
+computed over trailing one-year windows of the daily IV30 recorded by the
+HistoryStore.
+"""
+
+import warnings
+import threading
+import collections
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Literal, Optional
+from pandas import DataFrame
+from .history import utc_now
+
+__docformat__: Literal["numpy"] = "numpy"
+
+HV_WINDOWS: list[int] = [10, 20, 30, 60, 90]
+TRADING_DAYS: int = 252
+
+# The scanner passes every directory symbol through the engine, so only the most recently used are kept.
+
+MAX_SYMBOLS: int = 64
+BAR_FIELDS: list[tuple] = [
+    ("open", "Open"),
+    ("high", "High"),
+    ("low", "Low"),
+    ("close", "Close"),
+    ("volume", "Volume"),
+]
+
+#%%
+def calc_realized_vol(close: np.ndarray, window: int, start: int = 0) -> np.ndarray:
+    """Annualized close-to-close volatility, in percent, for the rows of `close` from `start` on.
+
+    Rows without `window` returns before them are NaN.
+
+    Example
+    -------
+    hv30 = calc_realized_vol(closes, 30)
+    """
+
+    hv = np.full(len(close) - start, np.nan)
+    first = max(start, window)
+    if len(close) <= first:
+        return hv
+
+    # Row r uses the log returns of rows r - window + 1 to r, i.e. returns[r - window:r].
+
+    returns = np.diff(np.log(close[first - window :]))
+    windows = sliding_window_view(returns, window)
+    hv[first - start :] = windows.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+
+    return hv
+
+def calc_iv_rank(daily_iv: pd.Series, window: int = TRADING_DAYS) -> DataFrame:
+    """IV rank and IV percentile of each day against the trailing `window` days, including that day.
+
+    IV Rank is where the IV sits between the window's low and high. IV
+    Percentile is the share of the window's days with a lower IV. Both are in
+    percent and use the days available when there are fewer than `window`.
+
+    Example
+    -------
+    iv_rank = calc_iv_rank(history.resample('SPX', '1D', columns = ['IV30'])['IV30'])
+    """
+
+    iv = daily_iv.to_numpy(dtype=float)
+    padded = np.concatenate([np.full(window - 1, np.nan), iv])
+    windows = sliding_window_view(padded, window)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low = np.nanmin(windows, axis=1) if len(iv) else iv
+        high = np.nanmax(windows, axis=1) if len(iv) else iv
+        rank = (iv - low) / (high - low) * 100
+        days = np.sum(~np.isnan(windows), axis=1)
+        percentile = np.sum(windows < iv[:, None], axis=1) / np.maximum(days - 1, 1) * 100
+
+    return DataFrame(
+        {
+            "IV30": iv,
+            "IV Rank": np.round(rank, 2),
+            "IV Percentile": np.where(np.isnan(iv), np.nan, np.round(percentile, 2)),
+        },
+        index=daily_iv.index,
+    )
+
+# %%
+class VolatilityEngine(object):
+    """Caches the daily bars and realized volatility of the `max_symbols` most recently used symbols.
+
+    Example
+    -------
+    volatility = VolatilityEngine()
+
+    volatility.update('SPX', json.loads(payload)['data']['data'])
+
+    spx_hv = volatility.series('SPX')
+    """
+
+    def __init__(self, windows: list[int] = HV_WINDOWS, max_symbols: int = MAX_SYMBOLS) -> None:
+        self.windows = list(windows)
+        self.max_symbols = max_symbols
+        self.columns: list[str] = [column for _, column in BAR_FIELDS] + [f"HV{window}" for window in self.windows]
+        self._series: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, symbol: str, bars: list[dict]) -> int:
+        """Appends the daily bars newer than the cached ones and their realized volatility.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker the bars belong to.
+        bars: list[dict]
+            The data.data list of a historical_data payload, oldest first.
+
+        Returns
+        -------
+        int: The number of days appended, counting a replaced last day.
+        """
+
+        symbol = symbol.upper()
+        with self._lock:
+            cached: Optional[dict] = self._series.get(symbol)
+
+        # The last cached day may have been a partial bar, so it is replaced along with the new days.
+
+        keep = len(cached["Date"]) - 1 if cached is not None else 0
+        last_date = str(cached["Date"][keep - 1]) if keep > 0 else ""
+
+        # The bars are in date order, so the new ones are a tail of the list.
+
+        first = len(bars)
+        while first > 0 and str(bars[first - 1].get("date", "")) > last_date:
+            first -= 1
+        new_bars = bars[first:]
+        if not new_bars:
+            return 0
+
+        new: dict = {"Date": np.array([bar["date"] for bar in new_bars], dtype="datetime64[D]")}
+        for field, column in BAR_FIELDS:
+            new[column] = np.array([bar.get(field, np.nan) for bar in new_bars], dtype=float)
+
+        series = {key: np.concatenate([cached[key][:keep], new[key]]) for key in new} if keep else new
+        for window in self.windows:
+            hv = calc_realized_vol(series["Close"], window, keep)
+            series[f"HV{window}"] = np.concatenate([cached[f"HV{window}"][:keep], hv]) if keep else hv
+
+        with self._lock:
+            self._series[symbol] = series
+            self._series.move_to_end(symbol)
+            while len(self._series) > self.max_symbols:
+                self._series.popitem(last=False)
+
+        return len(new_bars)
+
+    def series(self, symbol: str) -> DataFrame:
+        """Returns the cached daily bars and realized volatility, indexed by Date."""
+
+        with self._lock:
+            series: Optional[dict] = self._series.get(symbol.upper())
+            if series is not None:
+                self._series.move_to_end(symbol.upper())
+        if series is None:
+            return DataFrame(columns=self.columns, index=pd.DatetimeIndex([], name="Date"))
+
+        return DataFrame(
+            {column: series[column] for column in self.columns},
+            index=pd.DatetimeIndex(series["Date"], name="Date"),
+        )
+
+    def calc_iv_stats(
+        self,
+        symbol: str,
+        iv30: float,
+        iv_high: float,
+        iv_low: float,
+        daily_iv: Optional[pd.Series] = None,
+    ) -> pd.Series:
+        """Summarizes the current IV against its annual range, its history and realized volatility.
+
+        Parameters
+        ----------
+        symbol: str
+            The ticker.
+        iv30: float
+            The current IV30.
+        iv_high: float
+            The IV30 1Y High from the historical_data payload.
+        iv_low: float
+            The IV30 1Y Low from the historical_data payload.
+        daily_iv: pd.Series
+            Recorded IV30 by UTC day, as from HistoryStore.resample, for the IV percentile. Today's value is
+            replaced by `iv30`.
+
+        Returns
+        -------
+        pd.Series: IV30, IV Rank, IV Percentile, the latest HV of each window and IV30 - HV30.
+        """
+
+        stats = pd.Series({"IV30": iv30}, name=symbol.upper(), dtype=float)
+        stats["IV Rank"] = round((iv30 - iv_low) / (iv_high - iv_low) * 100, 2) if iv_high > iv_low else np.nan
+
+        if daily_iv is not None:
+            daily_iv = daily_iv.dropna()
+            today = utc_now().normalize()
+            daily_iv = daily_iv[daily_iv.index.normalize() < today]
+            daily_iv = pd.concat([daily_iv, pd.Series([iv30], index=[today])])
+            stats["IV Percentile"] = calc_iv_rank(daily_iv)["IV Percentile"].iloc[-1] if len(daily_iv) > 1 else np.nan
+        else:
+            stats["IV Percentile"] = np.nan
+
+        hv = self.series(symbol)
+        for window in self.windows:
+            stats[f"HV{window}"] = round(hv[f"HV{window}"].iloc[-1], 2) if not hv.empty else np.nan
+        stats["IV30 - HV30"] = round(iv30 - stats["HV30"], 2) if "HV30" in stats else np.nan
+
+        return stats
+
+volatility: VolatilityEngine = VolatilityEngine()
@@ -0,0 +1,130 @@
+"""Process Pool for the Chain Analytics
+
+Streamlit serves every session from threads of one process, so decoding and
+analysing chains for different users serialize on the GIL. With
+CBOE_ANALYTICS_WORKERS set, Ticker.get_ticker hands the raw options payload to
+a pool of worker processes instead. The payload goes in as bytes, and the
+chains and result frames come back as Arrow IPC streams, which are cheaper to
+send than pickled DataFrames, and the small analytics cube as its arrays. The
+pool needs pyarrow.
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal, Optional
+from pandas import DataFrame
+from .arrow_chains import pa
+from .cube import AnalyticsCube
+
+__docformat__: Literal["numpy"] = "numpy"
+
+ANALYTICS_WORKERS: int = int(os.environ.get("CBOE_ANALYTICS_WORKERS", "0"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+#%%
+def to_ipc(frame: object) -> bytes:
+    """Serializes a DataFrame, Series or Table as an Arrow IPC stream."""
+
+    if isinstance(frame, DataFrame):
+        table = pa.Table.from_pandas(frame)
+    elif isinstance(frame, pa.Table):
+        table = frame
+    else:
+        table = pa.Table.from_pandas(frame.to_frame())
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue().to_pybytes()
+
+def from_ipc(payload: bytes) -> "pa.Table":
+    """Reads an Arrow IPC stream written by to_ipc."""
+
+    return pa.ipc.open_stream(payload).read_all()
+
+def analyze_payload(payload: bytes, last_price: float) -> dict:
+    """Worker side: builds the chains from a raw options payload and runs the analytics.
+
+    Returns
+    -------
+    dict: The chains Table and each analytics frame, as Arrow IPC bytes, and the cube as its values and
+        dimensions.
+    """
+
+    from . import cboe_model
+
+    chains_table = cboe_model.build_chains_table(payload, last_price)
+    chains_df = cboe_model.arrow_chains.to_pandas(chains_table)
+    analytics = cboe_model.calc_ticker_analytics(chains_df, last_price, chains_table)
+    del analytics["calls"], analytics["puts"]
+    cube = analytics.pop("cube")
+
+    results = {name: to_ipc(frame) for name, frame in analytics.items()}
+    results["table"] = to_ipc(chains_table)
+    results["cube"] = (cube.values, cube.dimensions)
+
+    return results
+
+# %%
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """Returns the shared worker pool, starting it on first use.
+
+    None when CBOE_ANALYTICS_WORKERS is 0 or pyarrow is not installed, in which
+    case the analytics run in the calling thread.
+    """
+
+    global _pool
+
+    if ANALYTICS_WORKERS <= 0 or pa is None:
+        return None
+
+    with _lock:
+        if _pool is None:
+            # Spawned workers are safe to start from Streamlit's threads, unlike forked ones.
+
+            _pool = ProcessPoolExecutor(
+                max_workers=ANALYTICS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    return _pool
+
+def set_workers(workers: int) -> None:
+    """Resizes the worker pool. 0 runs the analytics in the calling thread.
+
+    Example
+    -------
+    set_workers(os.cpu_count())
+    """
+
+    global _pool, ANALYTICS_WORKERS
+
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        ANALYTICS_WORKERS = int(workers)
+
+def run_ticker_analytics(pool: ProcessPoolExecutor, payload: Optional[bytes], last_price: float) -> dict:
+    """Runs analyze_payload in the pool and converts the results back to pandas.
+
+    Returns
+    -------
+    dict: table (pa.Table), by_expiration, by_strike, skew, gex_profile, gex_levels, distribution,
+        expected_range and cube.
+    """
+
+    if payload is None:
+        raise ValueError("No options data to analyse.")
+
+    results = pool.submit(analyze_payload, payload, last_price).result()
+    analytics: dict = {"table": from_ipc(results.pop("table")), "cube": AnalyticsCube.from_values(*results.pop("cube"))}
+    for name, ipc in results.items():
+        analytics[name] = from_ipc(ipc).to_pandas()
+    analytics["gex_levels"] = analytics["gex_levels"].iloc[:, 0]
+
+    return analytics